@@ -0,0 +1,87 @@
+from typing import Callable, List
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import tracemalloc
+
+from sim_assets.entities.Individual import Individual
+
+
+def make_individuals(config: dict, agents: int) -> List[Individual]:
+    return [Individual(f"ind-{i}", dict(config)) for i in range(agents)]
+
+
+def make_table_individuals(config: dict, agents: int) -> List[Individual]:
+    from sim_assets.entities.EntityTable import EntityTable, bind_entity
+    from sim_assets.env.VectorEnvironment import INDIVIDUAL_COLUMNS
+
+    table = EntityTable(INDIVIDUAL_COLUMNS, capacity=agents)
+    individuals = []
+    for i in range(agents):
+        individual = Individual(f"ind-{i}", config)
+        bind_entity(table, individual)
+        individuals.append(individual)
+
+    return individuals
+
+
+def measure(make: Callable[[dict, int], list], config: dict, agents: int) -> float:
+    gc.collect()
+    tracemalloc.start()
+    population = make(config, agents)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    del population
+    return current / agents
+
+
+def root_commit() -> str:
+    return subprocess.run(["git", "rev-list", "--max-parents=0", "HEAD"], capture_output=True, text=True,
+                          check=True).stdout.split()[0]
+
+
+def measure_baseline(revision: str, config_file: str, agents: int) -> float:
+    with tempfile.TemporaryDirectory() as tree:
+        archive = subprocess.run(["git", "archive", revision, "sim_assets"], capture_output=True, check=True).stdout
+        subprocess.run(["tar", "-x", "-C", tree], input=archive, check=True)
+        result = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--agents", str(agents), "--config",
+             os.path.abspath(config_file), "--child"],
+            cwd=tree, env=dict(os.environ, PYTHONPATH=tree), capture_output=True, text=True, check=True,
+        )
+
+    return float(result.stdout)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bytes per Individual for each entity representation")
+    parser.add_argument("--agents", type=int, default=1000000)
+    parser.add_argument("--config", default="test/configs/junior-swe.json")
+    parser.add_argument("--baseline", default=None, help="git revision to compare against, defaults to the root commit")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    with open(args.config) as f:
+        config = json.load(f)
+
+    if args.child:
+        print(measure(make_individuals, config, args.agents))
+        return
+
+    baseline = args.baseline if args.baseline is not None else root_commit()
+    results = {
+        f"baseline {baseline[:7]}": measure_baseline(baseline, args.config, args.agents),
+        'slots': measure(make_individuals, config, args.agents),
+        'slots+table': measure(make_table_individuals, config, args.agents),
+    }
+    for name, per_agent in results.items():
+        print(f"{name:>16}: {per_agent:8.1f} bytes/agent ({per_agent * args.agents / 2**20:8.1f} MiB total)")
+
+
+if __name__ == "__main__":
+    main()
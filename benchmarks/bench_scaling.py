@@ -0,0 +1,173 @@
+from typing import Any, Dict, List
+import argparse
+import functools
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.PopulationGenerator import DEFAULT_GENERATOR_CONFIG, PopulationGenerator
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from sim_assets.records.Profiler import Profiler
+
+ENVIRONMENTS = {
+    'scalar': Environment,
+    'vector': VectorEnvironment,
+    'cents': functools.partial(VectorEnvironment, cents=True),
+}
+
+LOGGING = ('make_log_columns', 'log_columns')
+
+
+def time_method(env: Environment, name: str, timings: Dict[str, float]) -> None:
+    method = getattr(env, name)
+
+    @functools.wraps(method)
+    def timed(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            timings[name] = timings.get(name, 0.0) + time.perf_counter() - start
+
+    setattr(env, name, timed)
+
+
+def build(env_name: str, config: Dict[str, Any], agents: int, homes: int, owners_per_home: int, years: int,
+          seed: int, timings: Dict[str, float]) -> Environment:
+    env: Environment = ENVIRONMENTS[env_name]("bench", json.loads(json.dumps(config)))
+    generator_config = dict(DEFAULT_GENERATOR_CONFIG, owners_per_home={'kind': 'constant', 'value': owners_per_home})
+
+    start = time.perf_counter()
+    PopulationGenerator(agents, homes, seed, generator_config).populate(env)
+    timings['populate'] = time.perf_counter() - start
+
+    growth = (1 + env.config['home_appr_rate']) ** years
+    for renter in env.renters.values():
+        if renter.residence is not None:
+            renter.config['savings'] += years * growth * renter.residence.config['rent']
+
+    return env
+
+
+def run(env_name: str, config: Dict[str, Any], agents: int, homes: int, owners_per_home: int, years: int,
+        seed: int) -> Dict[str, Any]:
+    setup: Dict[str, float] = dict()
+    env = build(env_name, config, agents, homes, owners_per_home, years, seed, setup)
+
+    logging: Dict[str, float] = dict()
+    for name in LOGGING:
+        time_method(env, name, logging)
+    env.profiler = Profiler()
+
+    start = time.perf_counter()
+    for _ in range(years):
+        env.progress_one_year()
+    wall_time = time.perf_counter() - start
+
+    totals = env.profiler.totals()
+    phases = {name: stats['wall_time'] for name, stats in totals.items()}
+    phases.update(logging)
+    transactions = sum(stats['pay_calls'] for stats in totals.values())
+
+    start = time.perf_counter()
+    for individual in env.homeowners.values():
+        env.get_net_worth(individual)
+    scalar_net_worth_time = time.perf_counter() - start
+    start = time.perf_counter()
+    env.get_net_worths()
+    net_worth_time = time.perf_counter() - start
+
+    return {
+        'env': env_name,
+        'agents': agents,
+        'homes': homes,
+        'owners_per_home': owners_per_home,
+        'years': years,
+        'setup': setup,
+        'wall_time': wall_time,
+        'year_time': wall_time / max(years, 1),
+        'phases': phases,
+        'phase_stats': totals,
+        'transactions': transactions,
+        'tx_per_s': transactions / wall_time if wall_time > 0 else 0.0,
+        'get_net_worth': scalar_net_worth_time,
+        'get_net_worths': net_worth_time,
+    }
+
+
+def peak_memory(env_name: str, config: Dict[str, Any], agents: int, homes: int, owners_per_home: int, years: int,
+                seed: int) -> int:
+    tracemalloc.start()
+    env = build(env_name, config, agents, homes, owners_per_home, years, seed, dict())
+    for _ in range(years):
+        env.progress_one_year()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return peak
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def sweep(args: argparse.Namespace) -> List[Dict[str, Any]]:
+    with open(args.config) as f:
+        config = json.load(f)
+
+    results = []
+    for env_name in args.envs:
+        for agents in args.agents:
+            for homes in args.homes if args.homes else [max(agents // 4, 1)]:
+                for owners_per_home in args.owners_per_home:
+                    result = run(env_name, config, agents, homes, owners_per_home, args.years, args.seed)
+                    if args.memory:
+                        result['peak_memory'] = peak_memory(env_name, config, agents, homes, owners_per_home,
+                                                            args.years, args.seed)
+                    results.append(result)
+                    print(f"{env_name:>6} agents={agents:<8} homes={homes:<8} owners/home={owners_per_home:<3} "
+                          f"year={result['year_time']:.4f}s tx/s={result['tx_per_s']:,.0f}", flush=True)
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Sweep population sizes and time the yearly step")
+    parser.add_argument("--envs", nargs="+", default=["scalar", "vector"], choices=sorted(ENVIRONMENTS))
+    parser.add_argument("--agents", nargs="+", type=int, default=[1000, 10000])
+    parser.add_argument("--homes", nargs="+", type=int, default=None, help="defaults to a quarter of the agents")
+    parser.add_argument("--owners-per-home", nargs="+", type=int, default=[1, 4])
+    parser.add_argument("--years", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--config", default="test/configs/basic-env.json")
+    parser.add_argument("--no-memory", dest="memory", action="store_false", help="skip the tracemalloc pass")
+    parser.add_argument("--output", default=None, help="defaults to benchmarks/results/scaling-<commit>.json")
+    args = parser.parse_args()
+
+    commit = git_commit()
+    output = args.output if args.output is not None else os.path.join("benchmarks", "results",
+                                                                      f"scaling-{commit[:12]}.json")
+    report = {
+        'commit': commit,
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'args': vars(args),
+        'results': sweep(args),
+    }
+
+    os.makedirs(os.path.dirname(output) or ".", exist_ok=True)
+    with open(output, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"Wrote {output}")
+
+
+if __name__ == "__main__":
+    main()
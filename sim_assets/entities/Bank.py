@@ -1,15 +1,23 @@
 from sim_assets.entities.Entity import Entity
 from sim_assets.entities.Individual import Individual
+from sim_assets.entities.LoanBook import LoanBook, monthly_payment
+from sim_assets.records.Ledger import MORTGAGE_LOAN
+
+MORTGAGE_EXPENSE = "mortgage"
 
 
 class Bank(Entity):
+    __slots__ = ('loans',)
+
     def __init__(self, bank_id: str):
         Entity.__init__(self, bank_id, {'savings': 10000000000})
+        self.loans: LoanBook = LoanBook()
 
-    def issue_mortgage(self, amount: float, loan_term: int, interest: float, recipient: Individual) -> None:
-        monthly_interest = interest / 12
-        loan_term_months = loan_term * 12
-        monthly_payment = amount * (monthly_interest / (1 - (1 + monthly_interest)**(-loan_term_months)))
+    def issue_mortgage(self, amount: float, loan_term: int, interest: float, recipient: Individual) -> int:
+        assert MORTGAGE_EXPENSE not in recipient.expenses, f"{recipient.entity_id} already has a mortgage"
+        self.pay(amount, recipient, MORTGAGE_LOAN)
+        recipient.add_expense(MORTGAGE_EXPENSE, monthly_payment(amount, loan_term, interest), 12, loan_term)
+        return self.loans.add_loan(recipient.entity_id, amount, loan_term, interest)
 
-        self.pay(amount, recipient, f"{amount} loan over {loan_term} years with {interest} interest")
-        recipient.add_expense("mortgage", monthly_payment, 12, loan_term)
+    def advance_loans(self, months: int = 12) -> None:
+        self.loans.advance(months)
@@ -1,24 +1,37 @@
 from typing import TypedDict
+from sim_assets.records.Ledger import Ledger
 
 
 class EntityConfig(TypedDict):
     savings: float
 
 
+DEFAULT_LEDGER = Ledger()
+
+
 class Entity:
+    __slots__ = ('entity_id', 'config', 'ledger')
+
     def __init__(self, entity_id: str, config: EntityConfig):
         self.entity_id = entity_id
         self.config = config
+        self.ledger: Ledger = DEFAULT_LEDGER
+
+    @property
+    def savings(self) -> float:
+        return self.config['savings']
 
     def pay(self, amount: float, other: 'Entity', reason: str) -> float:
         amount = round(amount * 100) / 100
-        assert amount <= round(self.config['savings']), f"{self.entity_id} only has {self.config['savings']}, not " \
-                                                        f"enough assets to pay {other.entity_id} {amount} for {reason} "
+        assert amount <= round(self.config['savings'] * 100) / 100, f"{self.entity_id} only has " \
+                                                                    f"{self.config['savings']}, not enough assets to " \
+                                                                    f"pay {other.entity_id} {amount} for {reason} "
         assert amount >= 0, f"{self.entity_id} cannot pay a negative amount of money"
 
         other.config['savings'] += amount
         self.config['savings'] -= amount
 
-        print(f"LOG: {self.entity_id} pays {other.entity_id} {amount} for {reason}")
+        if self.ledger.level:
+            self.ledger.record(self.entity_id, other.entity_id, amount, reason)
 
         return amount
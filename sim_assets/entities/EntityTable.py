@@ -0,0 +1,244 @@
+from typing import Any, Dict, Iterator, List, Mapping, MutableMapping, Sequence
+import numpy as np
+
+
+class EntityTable:
+    def __init__(self, columns: Dict[str, Any], capacity: int = 1024):
+        self.capacity = max(capacity, 1)
+        self.size = 0
+        self.ids: List[str] = []
+        self.index: Dict[str, int] = dict()
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.zeros(self.capacity, dtype=dtype) for name, dtype in columns.items()
+        }
+
+        self.clock = 0
+        self.lazy: Dict[str, str] = dict()
+        self.epochs: Dict[str, np.ndarray] = dict()
+        self.materialized: Dict[str, np.ndarray] = dict()
+        self.scales: Dict[str, int] = dict()
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, name: str) -> np.ndarray:
+        if name in self.lazy:
+            return self.materialize(name)
+
+        return self.columns[name][:self.size]
+
+    def materialize(self, name: str) -> np.ndarray:
+        values = self.materialized.get(name)
+        if values is None:
+            values = self.grown(name)
+            values.flags.writeable = False
+            self.materialized[name] = values
+
+        return values
+
+    def invalidate(self, name: str = None) -> None:
+        if name is None:
+            self.materialized.clear()
+            return
+
+        self.materialized.pop(name, None)
+        for lazy_name, rate_column in self.lazy.items():
+            if rate_column == name:
+                self.materialized.pop(lazy_name, None)
+
+    def make_lazy(self, name: str, rate_column: str) -> None:
+        assert name in self.columns and rate_column in self.columns, f"Cannot grow {name} by {rate_column}"
+        self.lazy[name] = rate_column
+        self.epochs[name] = np.full(self.capacity, self.clock, dtype=np.int64)
+
+    def make_fixed_point(self, name: str, scale: int) -> None:
+        assert name in self.columns and name not in self.lazy, f"Cannot store {name} as fixed point"
+        self.columns[name] = np.round(self.columns[name] * scale).astype(np.int64)
+        self.scales[name] = scale
+
+    def values(self, name: str) -> np.ndarray:
+        if name in self.scales:
+            return self.columns[name][:self.size] / self.scales[name]
+
+        return self.column(name)
+
+    def assign(self, name: str, rows: Any, values: np.ndarray) -> None:
+        for lazy_name, rate_column in self.lazy.items():
+            if rate_column == name:
+                self.rebase(lazy_name, rows)
+
+        if name in self.scales:
+            values = np.round(values * self.scales[name])
+        self.columns[name][:self.size][rows] = values
+        if name in self.epochs:
+            self.epochs[name][:self.size][rows] = self.clock
+        self.invalidate(name)
+
+    def grown(self, name: str, rows: Any = slice(None)) -> np.ndarray:
+        base = self.columns[name][:self.size][rows]
+        rate = self.columns[self.lazy[name]][:self.size][rows]
+        return base * (1 + rate) ** (self.clock - self.epochs[name][:self.size][rows])
+
+    def rebase(self, name: str, rows: Any = slice(None)) -> None:
+        self.columns[name][:self.size][rows] = self.grown(name, rows)
+        self.epochs[name][:self.size][rows] = self.clock
+        self.invalidate(name)
+
+    def advance_clock(self, years: int = 1) -> None:
+        self.clock += years
+        self.invalidate()
+
+    def get_value(self, name: str, row: int) -> Any:
+        if name in self.lazy:
+            return self.grown(name, row).item()
+        if name in self.scales:
+            return self.columns[name][row].item() / self.scales[name]
+
+        return self.columns[name][row].item()
+
+    def set_value(self, name: str, row: int, value: Any) -> None:
+        for lazy_name, rate_column in self.lazy.items():
+            if rate_column == name:
+                self.rebase(lazy_name, row)
+
+        if name in self.scales:
+            value = round(value * self.scales[name])
+        self.columns[name][row] = value
+        if name in self.epochs:
+            self.epochs[name][row] = self.clock
+        self.invalidate(name)
+
+    def reserve(self, capacity: int) -> None:
+        if capacity <= self.capacity:
+            return
+
+        new_capacity = max(capacity, 2 * self.capacity)
+        for name, values in self.columns.items():
+            grown = np.zeros(new_capacity, dtype=values.dtype)
+            grown[:self.size] = values[:self.size]
+            self.columns[name] = grown
+        for name, epochs in self.epochs.items():
+            grown = np.zeros(new_capacity, dtype=epochs.dtype)
+            grown[:self.size] = epochs[:self.size]
+            self.epochs[name] = grown
+        self.capacity = new_capacity
+
+    def copy_state(self) -> Dict[str, Any]:
+        return {
+            'ids': list(self.ids),
+            'columns': {name: values[:self.size].copy() for name, values in self.columns.items()},
+            'clock': self.clock,
+            'epochs': {name: epochs[:self.size].copy() for name, epochs in self.epochs.items()},
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self.ids = list(state['ids'])
+        self.index = {entity_id: row for row, entity_id in enumerate(self.ids)}
+        self.size = len(self.ids)
+        self.reserve(self.size)
+        for name, values in state['columns'].items():
+            self.columns[name][:self.size] = values
+        self.clock = state['clock']
+        for name, epochs in state['epochs'].items():
+            self.epochs[name][:self.size] = epochs
+        self.invalidate()
+
+    def add_row(self, entity_id: str, values: Mapping[str, Any]) -> int:
+        assert entity_id not in self.index, f"{entity_id} already has a row in this table"
+        self.reserve(self.size + 1)
+
+        row = self.size
+        for name, column in self.columns.items():
+            value = values.get(name, 0)
+            column[row] = round(value * self.scales[name]) if name in self.scales else value
+        for epochs in self.epochs.values():
+            epochs[row] = self.clock
+
+        self.ids.append(entity_id)
+        self.index[entity_id] = row
+        self.size += 1
+        self.invalidate()
+        return row
+
+    def add_rows(self, entity_ids: Sequence[str], values: Sequence[Mapping[str, Any]]) -> range:
+        assert len(entity_ids) == len(values), f"Got {len(entity_ids)} ids for {len(values)} rows"
+        assert len(set(entity_ids)) == len(entity_ids) and not any(entity_id in self.index for entity_id in entity_ids), \
+            "Some of these entities already have rows in this table"
+        self.reserve(self.size + len(entity_ids))
+
+        rows = range(self.size, self.size + len(entity_ids))
+        for name, column in self.columns.items():
+            column_values = np.fromiter((row_values.get(name, 0) for row_values in values), dtype=np.float64
+                                        if name in self.scales else column.dtype, count=len(values))
+            if name in self.scales:
+                column_values = np.round(column_values * self.scales[name])
+            column[rows.start:rows.stop] = column_values
+        for epochs in self.epochs.values():
+            epochs[rows.start:rows.stop] = self.clock
+
+        self.ids.extend(entity_ids)
+        self.index.update(zip(entity_ids, rows))
+        self.size += len(entity_ids)
+        self.invalidate()
+        return rows
+
+
+class RowConfig(MutableMapping):
+    __slots__ = ('table', 'row', 'extra')
+
+    def __init__(self, table: EntityTable, row: int, extra: Dict[str, Any] = None):
+        self.table = table
+        self.row = row
+        self.extra = extra if extra else None
+
+    def __getitem__(self, key: str) -> Any:
+        if key in self.table.columns:
+            return self.table.get_value(key, self.row)
+        if self.extra is None:
+            raise KeyError(key)
+        return self.extra[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        if key in self.table.columns:
+            self.table.set_value(key, self.row, value)
+        elif self.extra is None:
+            self.extra = {key: value}
+        else:
+            self.extra[key] = value
+
+    def __delitem__(self, key: str) -> None:
+        assert key not in self.table.columns, f"Cannot remove column {key} from a table-backed config"
+        if self.extra is None:
+            raise KeyError(key)
+        del self.extra[key]
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.table.columns
+        if self.extra is not None:
+            yield from self.extra
+
+    def __len__(self) -> int:
+        return len(self.table.columns) + (len(self.extra) if self.extra is not None else 0)
+
+    def __repr__(self) -> str:
+        return repr(dict(self))
+
+
+def bind_entity(table: EntityTable, entity) -> int:
+    if isinstance(entity.config, RowConfig) and entity.config.table is table:
+        return entity.config.row
+
+    row = table.add_row(entity.entity_id, entity.config)
+    extra = {key: value for key, value in entity.config.items() if key not in table.columns}
+    entity.config = RowConfig(table, row, extra)
+    return row
+
+
+def bind_entities(table: EntityTable, entities: Sequence) -> None:
+    entities = [
+        entity for entity in entities if not (isinstance(entity.config, RowConfig) and entity.config.table is table)
+    ]
+    rows = table.add_rows([entity.entity_id for entity in entities], [entity.config for entity in entities])
+    for row, entity in zip(rows, entities):
+        extra = {key: value for key, value in entity.config.items() if key not in table.columns}
+        entity.config = RowConfig(table, row, extra)
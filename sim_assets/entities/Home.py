@@ -8,9 +8,10 @@ class HomeConfig(EntityConfig):
 
 
 class Home(Entity):
+    __slots__ = ()
+
     def __init__(self, home_id: str, config: HomeConfig):
         Entity.__init__(self, home_id, config)
-        self.config = config
 
     @classmethod
     def from_json(cls, home_id: str, filename: str) -> 'Home':
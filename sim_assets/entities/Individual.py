@@ -1,4 +1,4 @@
-from typing import TypedDict, Dict
+from typing import Callable, TypedDict, Dict
 import json
 from sim_assets.entities.Home import Home
 from sim_assets.entities.Entity import Entity, EntityConfig
@@ -24,14 +24,40 @@ class IndividualConfig(EntityConfig):
 
 
 class Individual(Entity):
+    __slots__ = ('residence', '_expenses', 'expense_listener')
+
     def __init__(self, person_id: str, config: IndividualConfig):
         Entity.__init__(self, person_id, config)
-        self.config = config
         self.residence: Home = None
-        self.expenses: Dict[str, Expense] = dict()
+        self._expenses: Dict[str, Expense] = None
+        self.expense_listener: Callable[['Individual', str], None] = None
+
+    @property
+    def with_polymer(self) -> bool:
+        return self.config['with_polymer']
+
+    @with_polymer.setter
+    def with_polymer(self, with_polymer: bool) -> None:
+        self.config['with_polymer'] = with_polymer
+
+    @property
+    def expenses(self) -> Dict[str, Expense]:
+        if self._expenses is None:
+            self._expenses = dict()
+        return self._expenses
 
-    def get_income(self) -> None:
-        self.config['savings'] += (1 - self.config['income_tax']) * self.config['income']
+    @expenses.setter
+    def expenses(self, expenses: Dict[str, Expense]) -> None:
+        self._expenses = expenses if expenses else None
+
+    @property
+    def has_expenses(self) -> bool:
+        return bool(self._expenses)
+
+    def get_income(self) -> float:
+        income = (1 - self.config['income_tax']) * self.config['income']
+        self.config['savings'] += income
+        return income
 
     def add_expense(self, name: str, amount: float, yearly_payments: int, remove_after: int) -> None:
         self.expenses[name] = {
@@ -40,6 +66,9 @@ class Individual(Entity):
             'remove_after': remove_after
         }
 
+        if self.expense_listener is not None:
+            self.expense_listener(self, name)
+
     def remove_expense(self, name: str):
         assert name in self.expenses, f"{self.entity_id} does not currently pay for expense {name}"
 
@@ -0,0 +1,134 @@
+from functools import lru_cache
+from typing import Any, Dict, List, Tuple
+import numpy as np
+
+LOAN_COLUMNS = {
+    'principal': np.float64,
+    'rate': np.float64,
+    'term': np.int64,
+    'months_elapsed': np.int64,
+    'payment': np.float64,
+    'balance': np.float64,
+}
+
+
+@lru_cache(maxsize=4096)
+def monthly_payment(amount: float, loan_term: int, interest: float) -> float:
+    monthly_interest = interest / 12
+    loan_term_months = loan_term * 12
+    if monthly_interest == 0:
+        return amount / loan_term_months
+
+    return amount * (monthly_interest / (1 - (1 + monthly_interest)**(-loan_term_months)))
+
+
+@lru_cache(maxsize=256)
+def amortization_schedule(amount: float, loan_term: int, interest: float) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    months = np.arange(1, loan_term * 12 + 1)
+    payment = monthly_payment(amount, loan_term, interest)
+    balance = remaining_balance(np.full(len(months), amount), np.full(len(months), interest),
+                                np.full(len(months), loan_term), np.full(len(months), payment), months)
+    principal = np.diff(balance, prepend=amount) * -1
+    interest_paid = payment - principal
+
+    for values in (interest_paid, principal, balance):
+        values.flags.writeable = False
+    return interest_paid, principal, balance
+
+
+def remaining_balance(principal: np.ndarray, rate: np.ndarray, term: np.ndarray, payment: np.ndarray,
+                      months: np.ndarray) -> np.ndarray:
+    monthly_interest = rate / 12
+    growth = (1 + monthly_interest) ** months
+    with np.errstate(divide='ignore', invalid='ignore'):
+        amortized = principal * growth - payment * (growth - 1) / monthly_interest
+    balance = np.where(monthly_interest > 0, amortized, principal - payment * months)
+
+    return np.where(months >= term * 12, 0, np.maximum(balance, 0))
+
+
+class LoanBook:
+    def __init__(self, capacity: int = 1024):
+        self.capacity = max(capacity, 1)
+        self.size = 0
+        self.borrower_ids: List[str] = []
+        self.borrower_loans: Dict[str, List[int]] = dict()
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.zeros(self.capacity, dtype=dtype) for name, dtype in LOAN_COLUMNS.items()
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name][:self.size]
+
+    def add_loan(self, borrower_id: str, amount: float, loan_term: int, interest: float) -> int:
+        if self.size == self.capacity:
+            self.capacity *= 2
+            for name, values in self.columns.items():
+                grown = np.zeros(self.capacity, dtype=values.dtype)
+                grown[:self.size] = values[:self.size]
+                self.columns[name] = grown
+
+        loan = self.size
+        self.columns['principal'][loan] = amount
+        self.columns['rate'][loan] = interest
+        self.columns['term'][loan] = loan_term
+        self.columns['months_elapsed'][loan] = 0
+        self.columns['payment'][loan] = monthly_payment(amount, loan_term, interest)
+        self.columns['balance'][loan] = amount
+        self.borrower_ids.append(borrower_id)
+        self.borrower_loans.setdefault(borrower_id, []).append(loan)
+        self.size += 1
+        return loan
+
+    def advance(self, months: int = 12) -> Tuple[np.ndarray, np.ndarray]:
+        elapsed = self.column('months_elapsed')
+        balance = self.column('balance')
+        paid_months = np.clip(self.column('term') * 12 - elapsed, 0, months)
+
+        elapsed += paid_months
+        new_balance = remaining_balance(self.column('principal'), self.column('rate'), self.column('term'),
+                                        self.column('payment'), elapsed)
+        principal_paid = balance - new_balance
+        interest_paid = self.column('payment') * paid_months - principal_paid
+        balance[:] = new_balance
+
+        return interest_paid, principal_paid
+
+    def active(self) -> np.ndarray:
+        return self.column('months_elapsed') < self.column('term') * 12
+
+    def schedule(self, loan: int) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return amortization_schedule(
+            self.columns['principal'][loan].item(),
+            self.columns['term'][loan].item(),
+            self.columns['rate'][loan].item(),
+        )
+
+    def balance_of(self, borrower_id: str) -> float:
+        return float(self.column('balance')[self.borrower_loans.get(borrower_id, [])].sum())
+
+    def debts(self, index: Dict[str, int], size: int) -> np.ndarray:
+        rows = np.fromiter((index.get(borrower_id, -1) for borrower_id in self.borrower_ids), dtype=np.int64,
+                           count=self.size)
+        known = rows >= 0
+        return np.bincount(rows[known], weights=self.column('balance')[known], minlength=size)
+
+    def copy_state(self) -> Dict[str, Any]:
+        return {
+            'borrower_ids': list(self.borrower_ids),
+            'columns': {name: values[:self.size].copy() for name, values in self.columns.items()},
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self.borrower_ids = list(state['borrower_ids'])
+        self.borrower_loans = dict()
+        for loan, borrower_id in enumerate(self.borrower_ids):
+            self.borrower_loans.setdefault(borrower_id, []).append(loan)
+        self.size = len(self.borrower_ids)
+        self.capacity = max(self.size, 1)
+        for name, dtype in LOAN_COLUMNS.items():
+            self.columns[name] = np.zeros(self.capacity, dtype=dtype)
+            self.columns[name][:self.size] = state['columns'][name]
@@ -0,0 +1,118 @@
+from typing import Any, Dict
+import numpy as np
+
+from sim_assets.env.EquityMatrix import EquityMatrix
+
+
+class BalanceSheet:
+    def __init__(self, matrix: EquityMatrix, capacity: int = 1024, rtol: float = 1e-10):
+        self.matrix = matrix
+        self.rtol = rtol
+        self.matrix.on_change = self.equity_changed
+        self.matrix.on_move = self.equity_moved
+
+        self.equity_values = np.zeros(max(capacity, 1), dtype=np.float64)
+        self.prop_vals = np.zeros(max(capacity, 1), dtype=np.float64)
+        self.owners = 0
+        self.homes = 0
+
+        self.total_equity = 0.0
+        self.money_supply = 0.0
+        self.home_savings = 0.0
+
+    def _grow(self, name: str, size: int) -> None:
+        values = getattr(self, name)
+        if size > len(values):
+            grown = np.zeros(max(size, 2 * len(values)), dtype=values.dtype)
+            grown[:len(values)] = values
+            setattr(self, name, grown)
+
+    def add_owner(self, savings: float) -> None:
+        self._grow('equity_values', self.owners + 1)
+        self.owners += 1
+        self.money_supply += savings
+
+    def add_home(self, prop_val: float, savings: float) -> None:
+        self._grow('prop_vals', self.homes + 1)
+        self.prop_vals[self.homes] = prop_val
+        self.homes += 1
+        self.money_supply += savings
+        self.home_savings += savings
+
+    def add_reserve(self, savings: float) -> None:
+        self.money_supply += savings
+
+    def equity_changed(self, owner: int, home: int, delta: float) -> None:
+        value = delta * self.prop_vals[home].item()
+        self.equity_values[owner] += value
+        self.total_equity += value
+
+    def equity_moved(self, owners: np.ndarray, homes: np.ndarray, deltas: np.ndarray) -> None:
+        values = deltas * self.prop_vals[homes]
+        np.add.at(self.equity_values, owners, values)
+        self.total_equity += float(values.sum())
+
+    def credit_income(self, amount: float) -> None:
+        self.money_supply += amount
+
+    def appreciate(self, rate: float) -> None:
+        equity_values = self.equity_values[:self.owners]
+        prop_vals = self.prop_vals[:self.homes]
+        equity_values += rate * equity_values
+        prop_vals += rate * prop_vals
+        self.total_equity += rate * self.total_equity
+
+    def revalue(self, prop_vals: np.ndarray) -> int:
+        # lazy growth compounds in closed form while appreciate() compounds yearly, so the two only agree to rounding
+        changed = np.flatnonzero(~np.isclose(prop_vals, self.prop_vals[:self.homes], rtol=self.rtol, atol=0))
+        if len(changed) == 0:
+            return 0
+
+        delta = np.zeros(self.homes, dtype=np.float64)
+        delta[changed] = prop_vals[changed] - self.prop_vals[changed]
+        nnz = self.matrix.nnz
+        weights = self.matrix.values[:nnz] * delta[self.matrix.cols[:nnz]]
+        self.equity_values[:self.owners] += np.bincount(self.matrix.rows[:nnz], weights=weights,
+                                                        minlength=self.owners)
+        self.total_equity += float(weights.sum())
+        self.prop_vals[changed] = prop_vals[changed]
+        return len(changed)
+
+    def net_worths(self, savings: np.ndarray) -> np.ndarray:
+        return savings + self.equity_values[:self.owners]
+
+    def total_savings(self, reserves: float) -> float:
+        return self.money_supply - reserves - self.home_savings
+
+    def resync(self, prop_vals: np.ndarray, money_supply: float, home_savings: float) -> None:
+        self.owners = len(self.matrix.owner_ids)
+        self.homes = len(self.matrix.home_ids)
+        self._grow('equity_values', self.owners)
+        self._grow('prop_vals', self.homes)
+
+        self.prop_vals[:self.homes] = prop_vals
+        self.equity_values[:self.owners] = self.matrix.equity_values(prop_vals)
+        self.total_equity = float(self.equity_values[:self.owners].sum())
+        self.money_supply = money_supply
+        self.home_savings = home_savings
+
+    def copy_state(self) -> Dict[str, Any]:
+        return {
+            'equity_values': self.equity_values[:self.owners].copy(),
+            'prop_vals': self.prop_vals[:self.homes].copy(),
+            'total_equity': self.total_equity,
+            'money_supply': self.money_supply,
+            'home_savings': self.home_savings,
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self.owners = len(state['equity_values'])
+        self.homes = len(state['prop_vals'])
+        self._grow('equity_values', self.owners)
+        self._grow('prop_vals', self.homes)
+
+        self.equity_values[:self.owners] = state['equity_values']
+        self.prop_vals[:self.homes] = state['prop_vals']
+        self.total_equity = state['total_equity']
+        self.money_supply = state['money_supply']
+        self.home_savings = state['home_savings']
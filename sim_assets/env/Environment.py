@@ -1,9 +1,30 @@
-from typing import Dict, TypedDict, List
+from typing import Any, AsyncIterator, ContextManager, Dict, Iterable, Iterator, TypedDict, List, Optional, Set
+import asyncio
+import contextlib
+import copy
+import itertools
 import json
+import numpy as np
 
-from sim_assets.entities.Individual import Individual
+from sim_assets.entities.Entity import Entity, EntityConfig
+from sim_assets.entities.Individual import Individual, Expense
 from sim_assets.entities.Home import Home
 from sim_assets.entities.Bank import Bank
+from sim_assets.env.EquityMatrix import EquityMatrix, HomeMap
+from sim_assets.env.BalanceSheet import BalanceSheet
+from sim_assets.env.EquityMarket import EquityMarket, TradeBatch
+from sim_assets.env.OwnershipIndex import OwnershipIndex
+from sim_assets.env.FastForward import IndependentBlock
+from sim_assets.env.MarketPaths import MarketPaths
+from sim_assets.env.YearStream import YearStream, END_OF_RUN
+from sim_assets.env.EventCalendar import EventCalendar, EXPENSE_PAYMENT, EXPENSE_EXPIRY
+from sim_assets.records.DistributionStats import StatsLog
+from sim_assets.records.LogStore import LogStore, LogColumns
+from sim_assets.records.Ledger import Ledger, RENT, HOME_PURCHASE, EQUITY_PURCHASE, EQUITY_CONTRIBUTION
+from sim_assets.records.Profiler import Profiler
+from sim_assets.records.ResultCache import ResultCache, fingerprint
+
+NO_PHASE = contextlib.nullcontext()
 
 
 class TaxBracket(TypedDict):
@@ -35,35 +56,84 @@ class Log(TypedDict):
     individuals: Dict[str, IndividualLogs]
 
 
+class EnvironmentSnapshot(TypedDict):
+    year: int
+    config: EnvironmentConfig
+    homes: List[Home]
+    homeowners: List[Individual]
+    renters: List[Individual]
+    configs: Dict[str, Any]
+    expenses: Dict[str, Dict[str, Expense]]
+    residences: Dict[str, Home]
+    rentals_map: Dict[str, Individual]
+    equity: Dict[str, Any]
+    balances: Dict[str, Any]
+    bank: EntityConfig
+    loans: Dict[str, Any]
+    market: Dict[str, Any]
+    garbage: EntityConfig
+    logs: int
+
+
 class Environment:
-    def __init__(self, env_id, config: EnvironmentConfig):
+    def __init__(self, env_id, config: EnvironmentConfig, ledger: Ledger = None, log_store: LogStore = None,
+                 profiler: Profiler = None, stats_log: StatsLog = None):
         self.env_id = env_id
         self.config = config
+        self.year = 0
+        self.ledger: Ledger = ledger if ledger is not None else Ledger()
+        self.log_store: LogStore = log_store
+        self.profiler: Profiler = profiler
+        self.stats_log: StatsLog = stats_log
 
         self.homes: Dict[str, Home] = dict()
         self.homeowners: Dict[str, Individual] = dict()
         self.renters: Dict[str, Individual] = dict()
         self.bank: Bank = Bank(self.env_id + "-bank")
-
-        self.home_map: Dict[str, Dict[str, float]] = dict()
+        self.garbage: Bank = Bank(self.env_id + "-garbage")
+        self.bank.ledger = self.ledger
+        self.garbage.ledger = self.ledger
+
+        self.equity: EquityMatrix = EquityMatrix()
+        self.ownership: OwnershipIndex = OwnershipIndex(self.equity, self.homeowners)
+        self.balances: BalanceSheet = BalanceSheet(self.equity)
+        self.balances.add_reserve(self.bank.savings + self.garbage.savings)
+        self.market: EquityMarket = EquityMarket(self.equity)
         self.rentals_map: Dict[str, Individual] = dict()
+        self.calendar: EventCalendar = EventCalendar()
+        self.expenses_due: Dict[str, int] = dict()
+        self.market_paths: MarketPaths = None
 
         self.logs: List[Log] = []
 
+    @property
+    def home_map(self) -> HomeMap:
+        return HomeMap(self.equity)
+
     @classmethod
-    def from_json(cls, env_id: str, filename: str) -> 'Environment':
+    def from_json(cls, env_id: str, filename: str, **kwargs) -> 'Environment':
         with open(filename) as f:
             config: EnvironmentConfig = json.load(f)
-            return Environment(env_id, config)
+            return cls(env_id, config, **kwargs)
 
     def add_home(self, home: Home) -> None:
         assert home.entity_id not in self.homes, f"Home {home.entity_id} is already part of this environment"
         self.homes[home.entity_id] = home
-        self.home_map[home.entity_id] = dict()
+        self.equity.add_home(home.entity_id)
+        self.balances.add_home(home.config['prop_val'], home.config.get('savings', 0))
+        home.ledger = self.ledger
 
     def add_homeowner(self, owner: Individual) -> None:
-        assert owner.entity_id not in self.homes, f"Homeowner {owner.entity_id} is already part of this environment"
+        if self.renters.get(owner.entity_id) is owner:
+            return
+
+        assert owner.entity_id not in self.homeowners, \
+            f"Homeowner {owner.entity_id} is already part of this environment"
         self.homeowners[owner.entity_id] = owner
+        self.equity.add_owner(owner.entity_id)
+        self.balances.add_owner(owner.config['savings'])
+        owner.ledger = self.ledger
+        self.track_expenses(owner)
 
     def add_renter(self, renter: Individual) -> None:
         assert renter.entity_id not in self.renters, f"Renter {renter.entity_id} is already part of this environment"
@@ -71,6 +141,22 @@ class Environment:
 
         if renter.entity_id not in self.homeowners:
             self.homeowners[renter.entity_id] = renter
+            self.equity.add_owner(renter.entity_id)
+            self.balances.add_owner(renter.config['savings'])
+            renter.ledger = self.ledger
+            self.track_expenses(renter)
+
+    def add_homes(self, homes: Iterable[Home]) -> None:
+        for home in homes:
+            self.add_home(home)
+
+    def add_homeowners(self, owners: Iterable[Individual]) -> None:
+        for owner in owners:
+            self.add_homeowner(owner)
+
+    def add_renters(self, renters: Iterable[Individual]) -> None:
+        for renter in renters:
+            self.add_renter(renter)
 
     def rent(self, renter: Individual, home: Home) -> None:
         assert renter.entity_id in self.renters, f"Renter {renter.entity_id} is not a part of the environment"
@@ -88,54 +174,588 @@ class Environment:
         if renter.residence != home:
             return
 
-        for owner_key in self.home_map[home.entity_id]:
-            owner = self.homeowners[owner_key]
-            if owner.entity_id == renter.entity_id:
-                continue
+        payees, shares = self.ownership.payout(home.entity_id, renter.entity_id)
+        for owner, amount in zip(payees, (shares * home.config['rent']).tolist()):
+            self.transfer(renter, owner, amount, RENT)
 
-            equity = self.home_map[home.entity_id][owner_key]
-            renter.pay(equity * home.config['rent'], owner, "rent")
+    def transfer(self, payer: Entity, payee: Entity, amount: float, reason: str) -> None:
+        amount = payer.pay(amount, payee, reason)
+        if self.profiler is not None:
+            self.profiler.record_pay(payer.entity_id, payee.entity_id, amount)
 
     def get_equity_in_home(self, owner: Individual, home: Home) -> float:
         assert owner.entity_id in self.homeowners, f"{owner.entity_id} is not a part of the environment"
 
-        if owner.entity_id not in self.home_map[home.entity_id]:
-            return 0
-
-        return self.home_map[home.entity_id][owner.entity_id]
+        return self.equity.get(owner.entity_id, home.entity_id)
 
     def purchase_home(self, purchaser: Individual, home: Home) -> None:
         assert purchaser.entity_id in self.homeowners, f"{purchaser.entity_id} is not a part of the environment"
 
-        if len(self.home_map[home.entity_id]) == 0:
-            purchaser.pay(home.config['prop_val'], self.bank, f"purchasing home {home}")
-            self.home_map[home.entity_id][purchaser.entity_id] = 1
+        owners = self.ownership.owners_of(home.entity_id)[0]
+        if len(owners) == 0:
+            self.transfer(purchaser, self.bank, home.config['prop_val'], HOME_PURCHASE)
+            self.equity.set(purchaser.entity_id, home.entity_id, 1)
             return
 
-        if purchaser.entity_id not in self.home_map[home.entity_id]:
-            self.home_map[home.entity_id][purchaser.entity_id] = 0
+        if not self.equity.has(purchaser.entity_id, home.entity_id):
+            self.equity.set(purchaser.entity_id, home.entity_id, 0)
 
-        for owner_key in self.home_map[home.entity_id]:
-            if owner_key == purchaser.entity_id:
+        for owner in owners:
+            if owner.entity_id == purchaser.entity_id:
                 continue
 
-            owner = self.homeowners[owner_key]
             self.purchase_home_equity(owner, purchaser, home)
 
-    def purchase_home_equity(self, seller: Individual, purchaser: Individual, home: Home, percent_of_equity: float = 1) -> None:
+    def purchase_home_equity(self, seller: Individual, purchaser: Individual, home: Home, percent_of_equity: float = 1,
+                             price: float = None) -> None:
         assert seller.entity_id in self.homeowners, f"{seller.entity_id} is not a part of the environment"
         assert purchaser.entity_id in self.homeowners, f"{purchaser.entity_id} is not a part of the environment"
-        assert seller.entity_id in self.home_map[home.entity_id], f"{seller.entity_id} does not own home {home.entity_id}"
+        assert self.equity.has(seller.entity_id, home.entity_id), f"{seller.entity_id} does not own home {home.entity_id}"
         assert percent_of_equity >= 0, f"Must purchase a non-negative amount of equity"
 
-        amount = percent_of_equity * self.home_map[home.entity_id][seller.entity_id] * home.config['prop_val']
-        purchaser.pay(amount, seller, f"{percent_of_equity * self.home_map[home.entity_id][seller.entity_id]} equity in home {home.entity_id}")
-        if purchaser.entity_id not in self.home_map[home.entity_id]:
-            self.home_map[home.entity_id][purchaser.entity_id] = 0
+        price = price if price is not None else home.config['prop_val']
+        equity = percent_of_equity * self.equity.get(seller.entity_id, home.entity_id)
+        self.transfer(purchaser, seller, equity * price, EQUITY_PURCHASE)
+        self.equity.transfer(seller.entity_id, purchaser.entity_id, home.entity_id, equity)
+
+    def progress_one_year(self) -> Optional[Log]:
+        self.step()
+        return self.log_columns(self.make_log_columns())
+
+    def run(self, years: int, prefetch: int = 0) -> Iterator[Optional[Log]]:
+        if prefetch <= 0:
+            for _ in range(years):
+                yield self.progress_one_year()
+            return
+
+        stream = YearStream(self.progress_one_year, years, prefetch)
+        try:
+            for log in iter(stream.get, END_OF_RUN):
+                yield log
+        finally:
+            stream.close()
+
+    async def run_async(self, years: int, prefetch: int = 1) -> AsyncIterator[Optional[Log]]:
+        loop = asyncio.get_running_loop()
+        stream = YearStream(self.progress_one_year, years, max(prefetch, 1))
+        try:
+            while True:
+                log = await loop.run_in_executor(None, stream.get)
+                if log is END_OF_RUN:
+                    return
+                yield log
+        finally:
+            await loop.run_in_executor(None, stream.close)
+
+    def progress_years(self, years: int) -> List[Optional[Log]]:
+        independent = self.find_independent()
+        if self.ledger.level or not independent.any():
+            return [self.progress_one_year() for _ in range(years)]
+
+        rows = np.flatnonzero(independent)
+        block = self.make_independent_block(rows)
+        skip = {individual.entity_id for individual in block.individuals}
+        active = ~independent
+
+        logs = []
+        for _ in range(years):
+            self.step(active, skip, block)
+            savings = self.get_savings().copy()
+            savings[rows] = block.savings
+            logs.append(self.log_columns(self.make_log_columns(savings)))
+
+        self.set_individual_column('savings', rows, block.savings)
+        self.set_individual_column('income', rows, block.income)
+        self.set_individual_column('income_tax', rows, block.income_tax)
+        block.write_back()
+        self.rebuild_calendar()
+        return logs
+
+    def make_independent_block(self, rows: np.ndarray) -> IndependentBlock:
+        individuals = list(self.homeowners.values())
+        return IndependentBlock(
+            [individuals[row] for row in rows.tolist()],
+            rows,
+            self.get_individual_column('savings')[rows],
+            self.get_individual_column('income')[rows],
+            self.get_individual_column('income_tax')[rows],
+            self.get_individual_column('inc_growth_rate')[rows],
+        )
+
+    def find_independent(self) -> np.ndarray:
+        interacting = set()
+        for renter in self.renters.values():
+            home = renter.residence
+            if home is None:
+                continue
+
+            interacting.add(renter.entity_id)
+            owners, equities = self.ownership.owners_of(home.entity_id)
+            interacting.update(owner.entity_id for owner, equity in zip(owners, equities.tolist()) if equity != 0)
+        interacting.update(self.market.traders())
+
+        return np.fromiter((owner_id not in interacting for owner_id in self.homeowners), dtype=np.bool_,
+                           count=len(self.homeowners))
+
+    def step(self, active: np.ndarray = None, skip: Set[str] = None, block: IndependentBlock = None) -> None:
+        self.year += 1
+        self.ledger.year = self.year
+        if self.profiler is not None:
+            self.profiler.begin_year(self.year)
+
+        individuals = len(self.homeowners) if active is None else int(np.count_nonzero(active))
+        with self.phase('collect_incomes', individuals):
+            self.collect_incomes(active)
+        with self.phase('process_expenses'):
+            self.process_expenses(skip)
+        with self.phase('advance_loans', len(self.bank.loans)):
+            self.bank.advance_loans()
+        with self.phase('process_rent'):
+            self.process_rent()
+        with self.phase('appreciate_income', individuals):
+            self.appreciate_income(active)
+        with self.phase('appreciate_homes', len(self.homes)):
+            self.appreciate_homes()
+        with self.phase('contribute_equities'):
+            self.contribute_equities()
+        if len(self.market):
+            with self.phase('clear_equity_market', len(self.market)):
+                self.clear_equity_market()
+
+        if block is not None:
+            with self.phase('fast_forward', len(block.individuals)):
+                self.fast_forward(block)
+
+        if self.profiler is not None:
+            self.profiler.end_year()
+
+    def phase(self, name: str, scope: int = 0) -> ContextManager:
+        if self.profiler is None:
+            return NO_PHASE
+
+        return self.profiler.phase(name, scope)
+
+    def fast_forward(self, block: IndependentBlock) -> None:
+        if self.market_paths is not None:
+            block.inc_growth_rate = self.market_paths.inc_growth_rates[self.market_paths.index(self.year)][block.rows]
+        paid = block.advance_year(self.get_tax_brackets)
+        self.garbage.config['savings'] += paid
+        self.balances.credit_income(block.income_credited)
+        if self.profiler is not None:
+            self.profiler.record_batch(block.pay_calls, paid)
+
+    def active_individuals(self, active: np.ndarray = None) -> Iterable[Individual]:
+        if active is None:
+            return self.homeowners.values()
+
+        return itertools.compress(self.homeowners.values(), active.tolist())
+
+    def log_columns(self, columns: LogColumns) -> Optional[Log]:
+        if self.stats_log is not None:
+            self.stats_log.append(columns, self.get_homeowning(), self.get_individual_column('with_polymer') != 0)
+        if self.log_store is not None:
+            self.log_store.append(columns)
+        if self.stats_log is not None or self.log_store is not None:
+            return None
+
+        log = self.make_log(columns)
+        self.logs.append(log)
+        return log
+
+    def make_log_columns(self, savings: np.ndarray = None) -> LogColumns:
+        savings = self.get_savings().copy() if savings is None else savings
+        prop_vals = self.get_prop_vals().copy()
+        self.balances.revalue(prop_vals)
+        return {
+            'year': self.year,
+            'individual_ids': list(self.homeowners),
+            'net_worth': self.balances.net_worths(savings) - self.get_debts(),
+            'savings': savings,
+            'home_ids': list(self.homes),
+            'prop_val': prop_vals,
+            'rent': self.get_rents().copy(),
+        }
+
+    def make_log(self, columns: LogColumns) -> Log:
+        log: Log = {
+            'homes': dict(),
+            'individuals': dict(),
+        }
+
+        for home_id, prop_val, rent in zip(columns['home_ids'], columns['prop_val'].tolist(), columns['rent'].tolist()):
+            log['homes'][home_id] = {'prop_val': prop_val, 'rent': rent}
+        for individual_id, net_worth, savings in zip(columns['individual_ids'], columns['net_worth'].tolist(),
+                                                     columns['savings'].tolist()):
+            log['individuals'][individual_id] = {'net_worth': net_worth, 'savings': savings}
+
+        return log
+
+    def collect_incomes(self, active: np.ndarray = None) -> None:
+        income = 0.0
+        for individual in self.active_individuals(active):
+            income += individual.get_income()
+
+        self.balances.credit_income(income)
+
+    def track_expenses(self, individual: Individual) -> None:
+        individual.expense_listener = self.schedule_expense
+        if individual.has_expenses:
+            for name in individual.expenses:
+                self.schedule_expense(individual, name)
+
+    def schedule_expense(self, individual: Individual, name: str) -> None:
+        expense = individual.expenses[name]
+        if expense['remove_after'] >= 0:
+            self.calendar.schedule(self.year + expense['remove_after'], EXPENSE_EXPIRY, individual.entity_id, name)
+
+        if expense['remove_after'] != 0 and individual.entity_id not in self.expenses_due:
+            self.expenses_due[individual.entity_id] = self.year + 1
+            self.calendar.schedule(self.year + 1, EXPENSE_PAYMENT, individual.entity_id)
+
+    def rebuild_calendar(self) -> None:
+        self.calendar.clear()
+        self.expenses_due.clear()
+        for individual in self.homeowners.values():
+            if individual.has_expenses:
+                for name in individual.expenses:
+                    self.schedule_expense(individual, name)
+
+    def process_expenses(self, skip: Set[str] = None) -> None:
+        for event in self.calendar.pop_due(self.year):
+            individual = self.homeowners.get(event.entity_id)
+            if individual is None or (skip is not None and event.entity_id in skip):
+                self.expenses_due.pop(event.entity_id, None)
+                continue
+
+            if event.kind == EXPENSE_PAYMENT:
+                del self.expenses_due[event.entity_id]
+                self.pay_expenses(individual)
+            else:
+                self.expire_expense(individual, event.name)
+
+    def pay_expenses(self, individual: Individual) -> None:
+        recurring = False
+        for expense_key, expense in individual.expenses.items():
+            if expense['remove_after'] == 0:
+                continue
+
+            self.transfer(individual, self.garbage, expense['amount'] * expense['yearly_payments'], expense_key)
+            if expense['remove_after'] > 0:
+                expense['remove_after'] -= 1
+            recurring = recurring or expense['remove_after'] != 0
+
+        if recurring:
+            self.expenses_due[individual.entity_id] = self.year + 1
+            self.calendar.schedule(self.year + 1, EXPENSE_PAYMENT, individual.entity_id)
+
+    def expire_expense(self, individual: Individual, name: str) -> None:
+        expense = individual.expenses.get(name)
+        if expense is not None and expense['remove_after'] == 0:
+            individual.remove_expense(name)
+
+    def process_rent(self) -> None:
+        for renter in self.renters.values():
+            if renter.residence is None:
+                continue
+
+            self.collect_rent(renter, renter.residence)
+
+    def use_market_paths(self, paths: Optional[MarketPaths]) -> None:
+        if paths is not None:
+            assert paths.home_ids == list(self.homes) and paths.individual_ids == list(self.homeowners), \
+                f"Market paths do not cover the homes and individuals of environment {self.env_id}"
+        self.market_paths = paths
+
+    def apply_income_paths(self) -> None:
+        if self.market_paths is None:
+            return
+
+        rates = self.market_paths.inc_growth_rates[self.market_paths.index(self.year)]
+        self.set_individual_column('inc_growth_rate', np.arange(len(rates)), rates)
+
+    def appreciate_income(self, active: np.ndarray = None) -> None:
+        self.apply_income_paths()
+        for individual in self.active_individuals(active):
+            self.appreciate_ind_income(individual)
 
-        original_seller_equity = self.home_map[home.entity_id][seller.entity_id]
-        self.home_map[home.entity_id][seller.entity_id] -= percent_of_equity * original_seller_equity
-        self.home_map[home.entity_id][purchaser.entity_id] += percent_of_equity * original_seller_equity
+    def appreciate_ind_income(self, individual: Individual) -> None:
+        individual.config['income'] += individual.config['inc_growth_rate'] * individual.config['income']
+        individual.config['income_tax'] = self.get_tax_bracket(individual.config['income'])
+
+    def get_tax_bracket(self, income: float) -> float:
+        for bracket in self.config['tax_brackets']:
+            if income <= bracket['max_amount']:
+                return bracket['tax']
+
+        assert False, f"Income {income} is above every tax bracket in environment {self.env_id}"
+
+    def get_tax_brackets(self, income: np.ndarray) -> np.ndarray:
+        return np.fromiter((self.get_tax_bracket(value) for value in income.tolist()), dtype=np.float64,
+                           count=len(income))
+
+    def appreciate_homes(self) -> None:
+        if self.market_paths is not None:
+            index = self.market_paths.index(self.year)
+            self.appreciate_homes_by(self.market_paths.appr_rates[index], self.market_paths.rent_rates[index])
+            return
+
+        for home in self.homes.values():
+            home.config['prop_val'] += self.config['home_appr_rate'] * home.config['prop_val']
+            home.config['rent'] += self.config['home_appr_rate'] * home.config['rent']
+
+        self.balances.appreciate(self.config['home_appr_rate'])
+
+    def appreciate_homes_by(self, appr_rates: np.ndarray, rent_rates: np.ndarray) -> None:
+        for home, appr_rate, rent_rate in zip(self.homes.values(), appr_rates.tolist(), rent_rates.tolist()):
+            home.config['prop_val'] += appr_rate * home.config['prop_val']
+            home.config['rent'] += rent_rate * home.config['rent']
+
+        self.balances.revalue(self.get_prop_vals())
+
+    def contribute_equities(self) -> None:
+        for renter in self.renters.values():
+            home = renter.residence
+            if home is None or not renter.config['with_polymer']:
+                continue
+
+            renter_equity = self.equity.get(renter.entity_id, home.entity_id)
+            if renter_equity >= 1:
+                continue
+
+            amount_to_contr = renter.config['equity_contr'] * renter.config['savings']
+            equity_to_contr = min(amount_to_contr / (home.config['prop_val'] * 1.1), 1 - renter_equity)
+
+            payees, shares = self.ownership.payout(home.entity_id, renter.entity_id)
+            equities_to_take = np.minimum(equity_to_contr * (shares / (1 - renter_equity)), shares)
+            for owner, equity_to_take in zip(payees, equities_to_take.tolist()):
+                self.transfer(renter, owner, equity_to_take * home.config['prop_val'] * 1.1, EQUITY_CONTRIBUTION)
+                self.equity.transfer(owner.entity_id, renter.entity_id, home.entity_id, equity_to_take)
+
+    def clear_equity_market(self) -> TradeBatch:
+        trades = self.market.clear(self.get_savings())
+        self.execute_trades(trades)
+        return trades
+
+    def execute_trades(self, trades: TradeBatch) -> None:
+        individuals = list(self.homeowners.values())
+        homes = list(self.homes.values())
+        for buyer, seller, home, quantity, price in zip(trades['buyer'].tolist(), trades['seller'].tolist(),
+                                                       trades['home'].tolist(), trades['quantity'].tolist(),
+                                                       trades['price'].tolist()):
+            if buyer == seller:
+                continue
+
+            seller, buyer, home = individuals[seller], individuals[buyer], homes[home]
+            held = self.equity.get(seller.entity_id, home.entity_id)
+            self.purchase_home_equity(seller, buyer, home, min(quantity / held, 1), price)
+
+    def get_individual_column(self, name: str) -> np.ndarray:
+        return np.fromiter((owner.config[name] for owner in self.homeowners.values()), dtype=np.float64,
+                           count=len(self.homeowners))
+
+    def set_individual_column(self, name: str, rows: np.ndarray, values: np.ndarray) -> None:
+        individuals = list(self.homeowners.values())
+        for row, value in zip(rows.tolist(), values.tolist()):
+            individuals[row].config[name] = value
+
+    def get_savings(self) -> np.ndarray:
+        return self.get_individual_column('savings')
+
+    def get_prop_vals(self) -> np.ndarray:
+        return np.fromiter((home.config['prop_val'] for home in self.homes.values()), dtype=np.float64,
+                           count=len(self.homes))
+
+    def get_rents(self) -> np.ndarray:
+        return np.fromiter((home.config['rent'] for home in self.homes.values()), dtype=np.float64,
+                           count=len(self.homes))
+
+    def get_homeowning(self) -> np.ndarray:
+        nnz = self.equity.nnz
+        owned = np.bincount(self.equity.rows[:nnz], weights=self.equity.values[:nnz] > 0, minlength=len(self.homeowners))
+        return owned > 0
+
+    def get_debts(self) -> np.ndarray:
+        return self.bank.loans.debts(self.equity.owner_index, len(self.homeowners))
+
+    def get_net_worths(self) -> np.ndarray:
+        self.balances.revalue(self.get_prop_vals())
+        return self.balances.net_worths(self.get_savings()) - self.get_debts()
+
+    def get_total_equity(self) -> float:
+        return self.balances.total_equity
+
+    def get_money_supply(self) -> float:
+        return self.balances.money_supply
+
+    def get_total_savings(self) -> float:
+        return self.balances.total_savings(self.bank.config['savings'] + self.garbage.config['savings'])
+
+    def count_money(self) -> float:
+        home_savings = sum(home.config.get('savings', 0) for home in self.homes.values())
+        return float(self.get_savings().sum()) + home_savings + self.bank.config['savings'] + \
+            self.garbage.config['savings']
+
+    def resync_balances(self) -> None:
+        home_savings = sum(home.config.get('savings', 0) for home in self.homes.values())
+        self.balances.resync(self.get_prop_vals(), self.count_money(), home_savings)
+
+    def check_balances(self, rtol: float = 1e-9) -> None:
+        money_supply = self.count_money()
+        assert np.isclose(self.balances.money_supply, money_supply, rtol=rtol), \
+            f"Money supply drifted to {self.balances.money_supply}, the environment holds {money_supply}"
+
+        prop_vals = self.get_prop_vals()
+        self.balances.revalue(prop_vals)
+        equity_values = self.equity.equity_values(prop_vals)
+        assert np.allclose(self.balances.equity_values[:len(equity_values)], equity_values, rtol=rtol), \
+            f"Incremental equity values drifted from the equity matrix in environment {self.env_id}"
+        assert np.isclose(self.balances.total_equity, equity_values.sum(), rtol=rtol), \
+            f"Total equity drifted to {self.balances.total_equity}, the equity matrix holds {equity_values.sum()}"
+
+    def get_net_worth(self, individual: Individual) -> float:
+        net_worth = individual.config['savings']
+        for home_id in self.ownership.homes_of(individual.entity_id):
+            net_worth += self.equity.get(individual.entity_id, home_id) * self.homes[home_id].config['prop_val']
+
+        return net_worth - self.bank.loans.balance_of(individual.entity_id)
+
+    def snapshot(self) -> EnvironmentSnapshot:
+        individuals = list(self.homeowners.values())
+        return {
+            'year': self.year,
+            'config': copy.deepcopy(self.config),
+            'homes': list(self.homes.values()),
+            'homeowners': individuals,
+            'renters': list(self.renters.values()),
+            'configs': self.capture_configs(),
+            'expenses': {
+                individual.entity_id: {name: dict(expense) for name, expense in individual.expenses.items()}
+                for individual in individuals if individual.has_expenses
+            },
+            'residences': {
+                individual.entity_id: individual.residence
+                for individual in individuals if individual.residence is not None
+            },
+            'rentals_map': dict(self.rentals_map),
+            'equity': self.equity.copy_state(),
+            'balances': self.balances.copy_state(),
+            'bank': dict(self.bank.config),
+            'loans': self.bank.loans.copy_state(),
+            'market': self.market.copy_state(),
+            'garbage': dict(self.garbage.config),
+            'logs': len(self.logs),
+        }
+
+    def restore(self, snapshot: EnvironmentSnapshot) -> None:
+        self.year = snapshot['year']
+        self.ledger.year = self.year
+        self.config.clear()
+        self.config.update(copy.deepcopy(snapshot['config']))
+
+        self.homes.clear()
+        self.homes.update((home.entity_id, home) for home in snapshot['homes'])
+        self.homeowners.clear()
+        self.homeowners.update((individual.entity_id, individual) for individual in snapshot['homeowners'])
+        self.renters.clear()
+        self.renters.update((renter.entity_id, renter) for renter in snapshot['renters'])
+        self.restore_configs(snapshot['configs'])
+
+        for individual in self.homeowners.values():
+            expenses = snapshot['expenses'].get(individual.entity_id, dict())
+            individual.expenses = {name: dict(expense) for name, expense in expenses.items()}
+            individual.residence = snapshot['residences'].get(individual.entity_id)
+
+        self.rentals_map.clear()
+        self.rentals_map.update(snapshot['rentals_map'])
+        self.equity.restore_state(snapshot['equity'])
+        self.ownership.reset()
+        self.rebuild_calendar()
+
+        self.bank.config.update(snapshot['bank'])
+        self.bank.loans.restore_state(snapshot['loans'])
+        self.market.restore_state(snapshot['market'])
+        self.garbage.config.update(snapshot['garbage'])
+        self.balances.restore_state(snapshot['balances'])
+        del self.logs[snapshot['logs']:]
+        if self.stats_log is not None:
+            self.stats_log.truncate(self.year)
+
+    def cache_state(self) -> Dict[str, Any]:
+        snapshot: Dict[str, Any] = dict(self.snapshot())
+        del snapshot['logs']
+        for name in ('homes', 'homeowners', 'renters'):
+            snapshot[name] = [entity.entity_id for entity in snapshot[name]]
+        for name in ('residences', 'rentals_map'):
+            snapshot[name] = {entity_id: entity.entity_id for entity_id, entity in snapshot[name].items()}
+
+        return snapshot
+
+    def restore_cache_state(self, state: Dict[str, Any]) -> None:
+        snapshot: EnvironmentSnapshot = dict(state, logs=len(self.logs))
+        snapshot['homes'] = [self.homes[home_id] for home_id in state['homes']]
+        snapshot['homeowners'] = [self.homeowners[owner_id] for owner_id in state['homeowners']]
+        snapshot['renters'] = [self.homeowners[renter_id] for renter_id in state['renters']]
+        snapshot['residences'] = {owner_id: self.homes[home_id] for owner_id, home_id in state['residences'].items()}
+        snapshot['rentals_map'] = {
+            home_id: self.homeowners[renter_id] for home_id, renter_id in state['rentals_map'].items()
+        }
+        self.restore(snapshot)
+
+    def cache_key(self, seed: Any = None) -> str:
+        state = self.cache_state()
+        if self.market_paths is not None:
+            state['market_paths'] = vars(self.market_paths)
+
+        return fingerprint(type(self).__name__, state, seed)
+
+    def progress_years_cached(self, years: int, cache: ResultCache, seed: Any = None) -> List[Optional[Log]]:
+        key = self.cache_key(seed)
+        cached = cache.checkpoint(key, years)
+        columns = cache.load_columns(key, cached) if cached else []
+        if cached:
+            self.restore_cache_state(cache.load_state(key, cached))
+
+        logs = [self.log_columns(year_columns) for year_columns in columns]
+        for _ in range(cached, years):
+            self.step()
+            columns.append(self.make_log_columns())
+            logs.append(self.log_columns(columns[-1]))
+
+        if cached < years:
+            cache.store(key, columns, self.cache_state())
+        return logs
+
+    def capture_configs(self) -> Dict[str, Any]:
+        return {
+            'homes': {home_id: dict(home.config) for home_id, home in self.homes.items()},
+            'individuals': {owner_id: dict(owner.config) for owner_id, owner in self.homeowners.items()},
+        }
+
+    def restore_configs(self, configs: Dict[str, Any]) -> None:
+        for home_id, home in self.homes.items():
+            home.config.update(configs['homes'][home_id])
+        for owner_id, owner in self.homeowners.items():
+            owner.config.update(configs['individuals'][owner_id])
+
+    def spawn(self, env_id: str) -> 'Environment':
+        return type(self)(env_id, copy.deepcopy(self.config), Ledger(self.ledger.level))
+
+    def fork(self, env_id: str = None) -> 'Environment':
+        memo = {
+            id(self.logs): list(self.logs),
+            id(self.ledger): Ledger(self.ledger.level),
+            id(self.log_store): None,
+            id(self.profiler): None,
+            id(self.market_paths): self.market_paths,
+        }
+        forked = copy.deepcopy(self, memo)
+        if env_id is not None:
+            forked.env_id = env_id
+
+        return forked
+
+    def print_logs(self) -> None:
+        print(json.dumps(self.logs, indent=4))
 
 
 class EnvironmentOld:
@@ -176,14 +796,15 @@ class EnvironmentOld:
         purchaser.config['savings'] -= home.config['prop_val']
         self.home_map[home.entity_id] = {purchaser.entity_id: 1}
 
-        print(f"LOG: {purchaser.entity_id} purchased home {home.entity_id}")
+        if purchaser.ledger.level:
+            purchaser.ledger.record(purchaser.entity_id, home.entity_id, home.config['prop_val'], HOME_PURCHASE)
 
     def sell_home_equity(self, seller: Individual, purchaser: Individual, home: Home) -> None:
         assert seller.entity_id in self.home_map[home.entity_id], f"{seller.entity_id} does not own home {home.entity_id}"
 
         equity = self.home_map[home.entity_id][seller.entity_id]
         price = equity * home.config['prop_val']
-        purchaser.pay(price, seller, f"{equity} in {home.entity_id}")
+        purchaser.pay(price, seller, EQUITY_PURCHASE)
         self.home_map[home.entity_id][seller.entity_id] -= equity
         if purchaser.entity_id in self.home_map[home.entity_id]:
             self.home_map[home.entity_id][purchaser.entity_id] += equity
@@ -198,8 +819,6 @@ class EnvironmentOld:
         renter.residence = home
         self.home_map[home.entity_id][renter.entity_id] = 0
 
-        print(f"LOG: {renter.entity_id} is renting at home {home.entity_id}")
-
     def progress_one_year(self) -> Log:
         for owner in self.homeowners.values():
             owner.get_income()
@@ -240,11 +859,11 @@ class EnvironmentOld:
             owners_equity = self.home_map[home.entity_id]
             for owner_id in owners_equity:
                 owner = self.homeowners[owner_id]
-                renter.pay(owners_equity[owner_id] * home.config['rent'], owner, "rent")
+                renter.pay(owners_equity[owner_id] * home.config['rent'], owner, RENT)
 
     def process_expenses(self) -> None:
         for owner in self.homeowners.values():
-            for expense_key in owner.expenses:
+            for expense_key in list(owner.expenses):
                 expense = owner.expenses[expense_key]
                 if expense['remove_after'] == 0:
                     owner.remove_expense(expense_key)
@@ -281,11 +900,7 @@ class EnvironmentOld:
                     continue
 
                 equity_to_take = equity_to_contr * (owners_equity[owner_id] / (1 - owners_equity[renter.entity_id]))
-                renter.pay(
-                    equity_to_take * home.config['prop_val'] * 1.1,
-                    self.homeowners[owner_id],
-                    f"{equity_to_take} equity in home {home.entity_id}"
-                )
+                renter.pay(equity_to_take * home.config['prop_val'] * 1.1, self.homeowners[owner_id], EQUITY_CONTRIBUTION)
                 owners_equity[owner_id] -= equity_to_take
                 owners_equity[renter.entity_id] += equity_to_take
 
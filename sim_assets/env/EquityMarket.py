@@ -0,0 +1,263 @@
+from typing import Any, Dict, Set, Tuple, TypedDict
+import numpy as np
+
+from sim_assets.env.EquityMatrix import EquityMatrix
+
+BID = 0
+ASK = 1
+
+DUST = 1e-12
+
+ORDER_COLUMNS = {
+    'order_id': np.int64,
+    'trader': np.int64,
+    'home': np.int64,
+    'side': np.int8,
+    'price': np.float64,
+    'quantity': np.float64,
+}
+
+
+class TradeBatch(TypedDict):
+    buyer: np.ndarray
+    seller: np.ndarray
+    home: np.ndarray
+    quantity: np.ndarray
+    price: np.ndarray
+
+
+def empty_trades() -> TradeBatch:
+    return {
+        'buyer': np.zeros(0, dtype=np.int64),
+        'seller': np.zeros(0, dtype=np.int64),
+        'home': np.zeros(0, dtype=np.int64),
+        'quantity': np.zeros(0, dtype=np.float64),
+        'price': np.zeros(0, dtype=np.float64),
+    }
+
+
+def group_starts(keys: np.ndarray) -> np.ndarray:
+    starts = np.ones(len(keys), dtype=np.bool_)
+    starts[1:] = keys[1:] != keys[:-1]
+    return starts
+
+
+def budget(keys: np.ndarray, amounts: np.ndarray, limits: np.ndarray) -> np.ndarray:
+    # keys must already be grouped; each group spends its limit on amounts in order
+    cumulative = np.cumsum(amounts)
+    starts = np.flatnonzero(group_starts(keys))
+    before = cumulative - amounts
+    spent = before - np.repeat(before[starts], np.diff(np.append(starts, len(keys))))
+    return np.clip(limits - spent, 0, amounts)
+
+
+def match(homes: np.ndarray, sides: np.ndarray, prices: np.ndarray, order_ids: np.ndarray,
+          quantities: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    bids = np.flatnonzero((sides == BID) & (quantities > 0))
+    asks = np.flatnonzero((sides == ASK) & (quantities > 0))
+    bids = bids[np.lexsort((order_ids[bids], -prices[bids], homes[bids]))]
+    asks = asks[np.lexsort((order_ids[asks], prices[asks], homes[asks]))]
+
+    # every order ends at its cumulative quantity within its home; walking the merged ends of both
+    # sides gives the intervals in which one bid and one ask are matched
+    orders = np.concatenate((bids, asks))
+    is_bid = np.concatenate((np.ones(len(bids), dtype=np.bool_), np.zeros(len(asks), dtype=np.bool_)))
+    ends = np.concatenate((home_cumsum(homes[bids], quantities[bids]), home_cumsum(homes[asks], quantities[asks])))
+    event_homes = homes[orders]
+    events = np.lexsort((~is_bid, ends, event_homes))
+    orders, is_bid, ends, event_homes = orders[events], is_bid[events], ends[events], event_homes[events]
+
+    starts = group_starts(event_homes)
+    first = np.flatnonzero(starts)
+    counts = np.diff(np.append(first, len(events)))
+    bid_rank = home_rank(is_bid, first, counts)
+    ask_rank = home_rank(~is_bid, first, counts)
+
+    begins = np.empty(len(ends), dtype=np.float64)
+    begins[1:] = ends[:-1]
+    begins[starts] = 0
+    filled = ends - begins
+
+    bid_first = np.searchsorted(homes[bids], event_homes)
+    ask_first = np.searchsorted(homes[asks], event_homes)
+    bid_count = np.searchsorted(homes[bids], event_homes, side='right') - bid_first
+    ask_count = np.searchsorted(homes[asks], event_homes, side='right') - ask_first
+    valid = (filled > DUST) & (bid_rank < bid_count) & (ask_rank < ask_count)
+
+    bid_orders = bids[bid_first[valid] + bid_rank[valid]]
+    ask_orders = asks[ask_first[valid] + ask_rank[valid]]
+    crossed = prices[bid_orders] >= prices[ask_orders]
+    bid_orders, ask_orders = bid_orders[crossed], ask_orders[crossed]
+
+    # the order that was resting first sets the price
+    price = np.where(order_ids[bid_orders] < order_ids[ask_orders], prices[bid_orders], prices[ask_orders])
+    return bid_orders, ask_orders, filled[valid][crossed], price
+
+
+def home_cumsum(homes: np.ndarray, quantities: np.ndarray) -> np.ndarray:
+    if len(homes) == 0:
+        return np.zeros(0, dtype=np.float64)
+
+    cumulative = np.cumsum(quantities)
+    starts = np.flatnonzero(group_starts(homes))
+    base = cumulative[starts] - quantities[starts]
+    return cumulative - np.repeat(base, np.diff(np.append(starts, len(homes))))
+
+
+def home_rank(mask: np.ndarray, first: np.ndarray, counts: np.ndarray) -> np.ndarray:
+    before = np.cumsum(mask) - mask
+    return before - np.repeat(before[first], counts)
+
+
+class EquityMarket:
+    def __init__(self, matrix: EquityMatrix, capacity: int = 1024):
+        self.matrix = matrix
+        self.capacity = max(capacity, 1)
+        self.size = 0
+        self.next_order_id = 0
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.zeros(self.capacity, dtype=dtype) for name, dtype in ORDER_COLUMNS.items()
+        }
+
+    def __len__(self) -> int:
+        return self.size
+
+    def column(self, name: str) -> np.ndarray:
+        return self.columns[name][:self.size]
+
+    def _grow(self, size: int) -> None:
+        if size <= self.capacity:
+            return
+
+        self.capacity = max(size, 2 * self.capacity)
+        for name, values in self.columns.items():
+            grown = np.zeros(self.capacity, dtype=values.dtype)
+            grown[:self.size] = values[:self.size]
+            self.columns[name] = grown
+
+    def bid(self, trader_id: str, home_id: str, quantity: float, price: float) -> int:
+        return self.submit(trader_id, home_id, BID, quantity, price)
+
+    def ask(self, trader_id: str, home_id: str, quantity: float, price: float) -> int:
+        assert self.matrix.has(trader_id, home_id), f"{trader_id} does not own home {home_id}"
+        return self.submit(trader_id, home_id, ASK, quantity, price)
+
+    def submit(self, trader_id: str, home_id: str, side: int, quantity: float, price: float) -> int:
+        assert trader_id in self.matrix.owner_index, f"{trader_id} is not an owner in this equity market"
+        assert home_id in self.matrix.home_index, f"Home {home_id} is not in this equity market"
+
+        order_ids = self.submit_many(np.array([self.matrix.owner_index[trader_id]]),
+                                     np.array([self.matrix.home_index[home_id]]), np.array([side]),
+                                     np.array([quantity], dtype=np.float64), np.array([price], dtype=np.float64))
+        return order_ids[0].item()
+
+    def submit_many(self, traders: np.ndarray, homes: np.ndarray, sides: np.ndarray, quantities: np.ndarray,
+                    prices: np.ndarray) -> np.ndarray:
+        count = len(traders)
+        assert len(homes) == len(sides) == len(quantities) == len(prices) == count, "Order columns must be equal length"
+        assert count == 0 or (quantities.min() > 0 and quantities.max() <= 1), "Orders must be for (0, 1] of a home"
+        assert count == 0 or prices.min() >= 0, "Orders cannot have a negative price"
+        assert np.isin(sides, (BID, ASK)).all(), "Orders must be bids or asks"
+
+        order_ids = np.arange(self.next_order_id, self.next_order_id + count, dtype=np.int64)
+        self._grow(self.size + count)
+        new = slice(self.size, self.size + count)
+        for name, values in (('order_id', order_ids), ('trader', traders), ('home', homes), ('side', sides),
+                             ('price', prices), ('quantity', quantities)):
+            self.columns[name][new] = values
+
+        self.size += count
+        self.next_order_id += count
+        return order_ids
+
+    def cancel(self, order_id: int) -> None:
+        position = np.searchsorted(self.column('order_id'), order_id)
+        assert position < self.size and self.columns['order_id'][position] == order_id, \
+            f"Order {order_id} is not on the book"
+        self.columns['quantity'][position] = 0
+        self.compact()
+
+    def cancel_trader(self, trader_id: str) -> None:
+        self.column('quantity')[self.column('trader') == self.matrix.owner_index[trader_id]] = 0
+        self.compact()
+
+    def compact(self) -> None:
+        keep = np.flatnonzero(self.column('quantity') > DUST)
+        for name, values in self.columns.items():
+            values[:len(keep)] = values[keep]
+        self.size = len(keep)
+
+    def traders(self) -> Set[str]:
+        owner_ids = self.matrix.owner_ids
+        return {owner_ids[trader] for trader in np.unique(self.column('trader')).tolist()}
+
+    def holdings(self, traders: np.ndarray, homes: np.ndarray) -> np.ndarray:
+        slots = self.matrix.slots
+        keys = ((traders << 32) | homes).tolist()
+        found = np.fromiter((slots.get(key, -1) for key in keys), dtype=np.int64, count=len(keys))
+        return np.where(found >= 0, self.matrix.values[found], 0)
+
+    def fundable(self, savings: np.ndarray) -> np.ndarray:
+        traders, homes, sides = self.column('trader'), self.column('home'), self.column('side')
+        prices, quantities = self.column('price'), self.column('quantity')
+        order_ids = self.column('order_id')
+        fundable = np.zeros(self.size, dtype=np.float64)
+
+        # asks can only sell what the seller holds when the market clears, oldest order first
+        asks = np.flatnonzero(sides == ASK)
+        asks = asks[np.lexsort((order_ids[asks], homes[asks], traders[asks]))]
+        keys = (traders[asks] << 32) | homes[asks]
+        fundable[asks] = budget(keys, quantities[asks], self.holdings(traders[asks], homes[asks]))
+
+        # bids are funded in priority order out of savings, keeping a cent per order for rounding
+        bids = np.flatnonzero(sides == BID)
+        bids = bids[np.lexsort((order_ids[bids], -prices[bids], traders[bids]))]
+        cost = quantities[bids] * prices[bids] + 0.01
+        funded = np.maximum(budget(traders[bids], cost, np.floor(savings[traders[bids]] * 100) / 100) - 0.01, 0)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            funded = np.where(prices[bids] > 0, funded / prices[bids], quantities[bids])
+        fundable[bids] = np.minimum(funded, quantities[bids])
+
+        return fundable
+
+    def match(self, savings: np.ndarray) -> Tuple[TradeBatch, np.ndarray]:
+        if self.size == 0:
+            return empty_trades(), np.zeros(0, dtype=np.float64)
+
+        bid_orders, ask_orders, quantity, price = match(self.column('home'), self.column('side'),
+                                                        self.column('price'), self.column('order_id'),
+                                                        self.fundable(savings))
+        fills = np.bincount(bid_orders, weights=quantity, minlength=self.size) + \
+            np.bincount(ask_orders, weights=quantity, minlength=self.size)
+        trades: TradeBatch = {
+            'buyer': self.column('trader')[bid_orders],
+            'seller': self.column('trader')[ask_orders],
+            'home': self.column('home')[bid_orders],
+            'quantity': quantity,
+            'price': price,
+        }
+        return trades, fills
+
+    def clear(self, savings: np.ndarray) -> TradeBatch:
+        trades, fills = self.match(savings)
+        if self.size:
+            remaining = self.column('quantity') - fills
+            self.column('quantity')[:] = np.where(remaining > DUST, remaining, 0)
+            self.compact()
+
+        return trades
+
+    def copy_state(self) -> Dict[str, Any]:
+        return {
+            'size': self.size,
+            'next_order_id': self.next_order_id,
+            'columns': {name: values[:self.size].copy() for name, values in self.columns.items()},
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self.size = 0
+        self._grow(state['size'])
+        for name, values in state['columns'].items():
+            self.columns[name][:state['size']] = values
+        self.size = state['size']
+        self.next_order_id = state['next_order_id']
@@ -0,0 +1,241 @@
+from typing import Any, Callable, Dict, Iterator, List, MutableMapping, Mapping, Set, Tuple
+import numpy as np
+
+
+class EquityMatrix:
+    def __init__(self, capacity: int = 1024):
+        self.owner_ids: List[str] = []
+        self.owner_index: Dict[str, int] = dict()
+        self.home_ids: List[str] = []
+        self.home_index: Dict[str, int] = dict()
+
+        self.capacity = max(capacity, 1)
+        self.nnz = 0
+        self.rows = np.zeros(self.capacity, dtype=np.int64)
+        self.cols = np.zeros(self.capacity, dtype=np.int64)
+        self.values = np.zeros(self.capacity, dtype=np.float64)
+        self.slots: Dict[int, int] = dict()
+        self.dirty_homes: Set[int] = set()
+        self.on_change: Callable[[int, int, float], None] = None
+        self.on_move: Callable[[np.ndarray, np.ndarray, np.ndarray], None] = None
+
+        self._csc: Tuple[np.ndarray, np.ndarray] = None
+        self._csr: Tuple[np.ndarray, np.ndarray] = None
+
+    def add_owner(self, owner_id: str) -> int:
+        if owner_id not in self.owner_index:
+            self.owner_index[owner_id] = len(self.owner_ids)
+            self.owner_ids.append(owner_id)
+            self._csr = None
+
+        return self.owner_index[owner_id]
+
+    def add_home(self, home_id: str) -> int:
+        if home_id not in self.home_index:
+            self.home_index[home_id] = len(self.home_ids)
+            self.home_ids.append(home_id)
+            self._csc = None
+
+        return self.home_index[home_id]
+
+    def _key(self, owner: int, home: int) -> int:
+        return (owner << 32) | home
+
+    def _slot(self, owner_id: str, home_id: str) -> int:
+        return self.slots.get(self._key(self.owner_index[owner_id], self.home_index[home_id]), -1)
+
+    def _insert(self, owner: int, home: int) -> int:
+        if self.nnz == self.capacity:
+            self.capacity *= 2
+            for name in ('rows', 'cols', 'values'):
+                grown = np.zeros(self.capacity, dtype=getattr(self, name).dtype)
+                grown[:self.nnz] = getattr(self, name)[:self.nnz]
+                setattr(self, name, grown)
+
+        slot = self.nnz
+        self.rows[slot] = owner
+        self.cols[slot] = home
+        self.values[slot] = 0
+        self.slots[self._key(owner, home)] = slot
+        self.nnz += 1
+
+        self._csc = None
+        self._csr = None
+        return slot
+
+    def has(self, owner_id: str, home_id: str) -> bool:
+        return owner_id in self.owner_index and self._slot(owner_id, home_id) >= 0
+
+    def get(self, owner_id: str, home_id: str) -> float:
+        if owner_id not in self.owner_index:
+            return 0
+
+        slot = self._slot(owner_id, home_id)
+        return self.values[slot].item() if slot >= 0 else 0
+
+    def set(self, owner_id: str, home_id: str, equity: float) -> None:
+        assert owner_id in self.owner_index, f"{owner_id} is not an owner in this equity matrix"
+        assert home_id in self.home_index, f"Home {home_id} is not in this equity matrix"
+
+        owner, home = self.owner_index[owner_id], self.home_index[home_id]
+        slot = self._slot(owner_id, home_id)
+        if slot < 0:
+            slot = self._insert(owner, home)
+        if self.on_change is not None:
+            self.on_change(owner, home, equity - self.values[slot].item())
+
+        self.values[slot] = equity
+        self.dirty_homes.add(home)
+
+    def transfer(self, seller_id: str, purchaser_id: str, home_id: str, equity: float) -> None:
+        seller_slot = self._slot(seller_id, home_id)
+        assert seller_slot >= 0, f"{seller_id} does not own home {home_id}"
+
+        if not self.has(purchaser_id, home_id):
+            self.set(purchaser_id, home_id, 0)
+
+        self.values[seller_slot] -= equity
+        self.values[self._slot(purchaser_id, home_id)] += equity
+        self.dirty_homes.add(self.home_index[home_id])
+        if self.on_change is not None:
+            self.on_change(self.owner_index[seller_id], self.home_index[home_id], -equity)
+            self.on_change(self.owner_index[purchaser_id], self.home_index[home_id], equity)
+
+    def slot(self, owner_id: str, home_id: str) -> int:
+        if not self.has(owner_id, home_id):
+            self.set(owner_id, home_id, 0)
+
+        return self._slot(owner_id, home_id)
+
+    def move(self, from_slots: np.ndarray, to_slots: np.ndarray, equities: np.ndarray) -> None:
+        assert np.array_equal(self.cols[from_slots], self.cols[to_slots]), "Equity can only move within a home"
+        np.subtract.at(self.values, from_slots, equities)
+        np.add.at(self.values, to_slots, equities)
+        self.dirty_homes.update(self.cols[to_slots].tolist())
+
+        if self.on_move is not None:
+            self.on_move(self.rows[from_slots], self.cols[from_slots], -equities)
+            self.on_move(self.rows[to_slots], self.cols[to_slots], equities)
+
+    def copy_state(self) -> Dict[str, Any]:
+        return {
+            'owner_ids': list(self.owner_ids),
+            'home_ids': list(self.home_ids),
+            'rows': self.rows[:self.nnz].copy(),
+            'cols': self.cols[:self.nnz].copy(),
+            'values': self.values[:self.nnz].copy(),
+        }
+
+    def restore_state(self, state: Dict[str, Any]) -> None:
+        self.owner_ids = list(state['owner_ids'])
+        self.owner_index = {owner_id: i for i, owner_id in enumerate(self.owner_ids)}
+        self.home_ids = list(state['home_ids'])
+        self.home_index = {home_id: i for i, home_id in enumerate(self.home_ids)}
+
+        self.nnz = len(state['values'])
+        self.capacity = max(self.nnz, 1)
+        self.rows = np.zeros(self.capacity, dtype=np.int64)
+        self.cols = np.zeros(self.capacity, dtype=np.int64)
+        self.values = np.zeros(self.capacity, dtype=np.float64)
+        self.rows[:self.nnz] = state['rows']
+        self.cols[:self.nnz] = state['cols']
+        self.values[:self.nnz] = state['values']
+        self.slots = {self._key(owner, home): slot for slot, (owner, home) in
+                      enumerate(zip(self.rows[:self.nnz].tolist(), self.cols[:self.nnz].tolist()))}
+
+        self._csc = None
+        self._csr = None
+        self.dirty_homes = set(range(len(self.home_ids)))
+
+    def pop_dirty_homes(self) -> Set[int]:
+        dirty, self.dirty_homes = self.dirty_homes, set()
+        return dirty
+
+    def _compress(self, axis: np.ndarray, size: int) -> Tuple[np.ndarray, np.ndarray]:
+        order = np.argsort(axis[:self.nnz], kind='stable')
+        indptr = np.zeros(size + 1, dtype=np.int64)
+        np.cumsum(np.bincount(axis[:self.nnz], minlength=size), out=indptr[1:])
+        return indptr, order
+
+    def csc(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._csc is None:
+            self._csc = self._compress(self.cols, len(self.home_ids))
+
+        return self._csc
+
+    def csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        if self._csr is None:
+            self._csr = self._compress(self.rows, len(self.owner_ids))
+
+        return self._csr
+
+    def home_slots(self, home_id: str) -> np.ndarray:
+        indptr, order = self.csc()
+        home = self.home_index[home_id]
+        return order[indptr[home]:indptr[home + 1]]
+
+    def owner_slots(self, owner_id: str) -> np.ndarray:
+        indptr, order = self.csr()
+        owner = self.owner_index[owner_id]
+        return order[indptr[owner]:indptr[owner + 1]]
+
+    def home_owners(self, home_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        slots = self.home_slots(home_id)
+        return self.rows[slots], self.values[slots]
+
+    def owner_homes(self, owner_id: str) -> Tuple[np.ndarray, np.ndarray]:
+        slots = self.owner_slots(owner_id)
+        return self.cols[slots], self.values[slots]
+
+    def equity_values(self, prop_vals: np.ndarray) -> np.ndarray:
+        weights = self.values[:self.nnz] * prop_vals[self.cols[:self.nnz]]
+        return np.bincount(self.rows[:self.nnz], weights=weights, minlength=len(self.owner_ids))
+
+    def net_worths(self, savings: np.ndarray, prop_vals: np.ndarray) -> np.ndarray:
+        return savings + self.equity_values(prop_vals)
+
+
+class HomeEquityView(MutableMapping):
+    def __init__(self, matrix: EquityMatrix, home_id: str):
+        self.matrix = matrix
+        self.home_id = home_id
+
+    def __getitem__(self, owner_id: str) -> float:
+        if not self.matrix.has(owner_id, self.home_id):
+            raise KeyError(owner_id)
+
+        return self.matrix.get(owner_id, self.home_id)
+
+    def __setitem__(self, owner_id: str, equity: float) -> None:
+        self.matrix.set(owner_id, self.home_id, equity)
+
+    def __delitem__(self, owner_id: str) -> None:
+        raise TypeError(f"Owners cannot be removed from home {self.home_id}, set their equity to 0 instead")
+
+    def __contains__(self, owner_id: object) -> bool:
+        return isinstance(owner_id, str) and self.matrix.has(owner_id, self.home_id)
+
+    def __iter__(self) -> Iterator[str]:
+        owner_ids = self.matrix.owner_ids
+        for owner in self.matrix.home_owners(self.home_id)[0]:
+            yield owner_ids[owner]
+
+    def __len__(self) -> int:
+        return len(self.matrix.home_slots(self.home_id))
+
+
+class HomeMap(Mapping):
+    def __init__(self, matrix: EquityMatrix):
+        self.matrix = matrix
+
+    def __getitem__(self, home_id: str) -> HomeEquityView:
+        if home_id not in self.matrix.home_index:
+            raise KeyError(home_id)
+
+        return HomeEquityView(self.matrix, home_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.matrix.home_ids)
+
+    def __len__(self) -> int:
+        return len(self.matrix.home_ids)
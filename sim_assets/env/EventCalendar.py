@@ -0,0 +1,47 @@
+from typing import List, NamedTuple
+import heapq
+
+EXPENSE_PAYMENT = 0
+EXPENSE_EXPIRY = 1
+
+
+class Event(NamedTuple):
+    time: int
+    kind: int
+    seq: int
+    entity_id: str
+    name: str
+
+
+class EventCalendar:
+    def __init__(self):
+        self.events: List[Event] = []
+        self.seq = 0
+
+    def __len__(self) -> int:
+        return len(self.events)
+
+    def schedule(self, time: int, kind: int, entity_id: str, name: str = None) -> Event:
+        event = Event(time, kind, self.seq, entity_id, name)
+        self.seq += 1
+        heapq.heappush(self.events, event)
+        return event
+
+    def next_time(self) -> int:
+        return self.events[0].time if self.events else None
+
+    def pop(self, time: int) -> Event:
+        if self.events and self.events[0].time <= time:
+            return heapq.heappop(self.events)
+
+        return None
+
+    def pop_due(self, time: int) -> List[Event]:
+        due = []
+        while self.events and self.events[0].time <= time:
+            due.append(heapq.heappop(self.events))
+
+        return due
+
+    def clear(self) -> None:
+        self.events.clear()
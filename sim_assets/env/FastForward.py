@@ -0,0 +1,70 @@
+from typing import Callable, List
+import numpy as np
+
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.Settlement import CENTS, to_cents
+
+
+class IndependentBlock:
+    def __init__(self, individuals: List[Individual], rows: np.ndarray, savings: np.ndarray, income: np.ndarray,
+                 income_tax: np.ndarray, inc_growth_rate: np.ndarray, cents: bool = False):
+        self.individuals = individuals
+        self.rows = rows
+        self.savings = savings.copy()
+        self.income = income.copy()
+        self.income_tax = income_tax.copy()
+        self.inc_growth_rate = inc_growth_rate.copy()
+        self.cents = cents
+        self.pay_calls = 0
+        self.income_credited = 0.0
+
+        self.expense_names = [list(individual.expenses) if individual.has_expenses else []
+                              for individual in individuals]
+        slots = max((len(names) for names in self.expense_names), default=0)
+        self.payments = np.zeros((len(individuals), slots), dtype=np.float64)
+        self.remaining = np.zeros((len(individuals), slots), dtype=np.int64)
+        for i, (individual, names) in enumerate(zip(individuals, self.expense_names)):
+            for slot, name in enumerate(names):
+                expense = individual.expenses[name]
+                self.payments[i, slot] = round(expense['amount'] * expense['yearly_payments'] * 100) / 100
+                self.remaining[i, slot] = expense['remove_after']
+
+    def advance_year(self, get_tax_brackets: Callable[[np.ndarray], np.ndarray]) -> float:
+        income = (1 - self.income_tax) * self.income
+        if self.cents:
+            income = to_cents(income)
+            self.savings = (to_cents(self.savings) + income) / CENTS
+            self.income_credited = income.sum() / CENTS
+        else:
+            self.savings += income
+            self.income_credited = float(income.sum())
+
+        paid = 0.0
+        self.pay_calls = 0
+        for slot in range(self.payments.shape[1]):
+            due = self.remaining[:, slot] != 0
+            payments = np.where(due, self.payments[:, slot], 0)
+            solvent = payments <= np.round(self.savings * 100) / 100
+            assert solvent.all(), f"{self.individuals[int(np.argmin(solvent))].entity_id} does not have enough " \
+                                  f"assets to pay for {self.expense_names[int(np.argmin(solvent))][slot]}"
+
+            if self.cents:
+                self.savings = (to_cents(self.savings) - to_cents(payments)) / CENTS
+            else:
+                self.savings -= payments
+            self.remaining[:, slot] -= self.remaining[:, slot] > 0
+            paid += float(payments.sum())
+            self.pay_calls += int(np.count_nonzero(payments))
+
+        self.income += self.inc_growth_rate * self.income
+        self.income_tax = get_tax_brackets(self.income)
+        return paid
+
+    def write_back(self) -> None:
+        for i, (individual, names) in enumerate(zip(self.individuals, self.expense_names)):
+            for slot, name in enumerate(names):
+                remaining = int(self.remaining[i, slot])
+                if remaining == 0:
+                    individual.remove_expense(name)
+                else:
+                    individual.expenses[name]['remove_after'] = remaining
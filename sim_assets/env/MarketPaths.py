@@ -0,0 +1,35 @@
+from typing import List
+import numpy as np
+
+
+class MarketPaths:
+    def __init__(self, start_year: int, home_ids: List[str], individual_ids: List[str], regimes: np.ndarray,
+                 appr_rates: np.ndarray, rent_rates: np.ndarray, inc_growth_rates: np.ndarray):
+        self.start_year = start_year
+        self.home_ids = home_ids
+        self.individual_ids = individual_ids
+        self.regimes = regimes
+        self.appr_rates = appr_rates
+        self.rent_rates = rent_rates
+        self.inc_growth_rates = inc_growth_rates
+
+    @property
+    def years(self) -> int:
+        return len(self.regimes)
+
+    def index(self, year: int) -> int:
+        index = year - self.start_year - 1
+        assert 0 <= index < self.years, \
+            f"Year {year} is outside the market paths for years {self.start_year + 1} to {self.start_year + self.years}"
+        return index
+
+    def subset(self, individual_rows: np.ndarray, home_rows: np.ndarray) -> 'MarketPaths':
+        return MarketPaths(
+            self.start_year,
+            [self.home_ids[row] for row in home_rows.tolist()],
+            [self.individual_ids[row] for row in individual_rows.tolist()],
+            self.regimes,
+            self.appr_rates[:, home_rows],
+            self.rent_rates[:, home_rows],
+            self.inc_growth_rates[:, individual_rows],
+        )
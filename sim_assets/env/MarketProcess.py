@@ -0,0 +1,127 @@
+from typing import Dict, List, Sequence, TypedDict
+import numpy as np
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.MarketPaths import MarketPaths
+
+
+class RegimeConfig(TypedDict):
+    name: str
+    drift: float
+    vol_scale: float
+    inc_drift: float
+
+
+class MarketProcessConfig(TypedDict):
+    home_appr_vol: float
+    national_share: float
+    regional_share: float
+    rent_vol: float
+    rent_corr: float
+    inc_growth_vol: float
+    inc_national_share: float
+    regimes: List[RegimeConfig]
+    transitions: List[List[float]]
+
+
+DEFAULT_MARKET_CONFIG: MarketProcessConfig = {
+    'home_appr_vol': 0.08,
+    'national_share': 0.3,
+    'regional_share': 0.4,
+    'rent_vol': 0.04,
+    'rent_corr': 0.6,
+    'inc_growth_vol': 0.03,
+    'inc_national_share': 0.3,
+    'regimes': [
+        {'name': 'expansion', 'drift': 0.0, 'vol_scale': 1.0, 'inc_drift': 0.0},
+        {'name': 'recession', 'drift': -0.06, 'vol_scale': 1.5, 'inc_drift': -0.02},
+    ],
+    'transitions': [[0.9, 0.1], [0.4, 0.6]],
+}
+
+
+def region_index(home_ids: Sequence[str], regions: Dict[str, str] = None) -> np.ndarray:
+    # homes missing from the region map get -1 and carry no regional factor
+    if regions is None:
+        return np.full(len(home_ids), -1, dtype=np.int64)
+
+    names = sorted(set(regions.values()))
+    lookup = {name: i for i, name in enumerate(names)}
+    return np.array([lookup[regions[home_id]] if home_id in regions else -1 for home_id in home_ids],
+                    dtype=np.int64)
+
+
+class MarketProcess:
+    def __init__(self, config: MarketProcessConfig = None, seed: int = 0):
+        self.config = config if config is not None else DEFAULT_MARKET_CONFIG
+        self.seed = seed
+
+        shares = self.config['national_share'] + self.config['regional_share']
+        assert 0 <= shares <= 1, f"Factor variance shares must sum to at most 1, not {shares}"
+        assert -1 <= self.config['rent_corr'] <= 1, f"Rent correlation {self.config['rent_corr']} is not in [-1, 1]"
+        self.transitions = np.array(self.config['transitions'], dtype=np.float64)
+        regimes = len(self.config['regimes'])
+        assert self.transitions.shape == (regimes, regimes) and np.allclose(self.transitions.sum(axis=1), 1), \
+            f"Regime transitions must be a {regimes}x{regimes} row-stochastic matrix"
+
+    def regime_path(self, uniforms: np.ndarray) -> np.ndarray:
+        cumulative = np.cumsum(self.transitions, axis=1)
+        path = np.zeros(len(uniforms), dtype=np.int64)
+        regime = 0
+        for year, draw in enumerate(uniforms.tolist()):
+            regime = min(int(np.searchsorted(cumulative[regime], draw, side='right')), len(cumulative) - 1)
+            path[year] = regime
+
+        return path
+
+    def generate(self, env: Environment, years: int, regions: Dict[str, str] = None) -> MarketPaths:
+        assert years > 0, "Market paths need at least one year"
+        config = self.config
+        home_ids = list(env.homes)
+        individual_ids = list(env.homeowners)
+        homes, individuals = len(home_ids), len(individual_ids)
+
+        labels = region_index(home_ids, regions)
+        region_count = int(labels.max()) + 1 if homes else 0
+
+        # one draw covers the whole horizon: national, regional, home price, home rent and income shocks
+        rng = np.random.default_rng(self.seed)
+        uniforms = rng.random(years)
+        shocks = rng.standard_normal((years, 1 + region_count + 2 * homes + individuals))
+        national = shocks[:, :1]
+        regional = shocks[:, 1:1 + region_count]
+        price_noise, rent_noise, income_noise = np.split(shocks[:, 1 + region_count:],
+                                                         [homes, 2 * homes], axis=1)
+
+        regimes = self.regime_path(uniforms)
+        drift = np.array([regime['drift'] for regime in config['regimes']], dtype=np.float64)[regimes, None]
+        vol_scale = np.array([regime['vol_scale'] for regime in config['regimes']], dtype=np.float64)[regimes, None]
+        inc_drift = np.array([regime['inc_drift'] for regime in config['regimes']], dtype=np.float64)[regimes, None]
+
+        has_region = labels >= 0
+        regional_share = np.where(has_region, config['regional_share'], 0)
+        regional_factor = regional[:, np.maximum(labels, 0)] if region_count else np.zeros((years, homes))
+        price_shock = np.sqrt(config['national_share']) * national + np.sqrt(regional_share) * regional_factor \
+            + np.sqrt(1 - config['national_share'] - regional_share) * price_noise
+
+        # geometric Brownian motion around the environment's deterministic appreciation rate
+        base = np.log1p(env.config['home_appr_rate'])
+        price_vol = config['home_appr_vol'] * vol_scale
+        appr_rates = np.expm1(base + drift - 0.5 * price_vol ** 2 + price_vol * price_shock)
+
+        rent_corr = config['rent_corr']
+        rent_shock = rent_corr * price_shock + np.sqrt(1 - rent_corr ** 2) * rent_noise
+        rent_vol = config['rent_vol'] * vol_scale
+        rent_rates = np.expm1(base + drift - 0.5 * rent_vol ** 2 + rent_vol * rent_shock)
+
+        inc_share = config['inc_national_share']
+        income_shock = np.sqrt(inc_share) * national + np.sqrt(1 - inc_share) * income_noise
+        inc_growth_rates = env.get_individual_column('inc_growth_rate')[None, :] + inc_drift \
+            + config['inc_growth_vol'] * vol_scale * income_shock
+
+        return MarketPaths(env.year, home_ids, individual_ids, regimes, appr_rates, rent_rates, inc_growth_rates)
+
+    def attach(self, env: Environment, years: int, regions: Dict[str, str] = None) -> MarketPaths:
+        paths = self.generate(env, years, regions)
+        env.use_market_paths(paths)
+        return paths
@@ -0,0 +1,110 @@
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, List, Sequence, Tuple
+import copy
+import os
+import numpy as np
+
+from sim_assets.env.Environment import Environment, EnvironmentConfig
+from sim_assets.records.DistributionStats import DEFAULT_PERCENTILES, MetricStats, StatsLog, YearSummary
+from sim_assets.records.LogStore import INDIVIDUAL_METRICS
+
+Population = Callable[[Environment], None]
+
+_worker_template: Environment = None
+
+
+class MonteCarloResult:
+    def __init__(self, replicas: int, stats: StatsLog):
+        self.replicas = replicas
+        self.stats = stats
+
+    @property
+    def years(self) -> int:
+        return len(self.stats)
+
+    def metric(self, metric: str) -> List[MetricStats]:
+        assert metric in INDIVIDUAL_METRICS, f"Unknown Monte Carlo metric {metric}"
+        return [year.metrics[metric] for year in self.stats.years]
+
+    def mean(self, metric: str) -> np.ndarray:
+        return np.array([stats.mean for stats in self.metric(metric)])
+
+    def std(self, metric: str) -> np.ndarray:
+        return np.array([stats.std for stats in self.metric(metric)])
+
+    def percentiles(self, metric: str, q: Sequence[float]) -> np.ndarray:
+        quantiles = [p / 100 for p in q]
+        return np.stack([stats.sketch.quantiles(quantiles) for stats in self.metric(metric)], axis=1)
+
+    def summaries(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> List[YearSummary]:
+        return self.stats.summaries(percentiles)
+
+
+def build_environment(env_id: str, config: EnvironmentConfig, population: Population,
+                      env_cls: type = Environment) -> Environment:
+    env = env_cls(env_id, copy.deepcopy(config))
+    population(env)
+    return env
+
+
+def run_replica(template: Environment, years: int, seed: np.random.SeedSequence, home_appr_vol: float,
+                inc_growth_vol: float, relative_accuracy: float = 0.01) -> StatsLog:
+    env = template.fork()
+    env.stats_log = StatsLog(relative_accuracy)
+    rng = np.random.default_rng(seed)
+
+    rows = np.arange(len(env.homeowners))
+    base_home_appr_rate = env.config['home_appr_rate']
+    base_inc_growth_rates = env.get_individual_column('inc_growth_rate').copy()
+    for _ in range(years):
+        env.config['home_appr_rate'] = base_home_appr_rate + home_appr_vol * rng.standard_normal()
+        env.set_individual_column('inc_growth_rate', rows,
+                                  base_inc_growth_rates + inc_growth_vol * rng.standard_normal(len(rows)))
+        env.progress_one_year()
+
+    return env.stats_log
+
+
+def _init_worker(env_id: str, config: EnvironmentConfig, population: Population, env_cls: type) -> None:
+    global _worker_template
+    _worker_template = build_environment(env_id, config, population, env_cls)
+
+
+def _run_worker_replica(args: Tuple[int, np.random.SeedSequence, float, float, float]) -> StatsLog:
+    return run_replica(_worker_template, *args)
+
+
+class MonteCarloRunner:
+    def __init__(self, config: EnvironmentConfig, population: Population, seed: int = 0,
+                 home_appr_vol: float = 0.0, inc_growth_vol: float = 0.0, env_cls: type = Environment,
+                 max_workers: int = None, relative_accuracy: float = 0.01):
+        self.config = config
+        self.population = population
+        self.seed = seed
+        self.home_appr_vol = home_appr_vol
+        self.inc_growth_vol = inc_growth_vol
+        self.env_cls = env_cls
+        self.max_workers = max_workers
+        self.relative_accuracy = relative_accuracy
+
+    def seeds(self, replicas: int) -> List[np.random.SeedSequence]:
+        return np.random.SeedSequence(self.seed).spawn(replicas)
+
+    def run(self, replicas: int, years: int) -> MonteCarloResult:
+        assert replicas > 0 and years > 0, "Monte Carlo runs need at least one replica and one year"
+
+        tasks = [(years, seed, self.home_appr_vol, self.inc_growth_vol, self.relative_accuracy)
+                 for seed in self.seeds(replicas)]
+
+        workers = self.max_workers or os.cpu_count() or 1
+        chunksize = max(1, replicas // (4 * workers))
+        with ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            initializer=_init_worker,
+            initargs=("monte-carlo", self.config, self.population, self.env_cls),
+        ) as executor:
+            stats = StatsLog(self.relative_accuracy)
+            for replica_stats in executor.map(_run_worker_replica, tasks, chunksize=chunksize):
+                stats.merge(replica_stats)
+
+        return MonteCarloResult(replicas, stats)
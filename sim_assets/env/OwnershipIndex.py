@@ -0,0 +1,67 @@
+from typing import Dict, List, Set, Tuple
+import numpy as np
+
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.EquityMatrix import EquityMatrix
+
+
+class OwnershipIndex:
+    def __init__(self, matrix: EquityMatrix, individuals: Dict[str, Individual]):
+        self.matrix = matrix
+        self.individuals = individuals
+
+        self.owner_homes: Dict[str, Set[str]] = dict()
+        self.home_owners: Dict[str, Tuple[List[Individual], np.ndarray]] = dict()
+        self.payouts: Dict[str, Tuple[str, List[Individual], np.ndarray]] = dict()
+
+    def reset(self) -> None:
+        self.owner_homes.clear()
+        self.home_owners.clear()
+        self.payouts.clear()
+        self.matrix.dirty_homes = set(range(len(self.matrix.home_ids)))
+
+    def sync(self) -> None:
+        if not self.matrix.dirty_homes:
+            return
+
+        for home in self.matrix.pop_dirty_homes():
+            self._rebuild(self.matrix.home_ids[home])
+
+    def _rebuild(self, home_id: str) -> None:
+        owners, equities = self.matrix.home_owners(home_id)
+        owner_ids = [self.matrix.owner_ids[owner] for owner in owners.tolist()]
+
+        self.home_owners[home_id] = ([self.individuals[owner_id] for owner_id in owner_ids], equities)
+        self.payouts.pop(home_id, None)
+
+        for owner_id, equity in zip(owner_ids, equities.tolist()):
+            homes = self.owner_homes.setdefault(owner_id, set())
+            if equity > 0:
+                homes.add(home_id)
+            else:
+                homes.discard(home_id)
+
+    def owners_of(self, home_id: str) -> Tuple[List[Individual], np.ndarray]:
+        self.sync()
+        if home_id not in self.home_owners:
+            return [], np.zeros(0, dtype=np.float64)
+
+        return self.home_owners[home_id]
+
+    def homes_of(self, owner_id: str) -> Set[str]:
+        self.sync()
+        return self.owner_homes.get(owner_id, set())
+
+    def payout(self, home_id: str, renter_id: str) -> Tuple[List[Individual], np.ndarray]:
+        self.sync()
+        cached = self.payouts.get(home_id)
+        if cached is not None and cached[0] == renter_id:
+            return cached[1], cached[2]
+
+        owners, equities = self.owners_of(home_id)
+        keep = [i for i, owner in enumerate(owners) if owner.entity_id != renter_id]
+        payees = [owners[i] for i in keep]
+        shares = equities[keep]
+
+        self.payouts[home_id] = (renter_id, payees, shares)
+        return payees, shares
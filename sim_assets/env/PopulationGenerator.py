@@ -0,0 +1,216 @@
+from typing import Dict, Iterator, List, Tuple, TypedDict
+import os
+import numpy as np
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.PopulationLoader import Columns, HOMEOWNER, RENTER, populate_homes, populate_individuals, \
+    populate_ownership, write_npz
+
+INDIVIDUAL_STREAM = 0
+HOME_STREAM = 1
+RESIDENCE_STREAM = 2
+ROLE_STREAM = 3
+OWNER_STREAM = 4
+OWNERSHIP_STREAM = 5
+
+
+class DistributionConfig(TypedDict, total=False):
+    kind: str
+    value: float
+    mean: float
+    std: float
+    median: float
+    sigma: float
+    low: float
+    high: float
+    p: float
+    min: float
+    max: float
+
+
+class RegionConfig(TypedDict):
+    name: str
+    weight: float
+    prop_val: float
+    rent_yield: float
+
+
+class GeneratorConfig(TypedDict):
+    individuals: Dict[str, DistributionConfig]
+    renter_share: float
+    max_rent_share: float
+    owners_per_home: DistributionConfig
+    regions: List[RegionConfig]
+    prop_val_sigma: float
+    rent_sigma: float
+
+
+DEFAULT_GENERATOR_CONFIG: GeneratorConfig = {
+    'individuals': {
+        'income': {'kind': 'lognormal', 'median': 100000, 'sigma': 0.4},
+        'savings': {'kind': 'lognormal', 'median': 25000, 'sigma': 1.0},
+        'income_tax': {'kind': 'uniform', 'low': 0.2, 'high': 0.35},
+        'inc_growth_rate': {'kind': 'normal', 'mean': 0.04, 'std': 0.02, 'min': 0},
+        'with_polymer': {'kind': 'bernoulli', 'p': 0.3},
+        'equity_contr': {'kind': 'uniform', 'low': 0.1, 'high': 0.5},
+    },
+    'renter_share': 0.4,
+    'max_rent_share': 0.4,
+    'owners_per_home': {'kind': 'constant', 'value': 1},
+    'regions': [
+        {'name': 'urban', 'weight': 0.5, 'prop_val': 900000, 'rent_yield': 0.045},
+        {'name': 'suburban', 'weight': 0.35, 'prop_val': 550000, 'rent_yield': 0.05},
+        {'name': 'rural', 'weight': 0.15, 'prop_val': 300000, 'rent_yield': 0.055},
+    ],
+    'prop_val_sigma': 0.3,
+    'rent_sigma': 0.1,
+}
+
+
+def sample(rng: np.random.Generator, distribution: DistributionConfig, size: int) -> np.ndarray:
+    kind = distribution['kind']
+    if kind == 'constant':
+        values = np.full(size, distribution['value'])
+    elif kind == 'normal':
+        values = rng.normal(distribution['mean'], distribution['std'], size)
+    elif kind == 'lognormal':
+        values = distribution['median'] * np.exp(rng.normal(0, distribution['sigma'], size))
+    elif kind == 'uniform':
+        values = rng.uniform(distribution['low'], distribution['high'], size)
+    elif kind == 'bernoulli':
+        values = rng.random(size) < distribution['p']
+    else:
+        assert False, f"Unknown distribution kind {kind}"
+
+    if 'min' in distribution or 'max' in distribution:
+        values = np.clip(values, distribution.get('min'), distribution.get('max'))
+
+    return values
+
+
+class PopulationGenerator:
+    def __init__(self, individuals: int, homes: int, seed: int = 0, config: GeneratorConfig = None,
+                 chunk_size: int = 100000):
+        self.individuals = individuals
+        self.homes = homes
+        self.seed = seed
+        self.config = config if config is not None else DEFAULT_GENERATOR_CONFIG
+        self.chunk_size = max(chunk_size, 1)
+
+        weights = np.array([region['weight'] for region in self.config['regions']], dtype=np.float64)
+        self.region_weights = weights / weights.sum()
+        self.region_names = np.array([region['name'] for region in self.config['regions']])
+        self.region_prop_vals = np.array([region['prop_val'] for region in self.config['regions']])
+        self.region_rent_yields = np.array([region['rent_yield'] for region in self.config['regions']])
+
+    def rng(self, stream: int, chunk: int = 0) -> np.random.Generator:
+        return np.random.default_rng([self.seed, stream, chunk])
+
+    def chunks(self, count: int) -> Iterator[Tuple[int, int, int]]:
+        for chunk, start in enumerate(range(0, count, self.chunk_size)):
+            yield chunk, start, min(start + self.chunk_size, count)
+
+    def home_chunks(self) -> Iterator[Columns]:
+        for chunk, start, stop in self.chunks(self.homes):
+            rng = self.rng(HOME_STREAM, chunk)
+            size = stop - start
+            regions = rng.choice(len(self.region_weights), size, p=self.region_weights)
+
+            prop_val = self.region_prop_vals[regions] * np.exp(rng.normal(0, self.config['prop_val_sigma'], size))
+            rent = prop_val * self.region_rent_yields[regions] * np.exp(rng.normal(0, self.config['rent_sigma'], size))
+            yield {
+                'id': np.array([f"home-{i}" for i in range(start, stop)]),
+                'region': self.region_names[regions],
+                'prop_val': np.round(prop_val, 2),
+                'rent': np.round(rent, 2),
+                'savings': np.zeros(size),
+            }
+
+    def renter_mask(self, chunk: int, size: int) -> np.ndarray:
+        return self.rng(ROLE_STREAM, chunk).random(size) < self.config['renter_share']
+
+    def homeowner_indices(self) -> np.ndarray:
+        return np.concatenate([start + np.flatnonzero(~self.renter_mask(chunk, stop - start))
+                               for chunk, start, stop in self.chunks(self.individuals)] or [np.zeros(0, np.int64)])
+
+    def individual_chunks(self) -> Iterator[Columns]:
+        vacancies = self.rng(RESIDENCE_STREAM).permutation(self.homes)
+        rents = np.concatenate([columns['rent'] for columns in self.home_chunks()] or [np.zeros(0)])
+        rented = 0
+        for chunk, start, stop in self.chunks(self.individuals):
+            rng = self.rng(INDIVIDUAL_STREAM, chunk)
+            size = stop - start
+            columns = {'id': np.array([f"ind-{i}" for i in range(start, stop)])}
+            for name, distribution in self.config['individuals'].items():
+                columns[name] = sample(rng, distribution, size)
+
+            renters = np.flatnonzero(self.renter_mask(chunk, size))
+            renters = renters[:max(len(vacancies) - rented, 0)]
+            homes = vacancies[rented:rented + len(renters)]
+            residence = np.full(size, '', dtype=object)
+            residence[renters] = [f"home-{i}" for i in homes.tolist()]
+            rented += len(renters)
+
+            # renters earn enough to afford the home they were given
+            columns['income'][renters] = np.maximum(columns['income'][renters],
+                                                    rents[homes] / self.config['max_rent_share'])
+
+            role = np.full(size, HOMEOWNER, dtype=object)
+            role[renters] = RENTER
+            columns['role'] = role.astype(str)
+            columns['residence'] = residence.astype(str)
+            yield columns
+
+    def ownership_chunks(self) -> Iterator[Columns]:
+        owners = self.rng(OWNER_STREAM).permutation(self.homeowner_indices())
+        if len(owners) == 0:
+            return
+
+        assigned = 0
+        for chunk, start, stop in self.chunks(self.homes):
+            rng = self.rng(OWNERSHIP_STREAM, chunk)
+            counts = sample(rng, self.config['owners_per_home'], stop - start)
+            counts = np.clip(np.round(counts), 1, len(owners)).astype(np.int64)
+
+            # owners are dealt round-robin, so the owners of one home are always distinct
+            slots = assigned + np.arange(counts.sum())
+            assigned += int(counts.sum())
+            yield {
+                'owner': np.array([f"ind-{i}" for i in owners[slots % len(owners)].tolist()]),
+                'home': np.array([f"home-{i}" for i in np.repeat(np.arange(start, stop), counts).tolist()]),
+                'equity': np.repeat(1 / counts, counts),
+            }
+
+    def home_regions(self) -> Dict[str, str]:
+        regions = dict()
+        for columns in self.home_chunks():
+            regions.update(zip(columns['id'].tolist(), columns['region'].tolist()))
+
+        return regions
+
+    def populate(self, env: Environment) -> None:
+        for columns in self.home_chunks():
+            populate_homes(env, columns)
+        for columns in self.individual_chunks():
+            populate_individuals(env, columns)
+        for columns in self.ownership_chunks():
+            populate_ownership(env, columns)
+
+    def write(self, directory: str) -> Tuple[List[str], List[str], List[str]]:
+        os.makedirs(directory, exist_ok=True)
+        homes_files = []
+        for chunk, columns in enumerate(self.home_chunks()):
+            homes_files.append(os.path.join(directory, f"homes-{chunk:05d}.npz"))
+            write_npz(homes_files[-1], columns)
+
+        individuals_files = []
+        for chunk, columns in enumerate(self.individual_chunks()):
+            individuals_files.append(os.path.join(directory, f"individuals-{chunk:05d}.npz"))
+            write_npz(individuals_files[-1], columns)
+
+        ownership_files = []
+        for chunk, columns in enumerate(self.ownership_chunks()):
+            ownership_files.append(os.path.join(directory, f"ownership-{chunk:05d}.npz"))
+            write_npz(ownership_files[-1], columns)
+
+        return individuals_files, homes_files, ownership_files
@@ -0,0 +1,178 @@
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+import csv
+import glob
+import json
+import os
+import numpy as np
+
+from sim_assets.entities.Home import Home
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.Environment import Environment
+
+HOMEOWNER = "homeowner"
+RENTER = "renter"
+
+RESERVED_COLUMNS = ('id', 'template', 'role', 'residence', 'region', 'owner', 'home')
+
+Columns = Dict[str, np.ndarray]
+Templates = Dict[str, Dict[str, Any]]
+
+
+def load_templates(directory: str) -> Templates:
+    templates = dict()
+    for filename in sorted(glob.glob(os.path.join(directory, "*.json"))):
+        with open(filename) as f:
+            templates[os.path.splitext(os.path.basename(filename))[0]] = json.load(f)
+
+    return templates
+
+
+def parse_column(values: List[Any]) -> np.ndarray:
+    present = [value for value in values if value is not None and value != '']
+    if present and all(isinstance(value, bool) or value in ('true', 'false', 'True', 'False') for value in present):
+        return np.array([None if value is None or value == '' else value in (True, 'true', 'True')
+                         for value in values], dtype=object)
+
+    try:
+        return np.array([np.nan if value is None or value == '' else float(value) for value in values],
+                        dtype=np.float64)
+    except (TypeError, ValueError):
+        return np.array([None if value == '' else value for value in values], dtype=object)
+
+
+def parse_reserved_column(values: List[Any]) -> np.ndarray:
+    return np.array([None if value is None or value == '' else str(value) for value in values], dtype=object)
+
+
+def read_columns(filename: str) -> Columns:
+    extension = os.path.splitext(filename)[1].lower()
+    if extension == ".npz":
+        with np.load(filename, allow_pickle=False) as data:
+            return {name: parse_reserved_column(data[name].tolist()) if name in RESERVED_COLUMNS else data[name]
+                    for name in data.files}
+
+    if extension == ".csv":
+        with open(filename, newline='') as f:
+            rows = list(csv.DictReader(f))
+    elif extension in (".jsonl", ".ndjson"):
+        with open(filename) as f:
+            rows = [json.loads(line) for line in f if line.strip()]
+    else:
+        assert False, f"Cannot load a population from {filename}, expected .csv, .jsonl or .npz"
+
+    names = list(dict.fromkeys(name for row in rows for name in row))
+    columns = dict()
+    for name in names:
+        parse = parse_reserved_column if name in RESERVED_COLUMNS else parse_column
+        columns[name] = parse([row.get(name) for row in rows])
+
+    return columns
+
+
+def build_configs(columns: Columns, templates: Templates = None, default_template: str = None) -> List[Dict[str, Any]]:
+    assert 'id' in columns, "Population files need an id column"
+    templates = templates if templates is not None else dict()
+    size = len(columns['id'])
+
+    if 'template' in columns:
+        names = [name if name not in (None, '') else default_template for name in columns['template'].tolist()]
+    else:
+        names = [default_template] * size
+
+    missing = {name for name in names if name is not None and name not in templates}
+    assert not missing, f"Unknown population templates {sorted(missing)}"
+    configs = [dict(templates[name]) if name is not None else dict() for name in names]
+
+    for name, values in columns.items():
+        if name in RESERVED_COLUMNS:
+            continue
+
+        present = np.ones(size, dtype=np.bool_)
+        if values.dtype.kind == 'f':
+            present = ~np.isnan(values)
+        elif values.dtype == object:
+            present = np.fromiter((value is not None for value in values.tolist()), dtype=np.bool_, count=size)
+
+        for row, value in zip(np.flatnonzero(present).tolist(), values[present].tolist()):
+            configs[row][name] = value
+
+    return configs
+
+
+def make_individuals(columns: Columns, templates: Templates = None,
+                     default_template: str = None) -> Tuple[List[Individual], List[str], List[Optional[str]]]:
+    configs = build_configs(columns, templates, default_template)
+    ids = [str(entity_id) for entity_id in columns['id'].tolist()]
+    individuals = [Individual(entity_id, config) for entity_id, config in zip(ids, configs)]
+
+    roles = columns['role'].tolist() if 'role' in columns else [HOMEOWNER] * len(ids)
+    roles = [role if role not in (None, '') else HOMEOWNER for role in roles]
+    unknown = set(roles) - {HOMEOWNER, RENTER}
+    assert not unknown, f"Unknown population roles {sorted(unknown)}"
+
+    residences = columns['residence'].tolist() if 'residence' in columns else [None] * len(ids)
+    residences = [residence if residence not in (None, '') else None for residence in residences]
+    return individuals, roles, residences
+
+
+def make_homes(columns: Columns, templates: Templates = None, default_template: str = None) -> List[Home]:
+    configs = build_configs(columns, templates, default_template)
+    return [Home(str(entity_id), config) for entity_id, config in zip(columns['id'].tolist(), configs)]
+
+
+def load_individuals(filename: str, templates: Templates = None,
+                     default_template: str = None) -> Tuple[List[Individual], List[str], List[Optional[str]]]:
+    return make_individuals(read_columns(filename), templates, default_template)
+
+
+def load_homes(filename: str, templates: Templates = None, default_template: str = None) -> List[Home]:
+    return make_homes(read_columns(filename), templates, default_template)
+
+
+def populate_homes(env: Environment, columns: Columns, templates: Templates = None,
+                   default_template: str = None) -> None:
+    env.add_homes(make_homes(columns, templates, default_template))
+
+
+def populate_individuals(env: Environment, columns: Columns, templates: Templates = None,
+                         default_template: str = None) -> None:
+    individuals, roles, residences = make_individuals(columns, templates, default_template)
+    env.add_homeowners(individual for individual, role in zip(individuals, roles) if role == HOMEOWNER)
+    env.add_renters(individual for individual, role in zip(individuals, roles) if role == RENTER)
+
+    for individual, residence in zip(individuals, residences):
+        if residence is not None:
+            env.rent(individual, env.homes[residence])
+
+
+def populate_ownership(env: Environment, columns: Columns) -> None:
+    assert 'owner' in columns and 'home' in columns, "Ownership files need owner and home columns"
+    equities = columns['equity'].tolist() if 'equity' in columns else [1.0] * len(columns['owner'])
+    for owner_id, home_id, equity in zip(columns['owner'].tolist(), columns['home'].tolist(), equities):
+        assert owner_id in env.homeowners, f"{owner_id} is not a part of the environment"
+        assert home_id in env.homes, f"Home {home_id} is not a part of the environment"
+        env.equity.set(owner_id, home_id, equity)
+
+
+def load_population(env: Environment, individuals_files: Union[str, Sequence[str]] = None,
+                    homes_files: Union[str, Sequence[str]] = None, templates: Union[str, Templates] = None,
+                    default_individual: str = None, default_home: str = None,
+                    ownership_files: Union[str, Sequence[str]] = None) -> None:
+    if isinstance(templates, str):
+        templates = load_templates(templates)
+
+    for filename in [homes_files] if isinstance(homes_files, str) else homes_files or []:
+        populate_homes(env, read_columns(filename), templates, default_home)
+    for filename in [individuals_files] if isinstance(individuals_files, str) else individuals_files or []:
+        populate_individuals(env, read_columns(filename), templates, default_individual)
+    for filename in [ownership_files] if isinstance(ownership_files, str) else ownership_files or []:
+        populate_ownership(env, read_columns(filename))
+
+
+def write_npz(filename: str, columns: Mapping[str, Any]) -> None:
+    arrays = {name: np.asarray(values) for name, values in columns.items()}
+    for name, values in arrays.items():
+        if values.dtype == object:
+            arrays[name] = np.array(['' if value is None else str(value) for value in values.tolist()])
+
+    np.savez(filename, **arrays)
@@ -0,0 +1,66 @@
+from typing import Dict, List, Tuple
+import numpy as np
+
+from sim_assets.entities.Entity import Entity
+
+CENTS = 100
+
+
+def to_cents(amounts: np.ndarray) -> np.ndarray:
+    return np.round(np.asarray(amounts, dtype=np.float64) * CENTS).astype(np.int64)
+
+
+def settle(balances: np.ndarray, payers: np.ndarray, payees: np.ndarray, cents: np.ndarray,
+           externals: int = 0) -> np.ndarray:
+    assert balances.dtype == np.int64, f"Balances must be stored as int64 cents, not {balances.dtype}"
+    assert len(cents) == 0 or cents.min() >= 0, "Cannot settle a negative amount of money"
+
+    outflow = np.zeros(len(balances), dtype=np.int64)
+    np.add.at(outflow, payers, cents)
+    short = np.flatnonzero(outflow > balances)
+    assert len(short) == 0, f"Rows {short[:10].tolist()} cannot cover {(outflow[short[:10]] / CENTS).tolist()} " \
+                            f"with {(balances[short[:10]] / CENTS).tolist()}"
+
+    balances -= outflow
+    internal = payees >= 0
+    np.add.at(balances, payees[internal], cents[internal])
+
+    external = np.zeros(externals, dtype=np.int64)
+    np.add.at(external, -payees[~internal] - 1, cents[~internal])
+    return external
+
+
+class TransferBatch:
+    def __init__(self):
+        self.payers: List[int] = []
+        self.payees: List[int] = []
+        self.cents: List[int] = []
+        self.externals: List[Entity] = []
+        self.external_index: Dict[str, int] = dict()
+
+    def __len__(self) -> int:
+        return len(self.cents)
+
+    def external(self, entity: Entity) -> int:
+        if entity.entity_id not in self.external_index:
+            self.external_index[entity.entity_id] = -len(self.externals) - 1
+            self.externals.append(entity)
+
+        return self.external_index[entity.entity_id]
+
+    def add(self, payer: int, payee: int, cents: int) -> None:
+        self.payers.append(payer)
+        self.payees.append(payee)
+        self.cents.append(cents)
+
+    def arrays(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        return (
+            np.array(self.payers, dtype=np.int64),
+            np.array(self.payees, dtype=np.int64),
+            np.array(self.cents, dtype=np.int64),
+        )
+
+    def settle(self, balances: np.ndarray) -> None:
+        external = settle(balances, *self.arrays(), externals=len(self.externals))
+        for entity, cents in zip(self.externals, external.tolist()):
+            entity.config['savings'] += cents / CENTS
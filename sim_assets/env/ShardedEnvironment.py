@@ -0,0 +1,415 @@
+from multiprocessing.connection import Connection
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+import multiprocessing
+import numpy as np
+
+from sim_assets.entities.Home import Home
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.EquityMarket import ASK
+from sim_assets.env.Environment import Environment, Log
+from sim_assets.records.LogStore import LogColumns, INDIVIDUAL_METRICS, HOME_METRICS
+
+ShardLog = Tuple[LogColumns, float, float]
+Transfers = List[Tuple[str, float]]
+Trade = Tuple[int, str, str, str, float, float]
+
+# remote owners of a shard's homes are mirrored as ghosts that only hold equity and collect payments
+GHOST_CONFIG = {
+    'income': 0.0,
+    'income_tax': 0.0,
+    'inc_growth_rate': 0.0,
+    'savings': 0.0,
+    'with_polymer': False,
+    'equity_contr': 0.0,
+}
+
+
+def partition(env: Environment, shards: int, regions: Dict[str, str] = None) -> Tuple[np.ndarray, np.ndarray]:
+    matrix = env.equity
+    individuals, homes = len(env.homeowners), len(env.homes)
+
+    # renters follow the home they live in and owners follow their largest holding
+    anchors = np.full(individuals, -1, dtype=np.int64)
+    nnz = matrix.nnz
+    rows, cols, values = matrix.rows[:nnz], matrix.cols[:nnz], matrix.values[:nnz]
+    order = np.lexsort((cols, -values, rows))
+    first = order[np.flatnonzero(np.append(True, rows[order][1:] != rows[order][:-1]))] if nnz else order
+    anchors[rows[first]] = cols[first]
+    for renter in env.renters.values():
+        if renter.residence is not None:
+            anchors[matrix.owner_index[renter.entity_id]] = matrix.home_index[renter.residence.entity_id]
+
+    names = [regions.get(home_id, home_id) if regions is not None else home_id for home_id in matrix.home_ids]
+    region_names, home_regions = np.unique(np.array(names, dtype=str), return_inverse=True)
+    anchored = anchors[anchors >= 0]
+    sizes = np.bincount(home_regions, minlength=len(region_names)) + \
+        np.bincount(home_regions[anchored], minlength=len(region_names))
+
+    loads = np.zeros(shards, dtype=np.int64)
+    region_shards = np.zeros(len(region_names), dtype=np.int64)
+    for region in np.argsort(-sizes, kind='stable').tolist():
+        shard = int(np.argmin(loads))
+        region_shards[region] = shard
+        loads[shard] += sizes[region]
+
+    home_shards = region_shards[home_regions] if homes else np.zeros(0, dtype=np.int64)
+    individual_shards = np.where(anchors >= 0, home_shards[np.maximum(anchors, 0)] if homes else 0, -1)
+    for row in np.flatnonzero(individual_shards < 0).tolist():
+        shard = int(np.argmin(loads))
+        individual_shards[row] = shard
+        loads[shard] += 1
+
+    return home_shards, individual_shards
+
+
+def split_environment(env: Environment, env_id: str, member_ids: Sequence[str], ghost_ids: Sequence[str],
+                      home_ids: Sequence[str]) -> Environment:
+    shard = env.spawn(env_id)
+    shard.year = env.year
+    shard.ledger.year = env.year
+
+    shard.add_homes([Home(home_id, dict(env.homes[home_id].config)) for home_id in home_ids])
+
+    individuals = []
+    for individual_id in member_ids:
+        source = env.homeowners[individual_id]
+        individual = Individual(individual_id, dict(source.config))
+        if source.has_expenses:
+            individual.expenses = {name: dict(expense) for name, expense in source.expenses.items()}
+        individuals.append(individual)
+    shard.add_homeowners(individuals + [Individual(ghost_id, dict(GHOST_CONFIG)) for ghost_id in ghost_ids])
+
+    members = set(member_ids)
+    for renter_id in env.renters:
+        if renter_id in members:
+            Environment.add_renter(shard, shard.homeowners[renter_id])
+    for home_id, renter in env.rentals_map.items():
+        if home_id in shard.homes:
+            shard.rentals_map[home_id] = shard.homeowners[renter.entity_id]
+    for individual in individuals:
+        residence = env.homeowners[individual.entity_id].residence
+        individual.residence = shard.homes[residence.entity_id] if residence is not None else None
+
+    matrix = env.equity
+    for owner, home, equity in zip(matrix.rows[:matrix.nnz].tolist(), matrix.cols[:matrix.nnz].tolist(),
+                                   matrix.values[:matrix.nnz].tolist()):
+        home_id = matrix.home_ids[home]
+        if home_id in shard.homes:
+            shard.equity.set(matrix.owner_ids[owner], home_id, equity)
+
+    loans = env.bank.loans.copy_state()
+    borrowed = np.fromiter((borrower_id in members for borrower_id in loans['borrower_ids']), dtype=np.bool_,
+                           count=len(loans['borrower_ids']))
+    shard.bank.loans.restore_state({
+        'borrower_ids': [borrower_id for borrower_id in loans['borrower_ids'] if borrower_id in members],
+        'columns': {name: values[borrowed] for name, values in loans['columns'].items()},
+    })
+
+    shard.rebuild_calendar()
+    shard.resync_balances()
+    return shard
+
+
+class Shard:
+    def __init__(self, env: Environment, member_ids: Sequence[str], ghost_ids: Sequence[str]):
+        self.env = env
+        self.members: Set[str] = set(member_ids)
+        self.ghosts: List[str] = list(ghost_ids)
+
+    def add_ghosts(self, ghost_ids: Sequence[str], paths: Any = None) -> None:
+        self.env.add_homeowners([Individual(ghost_id, dict(GHOST_CONFIG)) for ghost_id in ghost_ids])
+        self.ghosts.extend(ghost_ids)
+        if paths is not None:
+            self.env.use_market_paths(paths)
+
+    def step(self) -> Transfers:
+        self.env.step()
+
+        credits = []
+        for ghost_id in self.ghosts:
+            ghost = self.env.homeowners[ghost_id]
+            if ghost.config['savings'] != 0:
+                credits.append((ghost_id, ghost.config['savings']))
+                ghost.config['savings'] = 0
+        self.env.balances.credit_income(-sum(amount for _, amount in credits))
+        return credits
+
+    def apply(self, transfers: Transfers) -> None:
+        for individual_id, amount in transfers:
+            individual = self.env.homeowners[individual_id]
+            assert -amount <= round(individual.config['savings'] * 100) / 100, \
+                f"{individual_id} only has {individual.config['savings']}, not enough assets to pay {-amount}"
+            individual.config['savings'] += amount
+        self.env.balances.credit_income(sum(amount for _, amount in transfers))
+
+    def market_inputs(self, trader_ids: Sequence[str],
+                      pairs: Sequence[Tuple[str, str]]) -> Tuple[Dict[str, float], Dict[Tuple[str, str], float]]:
+        savings = {trader_id: self.env.homeowners[trader_id].config['savings']
+                   for trader_id in trader_ids if trader_id in self.members}
+        holdings = {(owner_id, home_id): self.env.equity.get(owner_id, home_id) for owner_id, home_id in pairs
+                    if home_id in self.env.homes and self.env.equity.has(owner_id, home_id)}
+        return savings, holdings
+
+    def execute_trades(self, trades: Sequence[Trade]) -> List[Trade]:
+        executed = []
+        for index, buyer_id, seller_id, home_id, quantity, price in trades:
+            held = self.env.equity.get(seller_id, home_id)
+            equity = min(quantity / held, 1) * held
+            self.env.equity.transfer(seller_id, buyer_id, home_id, equity)
+            executed.append((index, buyer_id, seller_id, home_id, equity, round(equity * price * 100) / 100))
+
+        return executed
+
+    def log(self) -> ShardLog:
+        return self.env.make_log_columns(), self.env.bank.savings, self.env.garbage.savings
+
+    def state(self) -> Dict[str, Any]:
+        env, matrix = self.env, self.env.equity
+        members = [individual for individual in env.homeowners.values() if individual.entity_id in self.members]
+        return {
+            'configs': {individual.entity_id: dict(individual.config) for individual in members},
+            'expenses': {
+                individual.entity_id: {name: dict(expense) for name, expense in individual.expenses.items()}
+                if individual.has_expenses else dict() for individual in members
+            },
+            'homes': {home_id: dict(home.config) for home_id, home in env.homes.items()},
+            'equity': [(matrix.owner_ids[owner], matrix.home_ids[home], equity) for owner, home, equity in
+                       zip(matrix.rows[:matrix.nnz].tolist(), matrix.cols[:matrix.nnz].tolist(),
+                           matrix.values[:matrix.nnz].tolist())],
+            'loans': env.bank.loans.copy_state(),
+        }
+
+
+def _shard_worker(conn: Connection, shard: Shard) -> None:
+    while True:
+        message = conn.recv()
+        if message is None:
+            break
+        method, args = message
+        conn.send(getattr(shard, method)(*args))
+    conn.close()
+
+
+class ShardedEnvironment:
+    def __init__(self, env: Environment, shards: int, regions: Dict[str, str] = None, processes: bool = True,
+                 start_method: str = None):
+        assert shards > 0, "Sharded environments need at least one shard"
+        self.env = env
+        self.year = env.year
+        self.logs: List[Log] = []
+
+        self.individual_ids = list(env.homeowners)
+        self.home_ids = list(env.homes)
+        self.home_shards, self.individual_shards = partition(env, shards, regions)
+
+        matrix = env.equity
+        owners_by_shard: List[Set[int]] = [set() for _ in range(shards)]
+        for owner, home in zip(matrix.rows[:matrix.nnz].tolist(), matrix.cols[:matrix.nnz].tolist()):
+            owners_by_shard[self.home_shards[home]].add(owner)
+
+        self.shards: List[Shard] = []
+        self.shard_individuals: List[List[str]] = []
+        self.shard_homes: List[np.ndarray] = []
+        for shard in range(shards):
+            members = np.flatnonzero(self.individual_shards == shard)
+            ghosts = sorted(owners_by_shard[shard] - set(members.tolist()))
+            homes = np.flatnonzero(self.home_shards == shard)
+            member_ids = [self.individual_ids[row] for row in members.tolist()]
+            ghost_ids = [self.individual_ids[row] for row in ghosts]
+
+            self.shard_individuals.append(member_ids + ghost_ids)
+            self.shard_homes.append(homes)
+            shard_env = split_environment(env, f"{env.env_id}-shard-{shard}", member_ids, ghost_ids,
+                                          [self.home_ids[home] for home in homes.tolist()])
+            self.shards.append(Shard(shard_env, member_ids, ghost_ids))
+            if env.market_paths is not None:
+                shard_env.use_market_paths(self.shard_paths(shard))
+
+        self.bank_start = [shard.env.bank.savings for shard in self.shards]
+        self.garbage_start = [shard.env.garbage.savings for shard in self.shards]
+        self.bank_savings = list(self.bank_start)
+        self.garbage_savings = list(self.garbage_start)
+
+        self.workers: List[Tuple[multiprocessing.Process, Connection]] = []
+        if processes:
+            context = multiprocessing.get_context(start_method)
+            for shard in self.shards:
+                parent, child = context.Pipe()
+                process = context.Process(target=_shard_worker, args=(child, shard), daemon=True)
+                process.start()
+                child.close()
+                self.workers.append((process, parent))
+
+    def __enter__(self) -> 'ShardedEnvironment':
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None and self.workers:
+            self.sync()
+        self.close()
+
+    def close(self) -> None:
+        for process, conn in self.workers:
+            conn.send(None)
+            conn.close()
+            process.join()
+        self.workers = []
+
+    def call(self, method: str, args: Sequence[Tuple] = None) -> List[Any]:
+        args = args if args is not None else [()] * len(self.shards)
+        if not self.workers:
+            return [getattr(shard, method)(*shard_args) for shard, shard_args in zip(self.shards, args)]
+
+        for (_, conn), shard_args in zip(self.workers, args):
+            conn.send((method, shard_args))
+        return [conn.recv() for _, conn in self.workers]
+
+    def shard_paths(self, shard: int) -> Any:
+        index = self.env.equity.owner_index
+        rows = np.array([index[individual_id] for individual_id in self.shard_individuals[shard]], dtype=np.int64)
+        return self.env.market_paths.subset(rows, self.shard_homes[shard])
+
+    def member_shard(self, individual_id: str) -> int:
+        return int(self.individual_shards[self.env.equity.owner_index[individual_id]])
+
+    def route(self, transfers: Iterable[Tuple[str, float]]) -> List[Tuple[Transfers]]:
+        routed: List[Transfers] = [[] for _ in self.shards]
+        for individual_id, amount in transfers:
+            routed[self.member_shard(individual_id)].append((individual_id, amount))
+
+        return [(shard_transfers,) for shard_transfers in routed]
+
+    def exchange(self, transfers: Iterable[Tuple[str, float]]) -> None:
+        self.call('apply', self.route(transfers))
+
+    def clear_market(self) -> None:
+        market, matrix = self.env.market, self.env.equity
+        owner_ids, home_ids = matrix.owner_ids, matrix.home_ids
+        traders, homes = market.column('trader'), market.column('home')
+        asks = market.column('side') == ASK
+        trader_ids = sorted({owner_ids[trader] for trader in traders.tolist()})
+        pairs = sorted({(owner_ids[trader], home_ids[home])
+                        for trader, home in zip(traders[asks].tolist(), homes[asks].tolist())})
+
+        savings = np.zeros(len(owner_ids), dtype=np.float64)
+        for shard_savings, holdings in self.call('market_inputs', [(trader_ids, pairs)] * len(self.shards)):
+            for trader_id, value in shard_savings.items():
+                savings[matrix.owner_index[trader_id]] = value
+            for (owner_id, home_id), equity in holdings.items():
+                matrix.set(owner_id, home_id, equity)
+
+        trades = market.clear(savings)
+        trading = np.flatnonzero(trades['buyer'] != trades['seller'])
+        if len(trading) == 0:
+            return
+
+        orders: List[List[Trade]] = [[] for _ in self.shards]
+        ghosts: List[List[str]] = [[] for _ in self.shards]
+        for index in trading.tolist():
+            shard = int(self.home_shards[trades['home'][index]])
+            buyer_id = owner_ids[trades['buyer'][index]]
+            if buyer_id not in self.shard_individuals[shard] and buyer_id not in ghosts[shard]:
+                ghosts[shard].append(buyer_id)
+            orders[shard].append((index, buyer_id, owner_ids[trades['seller'][index]],
+                                  home_ids[trades['home'][index]], trades['quantity'][index].item(),
+                                  trades['price'][index].item()))
+
+        if any(ghosts):
+            for shard, ghost_ids in enumerate(ghosts):
+                self.shard_individuals[shard].extend(ghost_ids)
+            paths = [self.shard_paths(shard) if ghost_ids and self.env.market_paths is not None else None
+                     for shard, ghost_ids in enumerate(ghosts)]
+            self.call('add_ghosts', list(zip(ghosts, paths)))
+
+        transfers = []
+        for _, buyer_id, seller_id, home_id, equity, amount in sorted(
+                trade for executed in self.call('execute_trades', [(shard_orders,) for shard_orders in orders])
+                for trade in executed):
+            matrix.transfer(seller_id, buyer_id, home_id, equity)
+            transfers.extend(((buyer_id, -amount), (seller_id, amount)))
+        self.exchange(transfers)
+
+    def merge(self, results: List[ShardLog]) -> LogColumns:
+        merged: LogColumns = {
+            'year': self.year,
+            'individual_ids': self.individual_ids,
+            'home_ids': self.home_ids,
+        }
+        for metric in INDIVIDUAL_METRICS:
+            merged[metric] = np.zeros(len(self.individual_ids), dtype=np.float64)
+        for metric in HOME_METRICS:
+            merged[metric] = np.zeros(len(self.home_ids), dtype=np.float64)
+
+        index = self.env.equity.owner_index
+        for shard, (columns, bank_savings, garbage_savings) in enumerate(results):
+            rows = np.array([index[individual_id] for individual_id in self.shard_individuals[shard]],
+                            dtype=np.int64)
+            members = self.individual_shards[rows] == shard
+            # ghosts hold no savings at the year boundary, so their net worth is the equity they hold here
+            merged['savings'][rows[members]] = columns['savings'][members]
+            np.add.at(merged['net_worth'], rows, columns['net_worth'])
+            for metric in HOME_METRICS:
+                merged[metric][self.shard_homes[shard]] = columns[metric]
+            self.bank_savings[shard] = bank_savings
+            self.garbage_savings[shard] = garbage_savings
+
+        return merged
+
+    def progress_one_year(self) -> Log:
+        credits = self.call('step')
+        self.exchange(credit for shard_credits in credits for credit in shard_credits)
+        if len(self.env.market):
+            self.clear_market()
+
+        self.year += 1
+        log = self.env.make_log(self.merge(self.call('log')))
+        self.logs.append(log)
+        return log
+
+    def progress_years(self, years: int) -> List[Log]:
+        return [self.progress_one_year() for _ in range(years)]
+
+    def sync(self) -> Environment:
+        env = self.env
+        loans = []
+        for state in self.call('state'):
+            for individual_id, config in state['configs'].items():
+                env.homeowners[individual_id].config.update(config)
+            for individual_id, expenses in state['expenses'].items():
+                env.homeowners[individual_id].expenses = expenses
+            for home_id, config in state['homes'].items():
+                env.homes[home_id].config.update(config)
+            for owner_id, home_id, equity in state['equity']:
+                env.equity.set(owner_id, home_id, equity)
+            loans.append(state['loans'])
+
+        env.bank.loans.restore_state({
+            'borrower_ids': [borrower_id for state in loans for borrower_id in state['borrower_ids']],
+            'columns': {name: np.concatenate([state['columns'][name] for state in loans])
+                        for name in loans[0]['columns']},
+        })
+        env.bank.config['savings'] = self.get_bank_savings()
+        env.garbage.config['savings'] = self.get_garbage_savings()
+        self.bank_start = list(self.bank_savings)
+        self.garbage_start = list(self.garbage_savings)
+
+        env.year = self.year
+        env.ledger.year = self.year
+        env.rebuild_calendar()
+        env.resync_balances()
+        return env
+
+    def get_bank_savings(self) -> float:
+        return self.env.bank.savings + sum(end - start for start, end in zip(self.bank_start, self.bank_savings))
+
+    def get_garbage_savings(self) -> float:
+        return self.env.garbage.savings + sum(end - start
+                                              for start, end in zip(self.garbage_start, self.garbage_savings))
+
+    def shard_of(self, entity_id: str) -> Optional[int]:
+        if entity_id in self.env.homes:
+            return int(self.home_shards[self.env.equity.home_index[entity_id]])
+        if entity_id in self.env.homeowners:
+            return self.member_shard(entity_id)
+
+        return None
@@ -0,0 +1,340 @@
+from typing import Any, Callable, Dict, Iterable, List, Set, Tuple
+import copy
+import itertools
+import numpy as np
+
+from sim_assets.entities.Entity import Entity
+from sim_assets.entities.EntityTable import EntityTable, bind_entity, bind_entities
+from sim_assets.entities.Individual import Individual
+from sim_assets.entities.Home import Home
+from sim_assets.env.Environment import Environment, EnvironmentConfig
+from sim_assets.env.EquityMarket import TradeBatch
+from sim_assets.env.FastForward import IndependentBlock
+from sim_assets.env.Settlement import CENTS, TransferBatch, settle, to_cents
+from sim_assets.records.DistributionStats import StatsLog
+from sim_assets.records.Ledger import Ledger, EQUITY_CONTRIBUTION, EQUITY_PURCHASE
+from sim_assets.records.LogStore import LogStore
+from sim_assets.records.Profiler import Profiler
+
+INDIVIDUAL_COLUMNS = {
+    'savings': np.float64,
+    'income': np.float64,
+    'income_tax': np.float64,
+    'inc_growth_rate': np.float64,
+    'equity_contr': np.float64,
+    'with_polymer': np.bool_,
+}
+
+HOME_COLUMNS = {
+    'savings': np.float64,
+    'prop_val': np.float64,
+    'rent': np.float64,
+}
+
+
+class VectorEnvironment(Environment):
+    def __init__(self, env_id: str, config: EnvironmentConfig, ledger: Ledger = None, log_store: LogStore = None,
+                 capacity: int = 1024, lazy_growth: bool = False, cents: bool = False, profiler: Profiler = None,
+                 stats_log: StatsLog = None):
+        Environment.__init__(self, env_id, config, ledger, log_store, profiler, stats_log)
+        self.individual_table = EntityTable(INDIVIDUAL_COLUMNS, capacity)
+        self.home_table = EntityTable(dict(HOME_COLUMNS, appr_rate=np.float64) if lazy_growth else HOME_COLUMNS,
+                                      capacity)
+
+        self.lazy_growth = lazy_growth
+        self.home_appr_rate = self.config['home_appr_rate']
+        if lazy_growth:
+            self.home_table.make_lazy('prop_val', 'appr_rate')
+            self.home_table.make_lazy('rent', 'appr_rate')
+
+        self.cents = cents
+        self.batch: TransferBatch = None
+        self.batch_records: List[Tuple[str, str, float, str]] = []
+        if cents:
+            self.individual_table.make_fixed_point('savings', CENTS)
+            self.home_table.make_fixed_point('savings', CENTS)
+
+        brackets = self.config['tax_brackets']
+        self.bracket_max = np.array([bracket['max_amount'] for bracket in brackets], dtype=np.float64)
+        self.bracket_tax = np.array([bracket['tax'] for bracket in brackets], dtype=np.float64)
+        assert np.all(np.diff(self.bracket_max) >= 0), \
+            f"Tax brackets in environment {env_id} must be sorted by max_amount"
+
+    def add_home(self, home: Home) -> None:
+        Environment.add_home(self, home)
+        row = bind_entity(self.home_table, home)
+        if self.lazy_growth:
+            self.home_table.columns['appr_rate'][row] = self.home_appr_rate
+
+    def add_homeowner(self, owner: Individual) -> None:
+        Environment.add_homeowner(self, owner)
+        bind_entity(self.individual_table, owner)
+
+    def add_renter(self, renter: Individual) -> None:
+        Environment.add_renter(self, renter)
+        bind_entity(self.individual_table, renter)
+
+    def add_homes(self, homes: Iterable[Home]) -> None:
+        homes = list(homes)
+        for home in homes:
+            Environment.add_home(self, home)
+
+        start = len(self.home_table)
+        bind_entities(self.home_table, homes)
+        if self.lazy_growth:
+            self.home_table.columns['appr_rate'][start:len(self.home_table)] = self.home_appr_rate
+
+    def add_homeowners(self, owners: Iterable[Individual]) -> None:
+        owners = list(owners)
+        for owner in owners:
+            Environment.add_homeowner(self, owner)
+        bind_entities(self.individual_table, owners)
+
+    def add_renters(self, renters: Iterable[Individual]) -> None:
+        renters = list(renters)
+        for renter in renters:
+            Environment.add_renter(self, renter)
+        bind_entities(self.individual_table, renters)
+
+    def spawn(self, env_id: str) -> 'VectorEnvironment':
+        env = VectorEnvironment(env_id, copy.deepcopy(self.config), Ledger(self.ledger.level),
+                                lazy_growth=self.lazy_growth, cents=self.cents)
+        env.home_appr_rate = self.home_appr_rate
+        return env
+
+    def capture_configs(self) -> Dict[str, Any]:
+        extras = {
+            entity.entity_id: dict(entity.config.extra)
+            for entity in itertools.chain(self.homes.values(), self.homeowners.values()) if entity.config.extra
+        }
+        return {
+            'individuals': self.individual_table.copy_state(),
+            'homes': self.home_table.copy_state(),
+            'home_appr_rate': self.home_appr_rate,
+            'extras': extras,
+        }
+
+    def restore_configs(self, configs: Dict[str, Any]) -> None:
+        self.individual_table.restore_state(configs['individuals'])
+        self.home_table.restore_state(configs['homes'])
+        self.home_appr_rate = configs['home_appr_rate']
+        for entity in itertools.chain(self.homes.values(), self.homeowners.values()):
+            extra = configs['extras'].get(entity.entity_id)
+            entity.config.extra = dict(extra) if extra is not None else None
+
+    def make_independent_block(self, rows: np.ndarray) -> IndependentBlock:
+        block = Environment.make_independent_block(self, rows)
+        block.cents = self.cents
+        return block
+
+    def collect_incomes(self, active: np.ndarray = None) -> None:
+        rows = slice(None) if active is None else active
+        savings = self.individual_table.column('savings')
+        income_tax = self.individual_table.column('income_tax')[rows]
+        income = (1 - income_tax) * self.individual_table.column('income')[rows]
+        if self.cents:
+            income = to_cents(income)
+            savings[rows] += income
+            self.balances.credit_income(income.sum() / CENTS)
+        else:
+            savings[rows] += income
+            self.balances.credit_income(float(income.sum()))
+
+    def process_expenses(self, skip: Set[str] = None) -> None:
+        if not self.cents:
+            Environment.process_expenses(self, skip)
+            return
+
+        self.settle_transfers(Environment.process_expenses, skip)
+
+    def process_rent(self) -> None:
+        if not self.cents:
+            Environment.process_rent(self)
+            return
+
+        self.settle_transfers(Environment.process_rent)
+
+    def settle_transfers(self, process: Callable[..., None], *args) -> None:
+        self.batch = TransferBatch()
+        self.batch_records = []
+        try:
+            process(self, *args)
+            self.batch.settle(self.individual_table.column('savings'))
+            for payer_id, payee_id, amount, reason in self.batch_records:
+                if self.ledger.level:
+                    self.ledger.record(payer_id, payee_id, amount, reason)
+                if self.profiler is not None:
+                    self.profiler.record_pay(payer_id, payee_id, amount)
+        finally:
+            self.batch = None
+            self.batch_records = []
+
+    def transfer(self, payer: Entity, payee: Entity, amount: float, reason: str) -> None:
+        row = self.individual_table.index.get(payer.entity_id)
+        if self.batch is None or row is None:
+            Environment.transfer(self, payer, payee, amount, reason)
+            return
+
+        cents = round(amount * CENTS)
+        assert cents >= 0, f"{payer.entity_id} cannot pay a negative amount of money"
+        payee_row = self.individual_table.index.get(payee.entity_id)
+        self.batch.add(row, payee_row if payee_row is not None else self.batch.external(payee), cents)
+        self.batch_records.append((payer.entity_id, payee.entity_id, cents / CENTS, reason))
+
+    def appreciate_income(self, active: np.ndarray = None) -> None:
+        self.apply_income_paths()
+        rows = slice(None) if active is None else active
+        income = self.individual_table.column('income')
+        income[rows] += self.individual_table.column('inc_growth_rate')[rows] * income[rows]
+        self.individual_table.column('income_tax')[rows] = self.get_tax_brackets(income[rows])
+
+    def apply_income_paths(self) -> None:
+        if self.market_paths is not None:
+            self.individual_table.column('inc_growth_rate')[:] = \
+                self.market_paths.inc_growth_rates[self.market_paths.index(self.year)]
+
+    def get_tax_brackets(self, income: np.ndarray) -> np.ndarray:
+        brackets = np.searchsorted(self.bracket_max, income, side='left')
+        assert len(brackets) == 0 or brackets.max() < len(self.bracket_max), \
+            f"Some incomes are above every tax bracket in environment {self.env_id}"
+
+        return self.bracket_tax[brackets]
+
+    def appreciate_homes(self) -> None:
+        if self.market_paths is not None:
+            index = self.market_paths.index(self.year)
+            self.appreciate_homes_by(self.market_paths.appr_rates[index], self.market_paths.rent_rates[index])
+            return
+
+        rate = self.config['home_appr_rate']
+        if self.lazy_growth:
+            if rate != self.home_appr_rate:
+                self.home_table.rebase('prop_val')
+                self.home_table.rebase('rent')
+                self.home_table.column('appr_rate')[:] = rate
+                self.home_appr_rate = rate
+
+            self.home_table.advance_clock()
+            self.balances.appreciate(rate)
+            return
+
+        prop_val = self.home_table.column('prop_val')
+        rent = self.home_table.column('rent')
+        prop_val += rate * prop_val
+        rent += rate * rent
+        self.balances.appreciate(rate)
+
+    def appreciate_homes_by(self, appr_rates: np.ndarray, rent_rates: np.ndarray) -> None:
+        # per-home rates defeat the shared lazy growth clock, so fold pending growth into the stored values first
+        if self.lazy_growth:
+            self.home_table.rebase('prop_val')
+            self.home_table.rebase('rent')
+
+        prop_val = self.home_table.columns['prop_val'][:len(self.home_table)]
+        rent = self.home_table.columns['rent'][:len(self.home_table)]
+        prop_val += appr_rates * prop_val
+        rent += rent_rates * rent
+        self.home_table.invalidate()
+        self.balances.revalue(prop_val)
+
+    def contribute_equities(self) -> None:
+        renters = [renter for renter in self.renters.values() if renter.residence is not None]
+        if not renters:
+            return
+
+        owner_index, home_index = self.equity.owner_index, self.equity.home_index
+        renter_rows = np.fromiter((owner_index[renter.entity_id] for renter in renters), dtype=np.int64,
+                                  count=len(renters))
+        homes = np.fromiter((home_index[renter.residence.entity_id] for renter in renters), dtype=np.int64,
+                            count=len(renters))
+        polymer = self.individual_table.column('with_polymer')[renter_rows]
+        renter_rows, homes = renter_rows[polymer], homes[polymer]
+        renters = list(itertools.compress(renters, polymer.tolist()))
+
+        indptr, order = self.equity.csc()
+        starts = indptr[homes]
+        counts = indptr[homes + 1] - starts
+        pair_renters = np.repeat(np.arange(len(renters)), counts)
+        offsets = np.arange(len(pair_renters)) - np.repeat(np.cumsum(counts) - counts, counts)
+        slots = order[np.repeat(starts, counts) + offsets]
+
+        is_renter = self.equity.rows[slots] == renter_rows[pair_renters]
+        renter_equity = np.zeros(len(renters), dtype=np.float64)
+        renter_equity[pair_renters[is_renter]] = self.equity.values[slots[is_renter]]
+        contributing = renter_equity < 1
+
+        pairs = ~is_renter & contributing[pair_renters]
+        slots, pair_renters = slots[pairs], pair_renters[pairs]
+        if len(slots) == 0:
+            return
+
+        prop_vals = self.get_prop_vals()[homes]
+        savings = self.get_savings()[renter_rows]
+        amount_to_contr = self.individual_table.column('equity_contr')[renter_rows] * savings
+        equity_to_contr = np.minimum(amount_to_contr / (prop_vals * 1.1), 1 - renter_equity)
+
+        shares = self.equity.values[slots]
+        equities_to_take = np.minimum(equity_to_contr[pair_renters] * (shares / (1 - renter_equity[pair_renters])),
+                                      shares)
+        payments = np.round(equities_to_take * prop_vals[pair_renters] * 1.1 * 100) / 100
+
+        self.pay_rows(renter_rows[pair_renters], self.equity.rows[slots], payments, EQUITY_CONTRIBUTION)
+        renter_slots = np.fromiter(
+            (self.equity.slot(renter.entity_id, renter.residence.entity_id) for renter in renters), dtype=np.int64,
+            count=len(renters))
+        self.equity.move(slots, renter_slots[pair_renters], equities_to_take)
+
+    def execute_trades(self, trades: TradeBatch) -> None:
+        trading = trades['buyer'] != trades['seller']
+        buyers, sellers = trades['buyer'][trading], trades['seller'][trading]
+        homes, quantities = trades['home'][trading], trades['quantity'][trading]
+        if len(buyers) == 0:
+            return
+
+        owner_ids, home_ids = self.equity.owner_ids, self.equity.home_ids
+        slots = self.equity.slots
+        from_slots = np.fromiter((slots[key] for key in ((sellers << 32) | homes).tolist()), dtype=np.int64,
+                                 count=len(sellers))
+
+        payments = np.round(quantities * trades['price'][trading] * 100) / 100
+        self.pay_rows(buyers, sellers, payments, EQUITY_PURCHASE)
+        to_slots = np.fromiter((self.equity.slot(owner_ids[buyer], home_ids[home])
+                                for buyer, home in zip(buyers.tolist(), homes.tolist())), dtype=np.int64,
+                               count=len(buyers))
+        self.equity.move(from_slots, to_slots, quantities)
+
+    def pay_rows(self, payers: np.ndarray, payees: np.ndarray, payments: np.ndarray, reason: str) -> None:
+        assert len(payments) == 0 or payments.min() >= 0, "Cannot pay a negative amount of money"
+        if self.cents:
+            settle(self.individual_table.column('savings'), payers, payees, to_cents(payments))
+        else:
+            balances = self.individual_table.column('savings')
+            outflow = np.bincount(payers, weights=payments, minlength=len(balances))
+            short = np.flatnonzero(outflow > np.round(balances * 100) / 100)
+            assert len(short) == 0, f"{self.equity.owner_ids[short[0]]} only has {balances[short[0]]}, not enough " \
+                                    f"assets to pay {outflow[short[0]]} for {reason}"
+
+            np.add.at(balances, payees, payments)
+            np.subtract.at(balances, payers, payments)
+
+        if self.ledger.level:
+            owner_ids = self.equity.owner_ids
+            for payer, payee, amount in zip(payers.tolist(), payees.tolist(), payments.tolist()):
+                self.ledger.record(owner_ids[payer], owner_ids[payee], amount, reason)
+        if self.profiler is not None:
+            self.profiler.record_batch(len(payments), float(payments.sum()), len(np.union1d(payers, payees)))
+
+    def get_individual_column(self, name: str) -> np.ndarray:
+        return self.individual_table.values(name)
+
+    def set_individual_column(self, name: str, rows: np.ndarray, values: np.ndarray) -> None:
+        self.individual_table.assign(name, rows, values)
+
+    def get_savings(self) -> np.ndarray:
+        return self.individual_table.values('savings')
+
+    def get_prop_vals(self) -> np.ndarray:
+        return self.home_table.column('prop_val')
+
+    def get_rents(self) -> np.ndarray:
+        return self.home_table.column('rent')
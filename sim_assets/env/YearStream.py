@@ -0,0 +1,39 @@
+from typing import Any, Callable
+import queue
+import threading
+
+END_OF_RUN = object()
+
+
+class YearStream:
+    def __init__(self, step: Callable[[], Any], years: int, prefetch: int = 1):
+        # the queue bounds how many finished years can pile up while the consumer is busy
+        self.results: queue.Queue = queue.Queue(max(prefetch, 1))
+        self.stopping = threading.Event()
+        self.producer = threading.Thread(target=self.produce, args=(step, years), daemon=True)
+        self.producer.start()
+
+    def produce(self, step: Callable[[], Any], years: int) -> None:
+        try:
+            for _ in range(years):
+                if self.stopping.is_set():
+                    break
+                self.results.put(step())
+        except BaseException as e:
+            self.results.put(e)
+        self.results.put(END_OF_RUN)
+
+    def get(self) -> Any:
+        result = self.results.get()
+        if isinstance(result, BaseException):
+            raise result
+        return result
+
+    def close(self) -> None:
+        self.stopping.set()
+        while self.producer.is_alive():
+            try:
+                self.results.get(timeout=0.01)
+            except queue.Empty:
+                pass
+        self.producer.join()
@@ -0,0 +1,227 @@
+from typing import Dict, List, Sequence, Tuple, TypedDict
+import copy
+import math
+import numpy as np
+
+from sim_assets.records.LogStore import LogColumns, INDIVIDUAL_METRICS
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90, 99)
+
+
+class MetricSummary(TypedDict):
+    count: int
+    mean: float
+    std: float
+    min: float
+    max: float
+    gini: float
+    percentiles: Dict[str, float]
+
+
+class OwnershipSummary(TypedDict):
+    individuals: int
+    homeowners: int
+    rate: float
+
+
+class YearSummary(TypedDict):
+    year: int
+    metrics: Dict[str, MetricSummary]
+    homeownership: Dict[str, OwnershipSummary]
+
+
+class QuantileSketch:
+    # log-spaced buckets with a bounded relative error, so sketches built on different shards or
+    # replicas can be merged by adding bucket counts
+    def __init__(self, relative_accuracy: float = 0.01, min_value: float = 0.01):
+        assert 0 < relative_accuracy < 1, f"Relative accuracy must be in (0, 1), not {relative_accuracy}"
+        self.relative_accuracy = relative_accuracy
+        self.min_value = min_value
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self.log_gamma = math.log(self.gamma)
+
+        self.positive: Dict[int, int] = dict()
+        self.negative: Dict[int, int] = dict()
+        self.zeros = 0
+        self.count = 0
+
+    def _add_buckets(self, buckets: Dict[int, int], magnitudes: np.ndarray) -> None:
+        keys, counts = np.unique(np.ceil(np.log(magnitudes) / self.log_gamma).astype(np.int64), return_counts=True)
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            buckets[key] = buckets.get(key, 0) + count
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        values = values[~np.isnan(values)]
+        small = np.abs(values) < self.min_value
+        self.zeros += int(small.sum())
+        self._add_buckets(self.positive, values[~small & (values > 0)])
+        self._add_buckets(self.negative, -values[~small & (values < 0)])
+        self.count += len(values)
+
+    def merge(self, other: 'QuantileSketch') -> None:
+        assert self.gamma == other.gamma and self.min_value == other.min_value, "Only identical sketches can merge"
+        for buckets, other_buckets in ((self.positive, other.positive), (self.negative, other.negative)):
+            for key, count in other_buckets.items():
+                buckets[key] = buckets.get(key, 0) + count
+        self.zeros += other.zeros
+        self.count += other.count
+
+    def _value(self, key: int) -> float:
+        return 2 * self.gamma ** key / (self.gamma + 1)
+
+    def bins(self) -> Tuple[np.ndarray, np.ndarray]:
+        negative = sorted(self.negative, reverse=True)
+        positive = sorted(self.positive)
+        values = [-self._value(key) for key in negative] + [0.0] + [self._value(key) for key in positive]
+        counts = [self.negative[key] for key in negative] + [self.zeros] + [self.positive[key] for key in positive]
+        return np.array(values, dtype=np.float64), np.array(counts, dtype=np.int64)
+
+    def quantiles(self, q: Sequence[float]) -> np.ndarray:
+        if self.count == 0:
+            return np.full(len(q), np.nan)
+
+        values, counts = self.bins()
+        ranks = np.asarray(q, dtype=np.float64) * (self.count - 1)
+        return values[np.searchsorted(np.cumsum(counts), ranks, side='right')]
+
+    def gini(self) -> float:
+        values, counts = self.bins()
+        total = float((values * counts).sum())
+        if self.count == 0 or total == 0:
+            return np.nan
+
+        below = np.cumsum(counts) - counts
+        above = self.count - below - counts
+        return float((counts * values * (below - above)).sum() / (self.count * total))
+
+
+class MetricStats:
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.min = math.inf
+        self.max = -math.inf
+        self.sketch = QuantileSketch(relative_accuracy)
+
+    def add(self, values: np.ndarray) -> None:
+        values = np.asarray(values, dtype=np.float64)
+        if len(values) == 0:
+            return
+
+        self.count += len(values)
+        self.total += float(values.sum())
+        self.total_sq += float(np.dot(values, values))
+        self.min = min(self.min, float(values.min()))
+        self.max = max(self.max, float(values.max()))
+        self.sketch.add(values)
+
+    def merge(self, other: 'MetricStats') -> None:
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        self.sketch.merge(other.sketch)
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count else np.nan
+
+    @property
+    def std(self) -> float:
+        if self.count == 0:
+            return np.nan
+        return math.sqrt(max(self.total_sq / self.count - self.mean ** 2, 0))
+
+    def summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> MetricSummary:
+        quantiles = self.sketch.quantiles([p / 100 for p in percentiles])
+        return {
+            'count': self.count,
+            'mean': self.mean,
+            'std': self.std,
+            'min': self.min,
+            'max': self.max,
+            'gini': self.sketch.gini(),
+            'percentiles': {f"p{p:g}": value for p, value in zip(percentiles, quantiles.tolist())},
+        }
+
+
+class YearStats:
+    def __init__(self, year: int, relative_accuracy: float = 0.01):
+        self.year = year
+        self.metrics: Dict[str, MetricStats] = {
+            metric: MetricStats(relative_accuracy) for metric in INDIVIDUAL_METRICS
+        }
+        self.individuals = np.zeros(2, dtype=np.int64)
+        self.homeowners = np.zeros(2, dtype=np.int64)
+
+    def add(self, columns: LogColumns, owning: np.ndarray, with_polymer: np.ndarray) -> None:
+        for metric, stats in self.metrics.items():
+            stats.add(columns[metric])
+
+        with_polymer = with_polymer.astype(np.int64)
+        self.individuals += np.bincount(with_polymer, minlength=2)
+        self.homeowners += np.bincount(with_polymer[owning], minlength=2)
+
+    def merge(self, other: 'YearStats') -> None:
+        assert self.year == other.year, f"Cannot merge year {other.year} into year {self.year}"
+        for metric, stats in self.metrics.items():
+            stats.merge(other.metrics[metric])
+        self.individuals += other.individuals
+        self.homeowners += other.homeowners
+
+    def homeownership_rate(self, with_polymer: bool = None) -> float:
+        if with_polymer is None:
+            individuals, homeowners = self.individuals.sum(), self.homeowners.sum()
+        else:
+            individuals, homeowners = self.individuals[int(with_polymer)], self.homeowners[int(with_polymer)]
+
+        return float(homeowners / individuals) if individuals else np.nan
+
+    def summary(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> YearSummary:
+        homeownership = dict()
+        for name, with_polymer in (('all', None), ('with_polymer', True), ('without_polymer', False)):
+            rows = slice(None) if with_polymer is None else int(with_polymer)
+            homeownership[name] = {
+                'individuals': int(np.sum(self.individuals[rows])),
+                'homeowners': int(np.sum(self.homeowners[rows])),
+                'rate': self.homeownership_rate(with_polymer),
+            }
+
+        return {
+            'year': self.year,
+            'metrics': {metric: stats.summary(percentiles) for metric, stats in self.metrics.items()},
+            'homeownership': homeownership,
+        }
+
+
+class StatsLog:
+    def __init__(self, relative_accuracy: float = 0.01):
+        self.relative_accuracy = relative_accuracy
+        self.years: List[YearStats] = []
+
+    def __len__(self) -> int:
+        return len(self.years)
+
+    def append(self, columns: LogColumns, owning: np.ndarray, with_polymer: np.ndarray) -> YearStats:
+        stats = YearStats(columns['year'], self.relative_accuracy)
+        stats.add(columns, owning, with_polymer)
+        self.years.append(stats)
+        return stats
+
+    def merge(self, other: 'StatsLog') -> None:
+        years = {stats.year: stats for stats in self.years}
+        for stats in other.years:
+            if stats.year in years:
+                years[stats.year].merge(stats)
+            else:
+                years[stats.year] = copy.deepcopy(stats)
+        self.years = [years[year] for year in sorted(years)]
+
+    def truncate(self, year: int) -> None:
+        self.years = [stats for stats in self.years if stats.year <= year]
+
+    def summaries(self, percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> List[YearSummary]:
+        return [stats.summary(percentiles) for stats in self.years]
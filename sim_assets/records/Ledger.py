@@ -0,0 +1,155 @@
+from enum import IntEnum
+from typing import Dict, List, Tuple
+import os
+import numpy as np
+
+RENT = "rent"
+HOME_PURCHASE = "home purchase"
+EQUITY_PURCHASE = "equity purchase"
+EQUITY_CONTRIBUTION = "equity contribution"
+MORTGAGE_LOAN = "mortgage loan"
+
+
+class LedgerLevel(IntEnum):
+    OFF = 0
+    AGGREGATE = 1
+    FULL = 2
+
+
+class Ledger:
+    def __init__(self, level: LedgerLevel = LedgerLevel.OFF, capacity: int = 4096, directory: str = None):
+        self.level = level
+        self.year = 0
+        self.capacity = max(capacity, 1)
+        self.directory = directory
+        self.shards = 0
+
+        self.entity_codes: Dict[str, int] = dict()
+        self.entity_names: List[str] = []
+        self.reason_codes: Dict[str, int] = dict()
+        self.reason_names: List[str] = []
+        self._flushed_entities = 0
+        self._flushed_reasons = 0
+
+        self.size = 0
+        self.payers = np.zeros(self.capacity, dtype=np.int32)
+        self.payees = np.zeros(self.capacity, dtype=np.int32)
+        self.amounts = np.zeros(self.capacity, dtype=np.float64)
+        self.reasons = np.zeros(self.capacity, dtype=np.int32)
+        self.years = np.zeros(self.capacity, dtype=np.int32)
+
+        self.aggregates: Dict[Tuple[int, int], List[float]] = dict()
+
+    def intern_entity(self, entity_id: str) -> int:
+        code = self.entity_codes.get(entity_id)
+        if code is None:
+            code = self.entity_codes[entity_id] = len(self.entity_names)
+            self.entity_names.append(entity_id)
+
+        return code
+
+    def intern_reason(self, reason: str) -> int:
+        code = self.reason_codes.get(reason)
+        if code is None:
+            code = self.reason_codes[reason] = len(self.reason_names)
+            self.reason_names.append(reason)
+
+        return code
+
+    def record(self, payer_id: str, payee_id: str, amount: float, reason: str) -> None:
+        if self.level == LedgerLevel.OFF:
+            return
+
+        reason_code = self.intern_reason(reason)
+        totals = self.aggregates.get((self.year, reason_code))
+        if totals is None:
+            totals = self.aggregates[(self.year, reason_code)] = [0, 0.0]
+        totals[0] += 1
+        totals[1] += amount
+
+        if self.level < LedgerLevel.FULL:
+            return
+
+        if self.size == self.capacity:
+            if self.directory is not None:
+                self.flush()
+            else:
+                self._grow()
+
+        row = self.size
+        self.payers[row] = self.intern_entity(payer_id)
+        self.payees[row] = self.intern_entity(payee_id)
+        self.amounts[row] = amount
+        self.reasons[row] = reason_code
+        self.years[row] = self.year
+        self.size += 1
+
+    def _grow(self) -> None:
+        self.capacity = max(2 * self.capacity, 1)
+        for name in ('payers', 'payees', 'amounts', 'reasons', 'years'):
+            grown = np.zeros(self.capacity, dtype=getattr(self, name).dtype)
+            grown[:self.size] = getattr(self, name)[:self.size]
+            setattr(self, name, grown)
+
+    def totals(self, year: int = None) -> Dict[str, Tuple[int, float]]:
+        totals: Dict[str, Tuple[int, float]] = dict()
+        for (totals_year, reason_code), (count, amount) in self.aggregates.items():
+            if year is not None and totals_year != year:
+                continue
+
+            reason = self.reason_names[reason_code]
+            prev_count, prev_amount = totals.get(reason, (0, 0.0))
+            totals[reason] = (prev_count + count, prev_amount + amount)
+
+        return totals
+
+    def flush(self, directory: str = None) -> str:
+        directory = directory if directory is not None else self.directory
+        assert directory is not None, "Ledger has no directory to flush to"
+        os.makedirs(directory, exist_ok=True)
+
+        filename = os.path.join(directory, f"ledger-{self.shards:05d}.npz")
+        np.savez(
+            filename,
+            payers=self.payers[:self.size],
+            payees=self.payees[:self.size],
+            amounts=self.amounts[:self.size],
+            reasons=self.reasons[:self.size],
+            years=self.years[:self.size],
+            entity_names=np.array(self.entity_names[self._flushed_entities:], dtype=str),
+            reason_names=np.array(self.reason_names[self._flushed_reasons:], dtype=str),
+        )
+
+        self.shards += 1
+        self.size = 0
+        self._flushed_entities = len(self.entity_names)
+        self._flushed_reasons = len(self.reason_names)
+        return filename
+
+    @classmethod
+    def load(cls, directory: str) -> 'Ledger':
+        ledger = Ledger(LedgerLevel.FULL)
+        shard_files = sorted(name for name in os.listdir(directory) if name.startswith("ledger-"))
+
+        columns: Dict[str, List[np.ndarray]] = {name: [] for name in ('payers', 'payees', 'amounts', 'reasons', 'years')}
+        for shard_file in shard_files:
+            with np.load(os.path.join(directory, shard_file)) as shard:
+                for name in columns:
+                    columns[name].append(shard[name])
+                for entity_id in shard['entity_names'].tolist():
+                    ledger.intern_entity(entity_id)
+                for reason in shard['reason_names'].tolist():
+                    ledger.intern_reason(reason)
+
+        for name, parts in columns.items():
+            values = np.concatenate(parts) if parts else getattr(ledger, name)[:0]
+            setattr(ledger, name, values)
+        ledger.size = ledger.capacity = len(ledger.amounts)
+        ledger.shards = len(shard_files)
+
+        for year, reason, amount in zip(ledger.years.tolist(), ledger.reasons.tolist(), ledger.amounts.tolist()):
+            totals = ledger.aggregates.setdefault((year, reason), [0, 0.0])
+            totals[0] += 1
+            totals[1] += amount
+
+        return ledger
@@ -0,0 +1,132 @@
+from typing import Dict, List, TypedDict
+import json
+import os
+import numpy as np
+
+INDIVIDUAL_METRICS = ('net_worth', 'savings')
+HOME_METRICS = ('prop_val', 'rent')
+
+
+class LogColumns(TypedDict):
+    year: int
+    individual_ids: List[str]
+    net_worth: np.ndarray
+    savings: np.ndarray
+    home_ids: List[str]
+    prop_val: np.ndarray
+    rent: np.ndarray
+
+
+class YearInfo(TypedDict):
+    year: int
+    individuals: int
+    homes: int
+
+
+class LogStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+        self.years: List[YearInfo] = []
+        self.individual_ids: List[str] = []
+        self.home_ids: List[str] = []
+        self.individual_index: Dict[str, int] = dict()
+        self.home_index: Dict[str, int] = dict()
+
+        for name in sorted(os.listdir(directory)):
+            meta_file = os.path.join(directory, name, "meta.json")
+            if not name.startswith("year-") or not os.path.exists(meta_file):
+                continue
+
+            with open(meta_file) as f:
+                self.years.append(json.load(f))
+            self._load_ids(os.path.join(directory, name, "individual_ids.npy"), self.individual_ids,
+                           self.individual_index)
+            self._load_ids(os.path.join(directory, name, "home_ids.npy"), self.home_ids, self.home_index)
+
+    def _load_ids(self, path: str, known: List[str], index: Dict[str, int]) -> None:
+        if os.path.exists(path):
+            for entity_id in np.load(path).tolist():
+                index[entity_id] = len(known)
+                known.append(entity_id)
+
+    def _year_dir(self, year: int) -> str:
+        return os.path.join(self.directory, f"year-{year:05d}")
+
+    def _extend_ids(self, ids: List[str], known: List[str], index: Dict[str, int], path: str) -> None:
+        assert len(ids) >= len(known), f"Entities cannot be removed from a log store ({path})"
+        assert ids[:len(known)] == known, f"Entities cannot be reordered in a log store ({path})"
+        if len(ids) == len(known):
+            return
+
+        np.save(path, np.array(ids[len(known):], dtype=str))
+        for entity_id in ids[len(known):]:
+            index[entity_id] = len(known)
+            known.append(entity_id)
+
+    def append(self, columns: LogColumns) -> None:
+        year = columns['year']
+        assert not self.years or year > self.years[-1]['year'], f"Year {year} was already logged"
+
+        # each year is its own shard and its meta.json is written last, so a shard without one is ignored
+        year_dir = self._year_dir(year)
+        os.makedirs(year_dir, exist_ok=True)
+        for metric in INDIVIDUAL_METRICS + HOME_METRICS:
+            np.save(os.path.join(year_dir, f"{metric}.npy"), np.asarray(columns[metric], dtype=np.float64))
+        self._extend_ids(list(columns['individual_ids']), self.individual_ids, self.individual_index,
+                         os.path.join(year_dir, "individual_ids.npy"))
+        self._extend_ids(list(columns['home_ids']), self.home_ids, self.home_index,
+                         os.path.join(year_dir, "home_ids.npy"))
+
+        info: YearInfo = {
+            'year': year,
+            'individuals': len(columns['individual_ids']),
+            'homes': len(columns['home_ids']),
+        }
+        with open(os.path.join(year_dir, "meta.json"), "w") as f:
+            json.dump(info, f)
+        self.years.append(info)
+
+    def load_column(self, year: int, metric: str, mmap: bool = True) -> np.ndarray:
+        return np.load(os.path.join(self._year_dir(year), f"{metric}.npy"), mmap_mode='r' if mmap else None)
+
+    def snapshot(self, year: int) -> LogColumns:
+        info = next((info for info in self.years if info['year'] == year), None)
+        assert info is not None, f"Year {year} is not in log store {self.directory}"
+
+        columns: LogColumns = {
+            'year': year,
+            'individual_ids': self.individual_ids[:info['individuals']],
+            'home_ids': self.home_ids[:info['homes']],
+        }
+        for metric in INDIVIDUAL_METRICS + HOME_METRICS:
+            columns[metric] = self.load_column(year, metric, mmap=False)
+
+        return columns
+
+    def trajectory(self, entity_id: str, metric: str) -> Dict[int, float]:
+        if metric in INDIVIDUAL_METRICS:
+            row, count_key = self.individual_index[entity_id], 'individuals'
+        else:
+            row, count_key = self.home_index[entity_id], 'homes'
+
+        return {
+            info['year']: float(self.load_column(info['year'], metric)[row])
+            for info in self.years if row < info[count_key]
+        }
+
+    def to_log(self, year: int) -> Dict[str, Dict[str, Dict[str, float]]]:
+        columns = self.snapshot(year)
+        return {
+            'homes': {
+                home_id: {'prop_val': prop_val, 'rent': rent}
+                for home_id, prop_val, rent in zip(columns['home_ids'], columns['prop_val'].tolist(),
+                                                   columns['rent'].tolist())
+            },
+            'individuals': {
+                individual_id: {'net_worth': net_worth, 'savings': savings}
+                for individual_id, net_worth, savings in zip(columns['individual_ids'], columns['net_worth'].tolist(),
+                                                             columns['savings'].tolist())
+            },
+        }
@@ -0,0 +1,120 @@
+from typing import Callable, Dict, List, Optional, Set, TypedDict
+import time
+
+
+class PhaseStats(TypedDict):
+    wall_time: float
+    pay_calls: int
+    amount: float
+    entities: int
+
+
+class YearProfile(TypedDict):
+    year: int
+    wall_time: float
+    phases: Dict[str, PhaseStats]
+
+
+PhaseCallback = Callable[[int, str, PhaseStats], None]
+YearCallback = Callable[[YearProfile], None]
+
+
+class PhaseTimer:
+    __slots__ = ('profiler', 'name', 'scope')
+
+    def __init__(self, profiler: 'Profiler', name: str, scope: int):
+        self.profiler = profiler
+        self.name = name
+        self.scope = scope
+
+    def __enter__(self) -> 'PhaseTimer':
+        self.profiler.begin_phase(self.name)
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.end_phase(self.scope)
+
+
+class Profiler:
+    def __init__(self, on_phase: PhaseCallback = None, on_year: YearCallback = None, keep: bool = True):
+        self.on_phase = on_phase
+        self.on_year = on_year
+        self.keep = keep
+        self.years: List[YearProfile] = []
+
+        self.current: Optional[YearProfile] = None
+        self.phase_name: Optional[str] = None
+        self.phase_start = 0.0
+        self.year_start = 0.0
+        self.pay_calls = 0
+        self.amount = 0.0
+        self.touched: Set[str] = set()
+        self.batch_entities = 0
+
+    def begin_year(self, year: int) -> None:
+        self.current = {'year': year, 'wall_time': 0.0, 'phases': dict()}
+        self.year_start = time.perf_counter()
+
+    def end_year(self) -> YearProfile:
+        profile = self.current
+        profile['wall_time'] = time.perf_counter() - self.year_start
+        self.current = None
+
+        if self.keep:
+            self.years.append(profile)
+        if self.on_year is not None:
+            self.on_year(profile)
+
+        return profile
+
+    def phase(self, name: str, scope: int = 0) -> PhaseTimer:
+        return PhaseTimer(self, name, scope)
+
+    def begin_phase(self, name: str) -> None:
+        self.phase_name = name
+        self.pay_calls = 0
+        self.amount = 0.0
+        self.touched.clear()
+        self.batch_entities = 0
+        self.phase_start = time.perf_counter()
+
+    def end_phase(self, scope: int = 0) -> PhaseStats:
+        stats: PhaseStats = {
+            'wall_time': time.perf_counter() - self.phase_start,
+            'pay_calls': self.pay_calls,
+            'amount': self.amount,
+            'entities': scope + len(self.touched) + self.batch_entities,
+        }
+
+        name = self.phase_name
+        self.phase_name = None
+        if self.current is not None:
+            self.current['phases'][name] = stats
+        if self.on_phase is not None:
+            self.on_phase(self.current['year'] if self.current is not None else -1, name, stats)
+
+        return stats
+
+    def record_pay(self, payer_id: str, payee_id: str, amount: float) -> None:
+        if self.phase_name is None:
+            return
+
+        self.pay_calls += 1
+        self.amount += amount
+        self.touched.add(payer_id)
+        self.touched.add(payee_id)
+
+    def record_batch(self, pay_calls: int, amount: float, entities: int = 0) -> None:
+        self.pay_calls += pay_calls
+        self.amount += amount
+        self.batch_entities += entities
+
+    def totals(self) -> Dict[str, PhaseStats]:
+        totals: Dict[str, PhaseStats] = dict()
+        for profile in self.years:
+            for name, stats in profile['phases'].items():
+                total = totals.setdefault(name, {'wall_time': 0.0, 'pay_calls': 0, 'amount': 0.0, 'entities': 0})
+                for key, value in stats.items():
+                    total[key] += value
+
+        return totals
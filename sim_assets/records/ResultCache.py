@@ -0,0 +1,150 @@
+from typing import Any, Dict, List, TypedDict
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import time
+import numpy as np
+
+from sim_assets.records.LogStore import LogColumns, INDIVIDUAL_METRICS, HOME_METRICS
+
+CACHE_VERSION = 1
+
+
+class CacheEntry(TypedDict):
+    key: str
+    years: int
+    checkpoints: List[int]
+    bytes: int
+    last_used: float
+
+
+def digest(hasher: Any, value: Any) -> None:
+    if isinstance(value, dict):
+        hasher.update(b"{")
+        for key in sorted(value, key=str):
+            digest(hasher, str(key))
+            digest(hasher, value[key])
+        hasher.update(b"}")
+    elif isinstance(value, (list, tuple)):
+        hasher.update(b"[")
+        for item in value:
+            digest(hasher, item)
+        hasher.update(b"]")
+    elif isinstance(value, np.ndarray):
+        hasher.update(f"array:{value.dtype.str}:{value.shape}:".encode())
+        hasher.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, np.generic):
+        digest(hasher, value.item())
+    else:
+        hasher.update(f"{type(value).__name__}:{value!r};".encode())
+
+
+def fingerprint(kind: str, state: Dict[str, Any], seed: Any = None) -> str:
+    hasher = hashlib.sha256()
+    digest(hasher, [CACHE_VERSION, kind, seed, state])
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    def __init__(self, directory: str, max_bytes: int = 1 << 30):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(directory, exist_ok=True)
+
+    def _entry_dir(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def _year_file(self, key: str, year: int) -> str:
+        return os.path.join(self._entry_dir(key), f"year-{year:05d}.npz")
+
+    def _state_file(self, key: str, year: int) -> str:
+        return os.path.join(self._entry_dir(key), f"state-{year:05d}.pkl")
+
+    def _write_entry(self, entry: CacheEntry) -> None:
+        entry_dir = self._entry_dir(entry['key'])
+        entry['bytes'] = sum(os.path.getsize(os.path.join(entry_dir, name)) for name in os.listdir(entry_dir)
+                             if name != "meta.json")
+        with open(os.path.join(entry_dir, "meta.json"), "w") as f:
+            json.dump(entry, f)
+
+    def entry(self, key: str) -> CacheEntry:
+        meta_file = os.path.join(self._entry_dir(key), "meta.json")
+        if not os.path.exists(meta_file):
+            return {'key': key, 'years': 0, 'checkpoints': [], 'bytes': 0, 'last_used': 0.0}
+
+        with open(meta_file) as f:
+            return json.load(f)
+
+    def entries(self) -> List[CacheEntry]:
+        return [self.entry(key) for key in sorted(os.listdir(self.directory))
+                if os.path.exists(os.path.join(self._entry_dir(key), "meta.json"))]
+
+    def total_bytes(self) -> int:
+        return sum(entry['bytes'] for entry in self.entries())
+
+    def checkpoint(self, key: str, years: int) -> int:
+        entry = self.entry(key)
+        usable = [year for year in entry['checkpoints'] if year <= years and year <= entry['years']]
+        if usable:
+            entry['last_used'] = time.time()
+            self._write_entry(entry)
+
+        return max(usable, default=0)
+
+    def load_columns(self, key: str, years: int) -> List[LogColumns]:
+        columns = []
+        for year in range(1, years + 1):
+            with np.load(self._year_file(key, year), allow_pickle=False) as data:
+                year_columns: LogColumns = {
+                    'year': int(data['year']),
+                    'individual_ids': data['individual_ids'].tolist(),
+                    'home_ids': data['home_ids'].tolist(),
+                }
+                for metric in INDIVIDUAL_METRICS + HOME_METRICS:
+                    year_columns[metric] = data[metric]
+            columns.append(year_columns)
+
+        return columns
+
+    def load_state(self, key: str, year: int) -> Dict[str, Any]:
+        with open(self._state_file(key, year), "rb") as f:
+            return pickle.load(f)
+
+    def store(self, key: str, columns: List[LogColumns], state: Dict[str, Any]) -> None:
+        entry = self.entry(key)
+        os.makedirs(self._entry_dir(key), exist_ok=True)
+
+        start = min(entry['years'], len(columns))
+        for year, year_columns in enumerate(columns[start:], start + 1):
+            arrays = {metric: np.asarray(year_columns[metric], dtype=np.float64)
+                      for metric in INDIVIDUAL_METRICS + HOME_METRICS}
+            np.savez(self._year_file(key, year), year=year_columns['year'],
+                     individual_ids=np.array(year_columns['individual_ids'], dtype=str),
+                     home_ids=np.array(year_columns['home_ids'], dtype=str), **arrays)
+
+        with open(self._state_file(key, len(columns)), "wb") as f:
+            pickle.dump(state, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+        entry['years'] = max(entry['years'], len(columns))
+        entry['checkpoints'] = sorted(set(entry['checkpoints']) | {len(columns)})
+        entry['last_used'] = time.time()
+        self._write_entry(entry)
+        self.evict(keep=key)
+
+    def evict(self, keep: str = None) -> None:
+        entries = sorted(self.entries(), key=lambda entry: entry['last_used'])
+        total = sum(entry['bytes'] for entry in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            if entry['key'] == keep:
+                continue
+
+            shutil.rmtree(self._entry_dir(entry['key']))
+            total -= entry['bytes']
+
+    def clear(self) -> None:
+        for entry in self.entries():
+            shutil.rmtree(self._entry_dir(entry['key']))
@@ -0,0 +1,73 @@
+import numpy as np
+
+from sim_assets.entities.Home import Home
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.PopulationGenerator import DEFAULT_GENERATOR_CONFIG, PopulationGenerator
+
+
+def build(env_cls, **kwargs):
+    env = env_cls.from_json("env", "../configs/basic-env.json", **kwargs)
+    env.add_home(Home.from_json("home", "../configs/basic-home.json"))
+    env.add_home(Home("home-2", {"prop_val": 500000, "rent": 24000}))
+    env.add_homeowner(Individual.from_json("owner", "../configs/junior-swe.json"))
+    env.add_renter(Individual.from_json("renter", "../configs/new-grad.json"))
+    env.add_renter(Individual.from_json("renter-2", "../configs/junior-swe.json"))
+
+    env.homeowners['owner'].config['savings'] = 1300000
+    env.purchase_home(env.homeowners['owner'], env.homes['home'])
+    env.purchase_home(env.homeowners['owner'], env.homes['home-2'])
+    env.rent(env.renters['renter'], env.homes['home'])
+    env.rent(env.renters['renter-2'], env.homes['home-2'])
+    env.renters['renter'].add_expense('loan', 500, 12, 3)
+
+    return env
+
+
+def build_independent(env_cls, **kwargs):
+    env = env_cls.from_json("env", "../configs/basic-env.json", **kwargs)
+    env.add_home(Home.from_json("home", "../configs/basic-home.json"))
+    env.add_home(Home("owned", {"prop_val": 500000, "rent": 0}))
+    env.add_homeowner(Individual.from_json("owner", "../configs/junior-swe.json"))
+    env.add_renter(Individual.from_json("renter", "../configs/new-grad.json"))
+    for i in range(5):
+        env.add_homeowner(Individual.from_json(f"solo-{i}", "../configs/junior-swe.json"))
+
+    env.homeowners['owner'].config['savings'] = 800000
+    env.purchase_home(env.homeowners['owner'], env.homes['home'])
+    env.rent(env.renters['renter'], env.homes['home'])
+
+    env.homeowners['solo-0'].config['savings'] = 600000
+    env.purchase_home(env.homeowners['solo-0'], env.homes['owned'])
+    env.bank.issue_mortgage(200000, 4, 0.065, env.homeowners['solo-1'])
+    env.homeowners['solo-2'].add_expense('car', 350.555, 12, 3)
+    env.homeowners['solo-2'].add_expense('gym', 60, 12, -1)
+    env.homeowners['solo-3'].add_expense('never', 60, 12, 0)
+    return env
+
+
+def population_generator(max_owners=2.49):
+    config = dict(DEFAULT_GENERATOR_CONFIG, owners_per_home={'kind': 'uniform', 'low': 0.5, 'high': max_owners})
+    return PopulationGenerator(80, 24, seed=3, config=config)
+
+
+def build_population(env_cls, generator=None, **kwargs):
+    env = env_cls.from_json("env", "../configs/basic-env.json", **kwargs)
+    (generator or population_generator()).populate(env)
+
+    owners = [individual for individual in env.homeowners.values() if individual.entity_id not in env.renters]
+    for renter in env.renters.values():
+        renter.config['with_polymer'] = False
+    env.market.bid(owners[1].entity_id, "home-5", 0.1, 10000000)
+    env.resync_balances()
+    return env
+
+
+def assert_logs_close(logs, expected, rtol=1e-9):
+    assert len(logs) == len(expected)
+    for log, expected_log in zip(logs, expected):
+        for kind in ('homes', 'individuals'):
+            assert list(log[kind]) == list(expected_log[kind])
+            for entity_id, metrics in expected_log[kind].items():
+                for metric, value in metrics.items():
+                    assert np.isclose(log[kind][entity_id][metric], value, rtol=rtol), \
+                        f"{entity_id} {metric} is {log[kind][entity_id][metric]}, expected {value}"
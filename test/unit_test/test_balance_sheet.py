@@ -0,0 +1,104 @@
+import pytest
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from sim_assets.entities.Individual import Individual
+from builders import build
+
+
+def build_with_polymer(env_cls, **kwargs):
+    env = build(env_cls, **kwargs)
+    env.renters['renter'].config['with_polymer'] = True
+    env.resync_balances()
+    return env
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_incremental_balances(env_cls):
+    env = build_with_polymer(env_cls)
+    env.check_balances()
+    money_supply = env.get_money_supply()
+
+    for _ in range(5):
+        income = sum((1 - individual.config['income_tax']) * individual.config['income']
+                     for individual in env.homeowners.values())
+        env.progress_one_year()
+        env.check_balances()
+        money_supply += income
+
+    assert env.get_money_supply() == pytest.approx(money_supply)
+    assert env.get_total_savings() == pytest.approx(env.get_savings().sum())
+    assert env.get_total_equity() == pytest.approx(sum(home.config['prop_val'] for home in env.homes.values()))
+    assert env.balances.equity_values[1] > 0
+
+
+def test_cents_and_fast_forward_balances():
+    env = build_with_polymer(VectorEnvironment, cents=True)
+    env.progress_years(3)
+    env.check_balances()
+
+    assert env.get_total_savings() == pytest.approx(env.get_savings().sum())
+
+
+def test_lazy_growth_needs_no_revaluation():
+    env = build_with_polymer(VectorEnvironment, lazy_growth=True)
+    revalue = env.balances.revalue
+    changed = []
+    env.balances.revalue = lambda prop_vals: changed.append(revalue(prop_vals))
+
+    for _ in range(10):
+        env.progress_one_year()
+
+    assert len(changed) >= 10 and set(changed) == {0}
+    env.check_balances()
+
+    env.homes['home'].config['prop_val'] = 1000000
+    env.get_net_worths()
+    assert changed[-1] == 1
+
+
+def test_direct_prop_val_edits_are_revalued():
+    env = build(VectorEnvironment)
+    env.homes['home'].config['prop_val'] = 1000000
+
+    assert env.get_net_worths()[0] == pytest.approx(env.get_net_worth(env.homeowners['owner']))
+    assert env.get_total_equity() == pytest.approx(1000000 + 500000)
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_renter_registered_as_homeowner(env_cls):
+    env = build(env_cls)
+    env.resync_balances()
+    env.add_homeowner(env.renters['renter'])
+
+    assert env.balances.owners == len(env.homeowners) == 3
+    env.check_balances()
+    env.progress_one_year()
+    env.check_balances()
+
+    with pytest.raises(AssertionError):
+        env.add_homeowner(Individual.from_json("owner", "../configs/junior-swe.json"))
+
+
+def test_detects_untracked_money():
+    env = build(Environment)
+    env.resync_balances()
+    env.renters['renter'].config['savings'] += 100
+
+    with pytest.raises(AssertionError):
+        env.check_balances()
+
+
+def main():
+    test_incremental_balances(Environment)
+    test_incremental_balances(VectorEnvironment)
+    test_cents_and_fast_forward_balances()
+    test_lazy_growth_needs_no_revaluation()
+    test_direct_prop_val_edits_are_revalued()
+    test_renter_registered_as_homeowner(Environment)
+    test_renter_registered_as_homeowner(VectorEnvironment)
+    test_detects_untracked_money()
+
+
+if __name__ == "__main__":
+    main()
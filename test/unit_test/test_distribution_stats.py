@@ -0,0 +1,95 @@
+import numpy as np
+import pytest
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from sim_assets.records.DistributionStats import MetricStats, QuantileSketch, StatsLog
+from builders import build
+
+
+def exact_gini(values):
+    values = np.sort(values)
+    ranks = np.arange(1, len(values) + 1)
+    return float(((2 * ranks - len(values) - 1) * values).sum() / (len(values) * values.sum()))
+
+
+def test_sketch_quantiles_and_gini():
+    rng = np.random.default_rng(0)
+    values = np.concatenate((100000 * np.exp(rng.normal(0, 1, 20000)), -rng.uniform(0, 5000, 1000), np.zeros(50)))
+
+    sketch = QuantileSketch(0.01)
+    sketch.add(values)
+    q = [0.01, 0.1, 0.5, 0.9, 0.99]
+    assert sketch.quantiles(q) == pytest.approx(np.quantile(values, q), rel=0.021)
+    assert sketch.gini() == pytest.approx(exact_gini(values), abs=0.005)
+    assert len(sketch.positive) + len(sketch.negative) < 2000
+
+
+def test_merged_stats_match_single_pass():
+    rng = np.random.default_rng(1)
+    values = rng.normal(50000, 20000, 10000)
+
+    whole, left, right = MetricStats(), MetricStats(), MetricStats()
+    whole.add(values)
+    left.add(values[:3000])
+    right.add(values[3000:])
+    left.merge(right)
+
+    assert left.sketch.positive == whole.sketch.positive and left.sketch.negative == whole.sketch.negative
+    assert left.summary()['percentiles'] == whole.summary()['percentiles']
+    assert left.mean == pytest.approx(values.mean()) and left.std == pytest.approx(values.std())
+    assert left.min == values.min() and left.max == values.max()
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_aggregate_only_logging(env_cls):
+    full = build(env_cls)
+    env = build(env_cls, stats_log=StatsLog())
+    env.renters['renter-2'].config['with_polymer'] = False
+    full.renters['renter-2'].config['with_polymer'] = False
+
+    for _ in range(3):
+        log = full.progress_one_year()
+        assert env.progress_one_year() is None
+
+        net_worths = np.array([logs['net_worth'] for logs in log['individuals'].values()])
+        summary = env.stats_log.years[-1].summary()
+        assert summary['metrics']['net_worth']['mean'] == pytest.approx(net_worths.mean())
+        assert summary['metrics']['net_worth']['max'] == net_worths.max()
+        assert summary['metrics']['net_worth']['percentiles']['p50'] == pytest.approx(np.median(net_worths), rel=0.02)
+
+    assert env.logs == [] and len(env.stats_log) == 3
+    ownership = env.stats_log.years[-1].summary()['homeownership']
+    assert ownership['all'] == {'individuals': 3, 'homeowners': 2, 'rate': pytest.approx(2 / 3)}
+    assert ownership['with_polymer']['rate'] == 1 and ownership['without_polymer']['rate'] == 0.5
+
+
+def test_stats_logs_merge_across_replicas():
+    logs = []
+    for _ in range(2):
+        env = build(Environment, stats_log=StatsLog())
+        env.progress_years(2)
+        logs.append(env.stats_log)
+
+    snapshot_env = build(Environment, stats_log=StatsLog())
+    snapshot = snapshot_env.snapshot()
+    snapshot_env.progress_years(2)
+    snapshot_env.restore(snapshot)
+    assert len(snapshot_env.stats_log) == 0
+
+    logs[0].merge(logs[1])
+    assert [stats.year for stats in logs[0].years] == [1, 2]
+    assert logs[0].years[1].metrics['savings'].count == 6
+    assert logs[0].years[1].homeownership_rate() == pytest.approx(logs[1].years[1].homeownership_rate())
+
+
+def main():
+    test_sketch_quantiles_and_gini()
+    test_merged_stats_match_single_pass()
+    test_aggregate_only_logging(Environment)
+    test_aggregate_only_logging(VectorEnvironment)
+    test_stats_logs_merge_across_replicas()
+
+
+if __name__ == "__main__":
+    main()
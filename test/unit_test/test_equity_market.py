@@ -0,0 +1,128 @@
+import numpy as np
+import pytest
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.EquityMarket import ASK, BID, EquityMarket, match
+from sim_assets.env.EquityMatrix import EquityMatrix
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from builders import build
+
+
+def test_price_time_priority():
+    homes = np.array([0, 0, 0, 0, 1, 1])
+    sides = np.array([ASK, ASK, BID, BID, ASK, BID])
+    prices = np.array([100.0, 90.0, 95.0, 95.0, 50.0, 40.0])
+    order_ids = np.arange(6)
+    quantities = np.array([0.2, 0.1, 0.05, 0.25, 0.5, 0.5])
+
+    bids, asks, filled, price = match(homes, sides, prices, order_ids, quantities)
+    assert bids.tolist() == [2, 3] and asks.tolist() == [1, 1]
+    assert filled == pytest.approx([0.05, 0.05]) and price.tolist() == [90.0, 90.0]
+
+
+def test_many_homes_match_greedily():
+    rng = np.random.default_rng(0)
+    size = 2000
+    homes = rng.integers(0, 20, size)
+    sides = rng.integers(0, 2, size)
+    prices = rng.integers(90, 110, size).astype(np.float64)
+    quantities = rng.uniform(0.01, 0.2, size)
+
+    bids, asks, filled, price = match(homes, sides, prices, np.arange(size), quantities)
+    assert (homes[bids] == homes[asks]).all() and (prices[bids] >= prices[asks]).all()
+    assert (np.bincount(bids, filled, size) <= quantities + 1e-12).all()
+    assert (np.bincount(asks, filled, size) <= quantities + 1e-12).all()
+
+    for home in range(20):
+        bid_prices = prices[(homes == home) & (sides == BID)]
+        ask_prices = prices[(homes == home) & (sides == ASK)]
+        left_bids = bid_prices[np.bincount(bids, filled, size)[(homes == home) & (sides == BID)] <
+                               quantities[(homes == home) & (sides == BID)] - 1e-12]
+        left_asks = ask_prices[np.bincount(asks, filled, size)[(homes == home) & (sides == ASK)] <
+                               quantities[(homes == home) & (sides == ASK)] - 1e-12]
+        assert len(left_bids) == 0 or len(left_asks) == 0 or left_bids.max() < left_asks.min()
+
+
+def test_orders_are_capped_by_holdings_and_savings():
+    matrix = EquityMatrix()
+    for owner_id in ("a", "b"):
+        matrix.add_owner(owner_id)
+    matrix.add_home("home")
+    matrix.set("a", "home", 0.3)
+
+    market = EquityMarket(matrix)
+    market.ask("a", "home", 0.5, 100)
+    partial = market.bid("b", "home", 0.5, 100)
+    market.bid("b", "home", 0.2, 100)
+
+    trades = market.clear(np.array([0.0, 25.0]))
+    assert trades['quantity'] == pytest.approx([0.2499]) and trades['price'].tolist() == [100]
+    assert market.column('order_id').tolist() == [0, partial, partial + 1]
+    assert market.column('quantity') == pytest.approx([0.2501, 0.2501, 0.2])
+
+    matrix.transfer("a", "b", "home", 0.2499)
+    trades = market.clear(np.array([24.99, 0.01]))
+    assert len(trades['quantity']) == 0 and len(market) == 3
+
+    market.cancel(partial)
+    market.cancel_trader("b")
+    assert len(market) == 1 and market.traders() == {"a"}
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_market_clears_every_year(env_cls):
+    env = build(env_cls)
+    env.renters['renter'].config['with_polymer'] = False
+    env.market.ask("owner", "home", 0.5, 850000)
+    env.market.ask("owner", "home-2", 1, 480000)
+    env.market.bid("renter-2", "home-2", 0.1, 500000)
+    env.renters['renter-2'].config['savings'] = 100000
+    env.resync_balances()
+    env.market.bid("renter", "home", 0.01, 800000)
+
+    env.progress_one_year()
+    env.check_balances()
+    assert env.equity.get("renter-2", "home-2") == pytest.approx(0.1)
+    assert env.equity.get("owner", "home-2") == pytest.approx(0.9)
+    assert env.equity.get("renter", "home") == 0
+    assert len(env.market) == 3
+
+    snapshot = env.snapshot()
+    env.market.bid("renter", "home", 0.01, 900000)
+    env.progress_one_year()
+    assert env.equity.get("renter", "home") == pytest.approx(0.01)
+
+    env.restore(snapshot)
+    assert len(env.market) == 3 and env.equity.get("renter", "home") == 0
+
+
+def test_vector_trades_match_scalar():
+    scalar = build(Environment)
+    vector = build(VectorEnvironment)
+    for env in (scalar, vector):
+        env.renters['renter-2'].config['savings'] = 200000
+        env.market.ask("owner", "home", 0.2, 820000)
+        env.market.ask("owner", "home-2", 0.3, 510000)
+        env.market.bid("renter-2", "home", 0.05, 830000)
+        env.market.bid("renter-2", "home-2", 0.1, 515000)
+        env.market.bid("renter-2", "home-2", 0.5, 520000)
+
+    scalar_log, vector_log = scalar.progress_one_year(), vector.progress_one_year()
+    for individual_id, logs in scalar_log['individuals'].items():
+        assert vector_log['individuals'][individual_id] == pytest.approx(logs)
+    for home_id in scalar.homes:
+        for owner_id in scalar.homeowners:
+            assert vector.equity.get(owner_id, home_id) == pytest.approx(scalar.equity.get(owner_id, home_id))
+
+
+def main():
+    test_price_time_priority()
+    test_many_homes_match_greedily()
+    test_orders_are_capped_by_holdings_and_savings()
+    test_market_clears_every_year(Environment)
+    test_market_clears_every_year(VectorEnvironment)
+    test_vector_trades_match_scalar()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+import pytest
+import numpy as np
+
+from sim_assets.env.EquityMatrix import EquityMatrix, HomeMap
+
+
+def build():
+    matrix = EquityMatrix(capacity=2)
+    for owner_id in ["a", "b", "c"]:
+        matrix.add_owner(owner_id)
+    for home_id in ["h1", "h2"]:
+        matrix.add_home(home_id)
+
+    matrix.set("a", "h1", 1)
+    matrix.set("b", "h2", 0.25)
+    matrix.set("c", "h2", 0.75)
+    return matrix
+
+
+def test_get_and_set():
+    matrix = build()
+
+    assert matrix.get("a", "h1") == 1 and matrix.get("a", "h2") == 0
+    assert matrix.has("b", "h2") and not matrix.has("b", "h1")
+    assert matrix.nnz == 3 and matrix.capacity >= 3
+
+
+def test_transfer():
+    matrix = build()
+    matrix.transfer("a", "b", "h1", 0.4)
+
+    assert abs(matrix.get("a", "h1") - 0.6) < 1e-12
+    assert abs(matrix.get("b", "h1") - 0.4) < 1e-12
+
+    owners, equities = matrix.home_owners("h1")
+    assert [matrix.owner_ids[owner] for owner in owners] == ["a", "b"]
+
+    homes, _ = matrix.owner_homes("b")
+    assert sorted(matrix.home_ids[home] for home in homes) == ["h1", "h2"]
+
+    with pytest.raises(Exception) as e_info:
+        matrix.transfer("c", "a", "h1", 0.1)
+        print(e_info)
+
+
+def test_net_worths():
+    matrix = build()
+    net_worths = matrix.net_worths(np.array([10.0, 20.0, 30.0]), np.array([100.0, 200.0]))
+
+    assert np.allclose(net_worths, [110.0, 70.0, 180.0])
+
+
+def test_home_map_view():
+    matrix = build()
+    home_map = HomeMap(matrix)
+
+    assert list(home_map) == ["h1", "h2"]
+    assert dict(home_map["h2"]) == {"b": 0.25, "c": 0.75}
+    assert len(home_map["h1"]) == 1 and "b" not in home_map["h1"]
+
+    home_map["h1"]["b"] = 0
+    assert len(home_map["h1"]) == 2 and home_map["h1"]["b"] == 0
+
+
+def main():
+    test_get_and_set()
+    test_transfer()
+    test_net_worths()
+    test_home_map_view()
+
+
+if __name__ == "__main__":
+    main()
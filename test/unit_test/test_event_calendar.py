@@ -0,0 +1,70 @@
+from sim_assets.entities.Home import Home
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.Environment import Environment
+from sim_assets.env.EventCalendar import EventCalendar, EXPENSE_PAYMENT, EXPENSE_EXPIRY
+
+individual: Individual = None
+other: Individual = None
+env: Environment = None
+
+
+def setup():
+    global individual, other, env
+    individual = Individual.from_json("ind", "../configs/junior-swe.json")
+    other = Individual.from_json("other", "../configs/new-grad.json")
+
+    env = Environment.from_json("env", "../configs/basic-env.json")
+    env.add_home(Home.from_json("home", "../configs/basic-home.json"))
+    env.add_homeowner(individual)
+    env.add_homeowner(other)
+
+
+def test_calendar_order():
+    calendar = EventCalendar()
+    calendar.schedule(2, EXPENSE_EXPIRY, "a", "x")
+    calendar.schedule(2, EXPENSE_PAYMENT, "b")
+    calendar.schedule(1, EXPENSE_EXPIRY, "c", "y")
+    calendar.schedule(5, EXPENSE_PAYMENT, "d")
+
+    assert [event.entity_id for event in calendar.pop_due(2)] == ["c", "b", "a"]
+    assert calendar.next_time() == 5 and calendar.pop(4) is None
+
+
+def test_only_payers_are_scheduled():
+    setup()
+    individual.add_expense('car', 400, 12, 2)
+
+    assert len(env.calendar) == 2 and list(env.expenses_due) == ["ind"]
+
+    env.progress_one_year()
+    assert individual.expenses['car']['remove_after'] == 1
+
+    env.progress_one_year()
+    env.progress_one_year()
+    assert 'car' not in individual.expenses and len(env.calendar) == 0
+    assert env.garbage.config['savings'] - 10000000000 == 2 * 400 * 12
+
+
+def test_mortgage_payoff():
+    setup()
+    env.bank.issue_mortgage(100000, 3, 0.065, individual)
+    individual.add_expense('gym', 50, 12, -1)
+    for _ in range(2):
+        env.progress_one_year()
+    assert 'mortgage' in individual.expenses
+
+    for _ in range(3):
+        env.progress_one_year()
+    assert 'mortgage' not in individual.expenses and 'gym' in individual.expenses
+    assert env.expenses_due == {"ind": 6}
+
+
+def test_zero_length_expense():
+    setup()
+    individual.add_expense('never', 1000, 12, 0)
+    savings = individual.config['savings']
+    env.process_expenses()
+    env.year += 1
+    env.process_expenses()
+
+    assert 'never' not in individual.expenses and individual.config['savings'] == savings
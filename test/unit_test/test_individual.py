@@ -28,10 +28,26 @@ def test_remove_expense():
     assert len(a.expenses) == 0
 
 
+def test_compact_representation():
+    a = Individual.from_json("a", "../configs/new-grad.json")
+
+    assert not hasattr(a, '__dict__') and a._expenses is None and not a.has_expenses
+
+    a.expenses['test'] = {'amount': 1, 'yearly_payments': 1, 'remove_after': 1}
+    assert a.has_expenses and a.expenses['test']['amount'] == 1
+
+    a.remove_expense('test')
+    assert not a.has_expenses and a.expenses == {}
+
+    a.with_polymer = True
+    assert a.with_polymer and a.config['with_polymer']
+
+
 def main():
     test_income()
     test_add_expense()
     test_remove_expense()
+    test_compact_representation()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,71 @@
+import numpy as np
+
+from sim_assets.entities.Home import Home
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.Environment import Environment
+from sim_assets.records.Ledger import Ledger, LedgerLevel, RENT, HOME_PURCHASE
+
+
+def build(ledger: Ledger) -> Environment:
+    env = Environment("env", {
+        'home_appr_rate': 0.042,
+        'default_home_price': 800000,
+        'default_rent_rate': 0.04,
+        'default_income_appr_rate': 0.04,
+        'default_equity_contr': 0.5,
+        'tax_brackets': [{'max_amount': 1000000000, 'tax': 0.226}],
+    }, ledger)
+    home = Home.from_json("home", "../configs/basic-home.json")
+    owner = Individual.from_json("owner", "../configs/junior-swe.json")
+    renter = Individual.from_json("renter", "../configs/new-grad.json")
+    env.add_home(home)
+    env.add_homeowner(owner)
+    env.add_renter(renter)
+
+    owner.config['savings'] = 800000
+    env.purchase_home(owner, home)
+    env.rent(renter, home)
+    return env
+
+
+def test_off():
+    ledger = Ledger(LedgerLevel.OFF)
+    env = build(ledger)
+    env.progress_one_year()
+
+    assert ledger.size == 0 and len(ledger.aggregates) == 0
+
+
+def test_aggregate():
+    ledger = Ledger(LedgerLevel.AGGREGATE)
+    env = build(ledger)
+    for _ in range(3):
+        env.progress_one_year()
+
+    assert ledger.size == 0
+    assert ledger.totals(0) == {HOME_PURCHASE: (1, 800000)}
+    assert ledger.totals()[RENT][0] == 3
+    assert ledger.totals(1)[RENT] == (1, 36000)
+
+
+def test_full_flush(tmp_path):
+    ledger = Ledger(LedgerLevel.FULL, capacity=2, directory=str(tmp_path))
+    env = build(ledger)
+    for _ in range(5):
+        env.progress_one_year()
+    ledger.flush()
+
+    loaded = Ledger.load(str(tmp_path))
+    assert loaded.shards > 1 and loaded.size == 11
+    assert loaded.totals() == ledger.totals()
+    assert loaded.entity_names[loaded.payers[1]] == "renter" and loaded.reason_names[loaded.reasons[1]] == RENT
+    assert np.array_equal(loaded.years, [0, 1, 1, 2, 2, 3, 3, 4, 4, 5, 5])
+
+
+def main():
+    test_off()
+    test_aggregate()
+
+
+if __name__ == "__main__":
+    main()
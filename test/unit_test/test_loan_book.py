@@ -0,0 +1,91 @@
+import numpy as np
+import pytest
+
+from sim_assets.entities.Home import Home
+from sim_assets.entities.Individual import Individual
+from sim_assets.entities.LoanBook import LoanBook, amortization_schedule, monthly_payment
+from sim_assets.env.Environment import Environment
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+
+
+def test_schedule_is_memoized():
+    interest, principal, balance = amortization_schedule(100000.0, 30, 0.065)
+
+    assert amortization_schedule(100000.0, 30, 0.065)[2] is balance
+    assert len(balance) == 360 and balance[-1] == 0
+    assert np.isclose(principal.sum(), 100000)
+    assert np.allclose(interest + principal, monthly_payment(100000.0, 30, 0.065))
+    assert np.isclose(interest[0], 100000 * 0.065 / 12)
+
+
+def test_advance_matches_schedule():
+    book = LoanBook(capacity=1)
+    book.add_loan("a", 100000.0, 30, 0.065)
+    book.add_loan("b", 50000.0, 2, 0.0)
+    book.add_loan("a", 20000.0, 1, 0.04)
+
+    interest, principal = book.advance(12)
+    schedule_interest, schedule_principal, schedule_balance = book.schedule(0)
+    assert np.isclose(interest[0], schedule_interest[:12].sum())
+    assert np.isclose(principal[0], schedule_principal[:12].sum())
+    assert np.isclose(book.column('balance')[0], schedule_balance[11])
+    assert np.isclose(book.column('balance')[1], 25000) and interest[1] == 0
+    assert book.column('balance')[2] == 0 and np.isclose(principal[2], 20000)
+    assert book.active().tolist() == [True, True, False]
+
+    book.advance(12)
+    interest, principal = book.advance(12)
+    assert principal[1] == 0 and principal[2] == 0
+    assert np.isclose(book.balance_of("a"), schedule_balance[35])
+    assert np.allclose(book.debts({"a": 1, "b": 0}, 2), [0, schedule_balance[35]])
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_net_worth_nets_out_mortgage(env_cls):
+    env = env_cls.from_json("env", "../configs/basic-env.json")
+    home = Home.from_json("home", "../configs/basic-home.json")
+    individual = Individual.from_json("ind", "../configs/junior-swe.json")
+    env.add_home(home)
+    env.add_homeowner(individual)
+
+    loan = env.bank.issue_mortgage(100000, 3, 0.065, individual)
+    assert env.get_net_worth(individual) == individual.config['savings'] - 100000
+
+    env.progress_one_year()
+    balance = env.bank.loans.schedule(loan)[2][11]
+    assert np.isclose(env.get_net_worths()[0], individual.config['savings'] - balance)
+    assert np.isclose(env.logs[-1]['individuals']['ind']['net_worth'], individual.config['savings'] - balance)
+
+    snapshot = env.snapshot()
+    env.progress_one_year()
+    env.progress_one_year()
+    assert env.bank.loans.balance_of("ind") == 0 and 'mortgage' not in individual.expenses
+
+    env.restore(snapshot)
+    assert np.isclose(env.bank.loans.balance_of("ind"), balance)
+
+
+def test_second_mortgage_is_rejected():
+    env = Environment.from_json("env", "../configs/basic-env.json")
+    individual = Individual.from_json("ind", "../configs/junior-swe.json")
+    env.add_homeowner(individual)
+    env.bank.issue_mortgage(100000, 1, 0.065, individual)
+
+    with pytest.raises(AssertionError):
+        env.bank.issue_mortgage(50000, 3, 0.065, individual)
+
+    env.progress_one_year()
+    env.bank.issue_mortgage(50000, 3, 0.065, individual)
+    assert np.isclose(env.bank.loans.balance_of("ind"), 50000)
+
+
+def main():
+    test_schedule_is_memoized()
+    test_advance_matches_schedule()
+    test_net_worth_nets_out_mortgage(Environment)
+    test_net_worth_nets_out_mortgage(VectorEnvironment)
+    test_second_mortgage_is_rejected()
+
+
+if __name__ == "__main__":
+    main()
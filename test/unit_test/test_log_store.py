@@ -0,0 +1,78 @@
+import pytest
+import numpy as np
+
+from sim_assets.entities.Home import Home
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.Environment import Environment
+from sim_assets.records.LogStore import LogStore
+
+
+def build(log_store: LogStore = None) -> Environment:
+    env = Environment.from_json("env", "../configs/basic-env.json")
+    env.log_store = log_store
+    env.add_home(Home.from_json("home", "../configs/basic-home.json"))
+    env.add_homeowner(Individual.from_json("owner", "../configs/junior-swe.json"))
+    env.add_renter(Individual.from_json("renter", "../configs/new-grad.json"))
+
+    env.homeowners['owner'].config['savings'] = 800000
+    env.purchase_home(env.homeowners['owner'], env.homes['home'])
+    env.rent(env.renters['renter'], env.homes['home'])
+    return env
+
+
+def test_matches_in_memory_logs(tmp_path):
+    in_memory = build()
+    streamed = build(LogStore(str(tmp_path)))
+    for _ in range(5):
+        in_memory.progress_one_year()
+        assert streamed.progress_one_year() is None
+
+    assert len(streamed.logs) == 0
+
+    store = LogStore(str(tmp_path))
+    assert [info['year'] for info in store.years] == [1, 2, 3, 4, 5]
+    for year in range(1, 6):
+        assert store.to_log(year) == in_memory.logs[year - 1]
+
+
+def test_trajectory_and_snapshot(tmp_path):
+    env = build(LogStore(str(tmp_path)))
+    for _ in range(3):
+        env.progress_one_year()
+
+    env.add_homeowner(Individual.from_json("late", "../configs/new-grad.json"))
+    env.progress_one_year()
+
+    store = LogStore(str(tmp_path))
+    trajectory = store.trajectory("late", "savings")
+    assert trajectory == {4: env.homeowners['late'].config['savings']}
+
+    rents = store.trajectory("home", "rent")
+    assert list(rents) == [1, 2, 3, 4] and rents[1] == 36000 * 1.042
+
+    snapshot = store.snapshot(2)
+    assert snapshot['individual_ids'] == ["owner", "renter"]
+    assert np.allclose(snapshot['prop_val'], [800000 * 1.042 * 1.042])
+
+
+def test_duplicate_year(tmp_path):
+    env = build(LogStore(str(tmp_path)))
+    env.progress_one_year()
+    env.year -= 1
+
+    with pytest.raises(Exception) as e_info:
+        env.progress_one_year()
+        print(e_info)
+
+
+def test_reordered_ids(tmp_path):
+    store = LogStore(str(tmp_path))
+    env = build(store)
+    env.progress_one_year()
+    columns = env.make_log_columns()
+    columns['year'] += 1
+    columns['individual_ids'] = columns['individual_ids'][::-1]
+
+    with pytest.raises(AssertionError):
+        store.append(columns)
+    assert [info['year'] for info in LogStore(str(tmp_path)).years] == [1]
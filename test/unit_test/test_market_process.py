@@ -0,0 +1,108 @@
+import numpy as np
+import pytest
+
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.Environment import Environment
+from sim_assets.env.MarketProcess import MarketProcess, DEFAULT_MARKET_CONFIG
+from sim_assets.env.PopulationGenerator import PopulationGenerator
+from sim_assets.env.ShardedEnvironment import ShardedEnvironment
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from builders import assert_logs_close, build, build_population
+
+FLAT_CONFIG = dict(DEFAULT_MARKET_CONFIG, home_appr_vol=0, rent_vol=0, inc_growth_vol=0,
+                   regimes=[{'name': 'flat', 'drift': 0, 'vol_scale': 1, 'inc_drift': 0}], transitions=[[1]])
+
+
+def build_with_loner(env_cls, **kwargs):
+    env = build(env_cls, **kwargs)
+    env.add_homeowner(Individual.from_json("loner", "../configs/junior-swe.json"))
+    env.resync_balances()
+    return env
+
+
+def mean_correlation(returns, left, right):
+    corr = np.corrcoef(returns.T)
+    pairs = left[:, None] & right[None, :]
+    np.fill_diagonal(pairs, False)
+    return corr[pairs].mean()
+
+
+def test_paths_are_seeded_and_correlated():
+    generator = PopulationGenerator(300, 400, seed=2)
+    env = Environment.from_json("env", "../configs/basic-env.json")
+    generator.populate(env)
+    regions = generator.home_regions()
+
+    paths = MarketProcess(seed=5).generate(env, 60, regions)
+    again = MarketProcess(seed=5).generate(env, 60, regions)
+    other = MarketProcess(seed=6).generate(env, 60, regions)
+    assert paths.appr_rates.shape == paths.rent_rates.shape == (60, 400)
+    assert paths.inc_growth_rates.shape == (60, 300)
+    assert np.array_equal(paths.appr_rates, again.appr_rates) and np.array_equal(paths.regimes, again.regimes)
+    assert not np.array_equal(paths.appr_rates, other.appr_rates)
+    assert set(paths.regimes.tolist()) == {0, 1}
+
+    returns = np.log1p(paths.appr_rates)
+    names = np.array([regions[home_id] for home_id in paths.home_ids])
+    urban, rural = names == 'urban', names == 'rural'
+    assert mean_correlation(returns, urban, urban) > mean_correlation(returns, urban, rural) + 0.2
+
+    rent_returns = np.log1p(paths.rent_rates)
+    correlations = [np.corrcoef(returns[:, home], rent_returns[:, home])[0, 1] for home in range(400)]
+    assert np.mean(correlations) > 0.4
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_flat_paths_match_deterministic_growth(env_cls):
+    expected = build(env_cls)
+    env = build(env_cls)
+    MarketProcess(FLAT_CONFIG).attach(env, 6)
+
+    for _ in range(6):
+        expected.progress_one_year()
+        env.progress_one_year()
+        assert np.allclose(env.get_net_worths(), expected.get_net_worths(), rtol=1e-12)
+        assert np.allclose(env.get_rents(), expected.get_rents(), rtol=1e-12)
+
+    with pytest.raises(AssertionError):
+        env.progress_one_year()
+
+
+@pytest.mark.parametrize("kwargs", [{}, {'lazy_growth': True}])
+def test_scalar_and_vector_consume_paths_identically(kwargs):
+    scalar = build_with_loner(Environment)
+    vector = build_with_loner(VectorEnvironment, **kwargs)
+    paths = MarketProcess(seed=3).attach(scalar, 8)
+    vector.use_market_paths(paths)
+
+    assert scalar.progress_years(8) == [vector.progress_one_year() for _ in range(8)]
+    assert scalar.homes['home'].config['prop_val'] == vector.homes['home'].config['prop_val']
+    assert scalar.homeowners['loner'].config['income'] == vector.homeowners['loner'].config['income']
+    scalar.check_balances()
+
+    with pytest.raises(AssertionError):
+        build(Environment).use_market_paths(paths)
+
+
+def test_shards_consume_their_slice_of_the_paths():
+    single = build_population(VectorEnvironment)
+    paths = MarketProcess(dict(DEFAULT_MARKET_CONFIG, home_appr_vol=0.03), seed=4).attach(single, 4)
+    expected = single.progress_years(4)
+
+    env = build_population(VectorEnvironment)
+    env.use_market_paths(paths)
+    sharded = ShardedEnvironment(env, 3, processes=False)
+    assert_logs_close(sharded.progress_years(4), expected)
+
+
+def main():
+    test_paths_are_seeded_and_correlated()
+    test_flat_paths_match_deterministic_growth(Environment)
+    test_flat_paths_match_deterministic_growth(VectorEnvironment)
+    test_scalar_and_vector_consume_paths_identically({})
+    test_scalar_and_vector_consume_paths_identically({'lazy_growth': True})
+    test_shards_consume_their_slice_of_the_paths()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+import pytest
+import numpy as np
+
+from sim_assets.entities.Home import Home
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.Environment import Environment
+from sim_assets.env.MonteCarlo import MonteCarloRunner
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+
+config = {
+    'home_appr_rate': 0.042,
+    'default_home_price': 800000,
+    'default_rent_rate': 0.04,
+    'default_income_appr_rate': 0.04,
+    'default_equity_contr': 0.5,
+    'tax_brackets': [{'max_amount': 1000000000, 'tax': 0.226}],
+}
+
+
+def population(env: Environment) -> None:
+    env.add_home(Home("home", {"prop_val": 800000, "rent": 36000}))
+    env.add_homeowner(Individual("owner", {
+        "income": 140000,
+        "income_tax": 0.337,
+        "inc_growth_rate": 0.06,
+        "savings": 800000,
+        "with_polymer": False,
+        "equity_contr": 0.5
+    }))
+    env.add_renter(Individual("renter", {
+        "income": 80000,
+        "income_tax": 0.226,
+        "inc_growth_rate": 0.06,
+        "savings": 10000,
+        "with_polymer": True,
+        "equity_contr": 0.5
+    }))
+    env.purchase_home(env.homeowners['owner'], env.homes['home'])
+    env.rent(env.renters['renter'], env.homes['home'])
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_deterministic_replicas_match_environment(env_cls):
+    result = MonteCarloRunner(config, population, env_cls=env_cls, max_workers=2).run(replicas=3, years=5)
+
+    env = env_cls("env", dict(config))
+    population(env)
+    assert result.replicas == 3 and result.years == 5
+    for year in range(5):
+        env.progress_one_year()
+        for metric, values in (('net_worth', env.get_net_worths()), ('savings', env.get_savings())):
+            stats = result.stats.years[year].metrics[metric]
+            assert stats.count == 3 * len(values)
+            assert stats.min == values.min() and stats.max == values.max()
+            assert stats.mean == pytest.approx(values.mean())
+
+
+def test_seeded_distributions():
+    runner = MonteCarloRunner(config, population, seed=7, home_appr_vol=0.05, inc_growth_vol=0.02, max_workers=2)
+    first = runner.run(replicas=8, years=4)
+    second = runner.run(replicas=8, years=4)
+
+    assert first.summaries() == second.summaries()
+    assert [stats.year for stats in first.stats.years] == [1, 2, 3, 4]
+    assert first.stats.years[-1].metrics['net_worth'].count == 8 * 2
+    assert first.std('net_worth')[-1] > 0
+
+    low, median, high = first.percentiles("net_worth", [5, 50, 95])
+    assert low.shape == (4,) and np.all(low <= median) and np.all(median <= high)
@@ -0,0 +1,67 @@
+from sim_assets.entities.Home import Home
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.Environment import Environment
+
+home: Home = None
+owner: Individual = None
+renter: Individual = None
+env: Environment = None
+
+
+def setup():
+    global home, owner, renter, env
+    home = Home.from_json("basic-home", "../configs/basic-home.json")
+    owner = Individual.from_json("owner", "../configs/junior-swe.json")
+    renter = Individual.from_json("renter", "../configs/new-grad.json")
+
+    env = Environment.from_json("basic-env", "../configs/basic-env.json")
+    env.add_home(home)
+    env.add_homeowner(owner)
+    env.add_renter(renter)
+
+    owner.config['savings'] = 800000
+    env.purchase_home(owner, home)
+    env.rent(renter, home)
+    renter.config['savings'] = 200000
+
+
+def test_homes_of():
+    setup()
+
+    assert env.ownership.homes_of("owner") == {"basic-home"}
+    assert env.ownership.homes_of("renter") == set()
+
+    env.purchase_home_equity(owner, renter, home, 0.1)
+    assert env.ownership.homes_of("renter") == {"basic-home"}
+
+
+def test_payout_is_cached():
+    setup()
+    payees, shares = env.ownership.payout("basic-home", "renter")
+    env.collect_rent(renter, home)
+
+    assert env.ownership.payout("basic-home", "renter")[1] is shares
+    assert payees == [owner] and list(shares) == [1]
+
+
+def test_payout_updates_on_equity_change():
+    setup()
+    shares = env.ownership.payout("basic-home", "renter")[1]
+    env.purchase_home_equity(owner, renter, home, 0.25)
+
+    payees, new_shares = env.ownership.payout("basic-home", "renter")
+    assert new_shares is not shares
+    assert payees == [owner] and list(new_shares) == [0.75]
+
+    owners, equities = env.ownership.owners_of("basic-home")
+    assert owners == [owner, renter] and list(equities) == [0.75, 0.25]
+
+
+def main():
+    test_homes_of()
+    test_payout_is_cached()
+    test_payout_updates_on_equity_change()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import numpy as np
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.PopulationGenerator import PopulationGenerator, DEFAULT_GENERATOR_CONFIG
+from sim_assets.env.PopulationLoader import load_population
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+
+
+def test_chunks_are_deterministic():
+    first = list(PopulationGenerator(250, 40, seed=3, chunk_size=100).individual_chunks())
+    second = list(PopulationGenerator(250, 40, seed=3, chunk_size=100).individual_chunks())
+    other = list(PopulationGenerator(250, 40, seed=4, chunk_size=100).individual_chunks())
+
+    assert [len(columns['id']) for columns in first] == [100, 100, 50]
+    assert all(np.array_equal(a['income'], b['income']) for a, b in zip(first, second))
+    assert not np.array_equal(first[0]['income'], other[0]['income'])
+
+    residences = np.concatenate([columns['residence'] for columns in first])
+    residences = residences[residences != '']
+    assert 0 < len(residences) <= 40 and len(set(residences.tolist())) == len(residences)
+
+
+def test_rent_follows_region():
+    homes = next(PopulationGenerator(0, 5000, seed=1, chunk_size=5000).home_chunks())
+    regions = DEFAULT_GENERATOR_CONFIG['regions']
+
+    medians = [np.median(homes['prop_val'][homes['region'] == region['name']]) for region in regions]
+    yields = [np.median((homes['rent'] / homes['prop_val'])[homes['region'] == region['name']]) for region in regions]
+    assert medians[0] > medians[1] > medians[2]
+    assert np.allclose(yields, [region['rent_yield'] for region in regions], rtol=0.05)
+
+
+def test_populate_matches_disk(tmp_path):
+    generator = PopulationGenerator(300, 60, seed=7, chunk_size=128)
+    streamed = VectorEnvironment.from_json("streamed", "../configs/basic-env.json")
+    generator.populate(streamed)
+
+    individuals_files, homes_files, ownership_files = generator.write(str(tmp_path))
+    loaded = Environment.from_json("loaded", "../configs/basic-env.json")
+    load_population(loaded, individuals_files, homes_files, ownership_files=ownership_files)
+
+    assert len(individuals_files) == 3 and len(homes_files) == 1 and len(ownership_files) == 1
+    assert list(streamed.homeowners) == list(loaded.homeowners) and list(streamed.renters) == list(loaded.renters)
+    assert streamed.rentals_map.keys() == loaded.rentals_map.keys()
+    assert np.array_equal(streamed.get_savings(), loaded.get_savings())
+    assert np.array_equal(streamed.get_rents(), loaded.get_rents())
+    assert np.array_equal(streamed.get_net_worths(), loaded.get_net_worths())
+
+    for _ in range(3):
+        assert streamed.progress_one_year() == loaded.progress_one_year()
+
+
+def test_homes_have_owners():
+    config = dict(DEFAULT_GENERATOR_CONFIG, owners_per_home={'kind': 'uniform', 'low': 0.5, 'high': 3.49})
+    generator = PopulationGenerator(200, 90, seed=5, config=config, chunk_size=64)
+    env = VectorEnvironment.from_json("env", "../configs/basic-env.json")
+    generator.populate(env)
+    env.check_balances()
+
+    owners = [env.ownership.owners_of(home_id)[0] for home_id in env.homes]
+    assert {len(home_owners) for home_owners in owners} == {1, 2, 3}
+    assert all(owner.entity_id not in env.renters for home_owners in owners for owner in home_owners)
+    assert np.allclose([env.ownership.owners_of(home_id)[1].sum() for home_id in env.homes], 1)
+
+    renters = [renter for renter in env.renters.values() if renter.residence is not None]
+    owner_savings = sum(owner.config['savings'] for home_owners in owners for owner in home_owners)
+    for _ in range(3):
+        env.progress_one_year()
+    assert renters and all(renter.config['savings'] > 0 for renter in renters)
+    assert sum(owner.config['savings'] for home_owners in owners for owner in home_owners) > owner_savings
+
+
+def main():
+    test_chunks_are_deterministic()
+    test_rent_follows_region()
+    test_homes_have_owners()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.PopulationLoader import load_population, load_templates, read_columns, write_npz
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+
+INDIVIDUALS_CSV = """id,template,role,residence,savings,with_polymer
+ann,junior-swe,homeowner,,1300000,
+bob,new-grad,renter,home-1,,true
+cat,,renter,home-2,5000,
+"""
+
+HOMES_JSONL = """{"id": "home-1"}
+{"id": "home-2", "prop_val": 500000, "rent": 24000}
+"""
+
+
+def write_population(tmp_path):
+    individuals = tmp_path / "individuals.csv"
+    homes = tmp_path / "homes.jsonl"
+    individuals.write_text(INDIVIDUALS_CSV)
+    homes.write_text(HOMES_JSONL)
+    return str(individuals), str(homes)
+
+
+def test_read_columns(tmp_path):
+    individuals, homes = write_population(tmp_path)
+    columns = read_columns(individuals)
+
+    assert columns['id'].tolist() == ["ann", "bob", "cat"]
+    assert np.isnan(columns['savings'][1]) and columns['savings'][2] == 5000
+    assert columns['with_polymer'].tolist() == [None, True, None]
+    assert np.isnan(read_columns(homes)['prop_val'][0])
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_load_population(tmp_path, env_cls):
+    individuals, homes = write_population(tmp_path)
+    env = env_cls.from_json("env", "../configs/basic-env.json")
+    load_population(env, individuals, homes, templates="../configs", default_individual="junior-swe",
+                    default_home="basic-home")
+
+    templates = load_templates("../configs")
+    assert dict(env.homes['home-1'].config) == templates['basic-home']
+    assert env.homes['home-2'].config['prop_val'] == 500000 and env.homes['home-2'].config['savings'] == 0
+    assert list(env.homeowners) == ["ann", "bob", "cat"] and list(env.renters) == ["bob", "cat"]
+
+    bob = env.renters['bob']
+    assert dict(bob.config) == dict(templates['new-grad'], with_polymer=True)
+    assert env.renters['cat'].config['income'] == templates['junior-swe']['income']
+    assert env.homeowners['ann'].savings == 1300000
+    assert bob.residence is env.homes['home-1'] and env.rentals_map['home-2'] is env.renters['cat']
+
+    env.purchase_home(env.homeowners['ann'], env.homes['home-1'])
+    env.progress_one_year()
+
+
+def test_reserved_columns_stay_strings(tmp_path):
+    individuals = tmp_path / "individuals.csv"
+    homes = tmp_path / "homes.csv"
+    individuals.write_text("id,role,residence,savings\n001,homeowner,,1300000\n002,renter,7,5000\n")
+    homes.write_text("id,prop_val\n7,500000\n")
+
+    columns = read_columns(str(individuals))
+    assert columns['id'].tolist() == ["001", "002"] and columns['residence'].tolist() == [None, "7"]
+    assert columns['savings'].tolist() == [1300000, 5000]
+
+    env = VectorEnvironment.from_json("env", "../configs/basic-env.json")
+    load_population(env, str(individuals), str(homes), default_individual="junior-swe", default_home="basic-home",
+                    templates="../configs")
+    assert list(env.homeowners) == ["001", "002"] and env.renters["002"].residence is env.homes["7"]
+
+
+def test_npz_matches_csv(tmp_path):
+    individuals, homes = write_population(tmp_path)
+    npz = str(tmp_path / "individuals.npz")
+    write_npz(npz, {name: values for name, values in read_columns(individuals).items() if name != 'with_polymer'})
+
+    from_csv = VectorEnvironment.from_json("csv", "../configs/basic-env.json")
+    from_npz = VectorEnvironment.from_json("npz", "../configs/basic-env.json")
+    load_population(from_csv, individuals, homes, "../configs", "junior-swe", "basic-home")
+    load_population(from_npz, npz, homes, "../configs", "junior-swe", "basic-home")
+
+    assert list(from_npz.renters) == list(from_csv.renters)
+    for name in ('savings', 'income', 'income_tax', 'inc_growth_rate'):
+        assert np.array_equal(from_npz.get_individual_column(name), from_csv.get_individual_column(name))
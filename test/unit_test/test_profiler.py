@@ -0,0 +1,65 @@
+import pytest
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from sim_assets.records.Profiler import Profiler
+from builders import build_independent
+
+PHASES = ['collect_incomes', 'process_expenses', 'advance_loans', 'process_rent', 'appreciate_income',
+          'appreciate_homes', 'contribute_equities']
+
+
+@pytest.mark.parametrize("env_cls, kwargs", [(Environment, {}), (VectorEnvironment, {}),
+                                             (VectorEnvironment, {'cents': True})])
+def test_phase_counters(env_cls, kwargs):
+    env = build_independent(env_cls, **kwargs)
+    phases = []
+    years = []
+    env.profiler = Profiler(on_phase=lambda year, name, stats: phases.append((year, name)), on_year=years.append)
+    garbage = env.garbage.savings
+    env.progress_one_year()
+
+    profile = env.profiler.years[0]
+    assert years == [profile] and phases == [(1, name) for name in PHASES]
+    assert list(profile['phases']) == PHASES and profile['year'] == 1
+    assert profile['wall_time'] >= sum(stats['wall_time'] for stats in profile['phases'].values())
+
+    expenses = profile['phases']['process_expenses']
+    assert expenses['pay_calls'] == 3 and expenses['amount'] == pytest.approx(env.garbage.savings - garbage)
+    assert expenses['entities'] == 3
+    assert profile['phases']['process_rent'] == pytest.approx({
+        'wall_time': profile['phases']['process_rent']['wall_time'], 'pay_calls': 1, 'amount': 36000, 'entities': 2,
+    })
+    assert profile['phases']['collect_incomes']['entities'] == 7
+    assert profile['phases']['appreciate_homes']['entities'] == 2
+
+
+def test_fast_forward_phase():
+    env = build_independent(VectorEnvironment)
+    env.profiler = Profiler()
+    env.progress_years(2)
+
+    profile = env.profiler.years[1]
+    assert list(profile['phases']) == PHASES + ['fast_forward']
+    assert profile['phases']['fast_forward']['entities'] == 5
+    assert profile['phases']['fast_forward']['pay_calls'] == 3
+    assert env.profiler.totals()['fast_forward']['pay_calls'] == 6
+
+
+def test_disabled_by_default():
+    env = build_independent(Environment)
+    env.progress_one_year()
+
+    assert env.profiler is None and env.fork().profiler is None
+
+
+def main():
+    test_phase_counters(Environment, {})
+    test_phase_counters(VectorEnvironment, {})
+    test_phase_counters(VectorEnvironment, {'cents': True})
+    test_fast_forward_phase()
+    test_disabled_by_default()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+import pytest
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from builders import build_independent
+
+
+@pytest.mark.parametrize("env_cls, kwargs", [
+    (Environment, {}),
+    (VectorEnvironment, {}),
+    (VectorEnvironment, {'cents': True}),
+])
+def test_matches_stepping(env_cls, kwargs):
+    stepped = build_independent(env_cls, **kwargs)
+    forwarded = build_independent(env_cls, **kwargs)
+
+    assert list(forwarded.find_independent()) == [False, False, True, True, True, True, True]
+
+    for _ in range(8):
+        stepped.progress_one_year()
+    forwarded.progress_years(5)
+    forwarded.progress_years(3)
+
+    assert forwarded.logs == stepped.logs
+    assert 'mortgage' not in forwarded.homeowners['solo-1'].expenses
+    for individual_id, individual in stepped.homeowners.items():
+        assert forwarded.homeowners[individual_id].config == individual.config
+        assert forwarded.homeowners[individual_id].expenses == individual.expenses
+
+    assert forwarded.expenses_due == stepped.expenses_due
+    assert forwarded.garbage.config['savings'] == pytest.approx(stepped.garbage.config['savings'])
+
+
+def test_insolvent_agent_fails():
+    env = build_independent(Environment)
+    env.homeowners['solo-4'].add_expense('yacht', 100000, 12, -1)
+
+    with pytest.raises(Exception) as e_info:
+        env.progress_years(3)
+        print(e_info)
@@ -0,0 +1,59 @@
+import pytest
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from sim_assets.records.ResultCache import ResultCache
+from builders import build
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_cached_runs_match_fresh_runs(env_cls, tmp_path):
+    cache = ResultCache(str(tmp_path))
+    fresh = build(env_cls)
+    expected = [fresh.progress_one_year() for _ in range(6)]
+
+    first = build(env_cls)
+    key = first.cache_key()
+    assert first.progress_years_cached(3, cache) == expected[:3]
+    assert cache.entry(key)['checkpoints'] == [3]
+
+    cached = build(env_cls)
+    assert cached.cache_key() == key
+    assert cached.progress_years_cached(3, cache) == expected[:3]
+    assert cached.year == 3 and cached.progress_one_year() == expected[3]
+
+    resumed = build(env_cls)
+    assert resumed.progress_years_cached(5, cache) == expected[:5]
+    assert cache.entry(key)['checkpoints'] == [3, 5] and cache.entry(key)['years'] == 5
+    assert resumed.progress_one_year() == expected[5]
+    assert resumed.logs == expected
+
+
+def test_keys_cover_state_and_seed():
+    env = build(Environment)
+    key = env.cache_key()
+
+    assert build(Environment).cache_key() == key
+    assert env.cache_key(seed=1) != key
+    assert build(VectorEnvironment).cache_key() != key
+
+    env.homeowners['owner'].config['income'] += 1
+    assert env.cache_key() != key
+    env.homeowners['owner'].config['income'] -= 1
+    env.market.bid("renter", "home", 0.1, 1)
+    assert env.cache_key() != key
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = ResultCache(str(tmp_path))
+    build(Environment).progress_years_cached(2, cache, seed=0)
+    size = cache.total_bytes()
+
+    cache.max_bytes = 2 * size
+    build(Environment).progress_years_cached(2, cache, seed=1)
+    build(Environment).progress_years_cached(2, cache, seed=0)
+    build(Environment).progress_years_cached(2, cache, seed=2)
+
+    kept = {entry['key'] for entry in cache.entries()}
+    assert kept == {build(Environment).cache_key(seed) for seed in (0, 2)}
+    assert cache.total_bytes() <= cache.max_bytes
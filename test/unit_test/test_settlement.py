@@ -0,0 +1,83 @@
+import numpy as np
+import pytest
+
+from sim_assets.entities.Bank import Bank
+from sim_assets.env.Environment import Environment
+from sim_assets.env.Settlement import TransferBatch, settle, to_cents
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from sim_assets.records.Ledger import Ledger, LedgerLevel, RENT
+from builders import build
+
+
+def test_settle():
+    balances = to_cents([100.0, 50.0, 0.0])
+    external = settle(balances, np.array([0, 0, 1]), np.array([1, -1, 2]), to_cents([30.0, 70.0, 50.0]),
+                      externals=1)
+
+    assert balances.tolist() == [0, 3000, 5000] and external.tolist() == [7000]
+
+
+def test_settle_checks_aggregate_solvency():
+    balances = to_cents([100.0, 50.0])
+    with pytest.raises(AssertionError):
+        settle(balances, np.array([1, 1]), np.array([0, 0]), to_cents([30.0, 30.0]))
+
+    assert balances.tolist() == [10000, 5000]
+
+
+def test_transfer_batch_credits_externals():
+    garbage = Bank("garbage")
+    batch = TransferBatch()
+    batch.add(0, batch.external(garbage), 1234)
+    batch.add(1, batch.external(garbage), 1)
+    balances = to_cents([20.0, 1.0])
+    batch.settle(balances)
+
+    assert balances.tolist() == [766, 99] and garbage.savings == 10000000000 + 12.35
+
+
+def test_cents_match_scalar_environment():
+    scalar = build(Environment)
+    cents = build(VectorEnvironment, cents=True)
+
+    for _ in range(10):
+        scalar_log = scalar.progress_one_year()
+        cents_log = cents.progress_one_year()
+        for individual_id, logs in scalar_log['individuals'].items():
+            assert np.isclose(cents_log['individuals'][individual_id]['savings'], logs['savings'], atol=0.05)
+
+    savings = cents.individual_table.column('savings')
+    assert savings.dtype == np.int64
+    assert cents.renters['renter'].savings == savings[cents.individual_table.index['renter']] / 100
+    assert np.isclose(cents.garbage.savings, scalar.garbage.savings, atol=0.05)
+
+
+def test_cents_ledger_records_batched_transfers():
+    env = build(VectorEnvironment, cents=True, ledger=Ledger(LedgerLevel.AGGREGATE))
+    env.progress_one_year()
+
+    assert env.ledger.totals(1)[RENT] == (2, 60000.0)
+
+
+def test_failed_batch_records_nothing():
+    env = build(VectorEnvironment, cents=True, ledger=Ledger(LedgerLevel.AGGREGATE))
+    env.renters['renter'].config['savings'] = 0
+    totals = env.ledger.totals()
+
+    with pytest.raises(AssertionError):
+        env.process_rent()
+
+    assert env.ledger.totals() == totals
+
+
+def main():
+    test_settle()
+    test_settle_checks_aggregate_solvency()
+    test_transfer_batch_credits_externals()
+    test_cents_match_scalar_environment()
+    test_cents_ledger_records_batched_transfers()
+    test_failed_batch_records_nothing()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+import numpy as np
+import pytest
+
+from sim_assets.entities.Home import Home
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.Environment import Environment
+from sim_assets.env.ShardedEnvironment import ShardedEnvironment, partition
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from builders import assert_logs_close, build, build_population, population_generator
+
+
+def build_traded(env_cls):
+    # more owners than homeowners per home wraps the deal around, so owners end up holding homes in other regions
+    env = build_population(env_cls, population_generator(4.49))
+    seller = next(owner for owner in env.ownership.owners_of("home-5")[0] if owner.entity_id not in env.renters)
+    env.market.ask(seller.entity_id, "home-5", 0.5, 1000)
+    return env
+
+
+def test_partition_follows_regions():
+    env = build(Environment)
+    home_shards, individual_shards = partition(env, 2)
+    assert home_shards.tolist() == [0, 1]
+    assert individual_shards.tolist() == [0, 0, 1]
+
+    env.add_homeowner(Individual.from_json("loner", "../configs/junior-swe.json"))
+    env.add_home(Home("home-3", {"prop_val": 300000, "rent": 15000}))
+    home_shards, individual_shards = partition(env, 2, {'home': 'north', 'home-2': 'north', 'home-3': 'south'})
+    assert home_shards.tolist() == [0, 0, 1]
+    assert individual_shards.tolist() == [0, 0, 0, 1]
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_shards_match_single_process(env_cls):
+    regions = population_generator(4.49).home_regions()
+    single = build_traded(env_cls)
+    sharded = ShardedEnvironment(build_traded(env_cls), 3, regions, processes=False)
+    assert sum(len(shard.members) for shard in sharded.shards) == len(single.homeowners)
+    assert all(len(shard.env.homes) > 0 for shard in sharded.shards)
+    assert any(shard.ghosts for shard in sharded.shards)
+    for region in set(regions.values()):
+        assert len({sharded.shard_of(home_id) for home_id, name in regions.items() if name == region}) == 1
+
+    expected = [single.progress_one_year() for _ in range(6)]
+    assert_logs_close(sharded.progress_years(4) + [sharded.progress_one_year(), sharded.progress_one_year()],
+                      expected)
+    assert sharded.year == single.year
+    assert sharded.get_garbage_savings() == pytest.approx(single.garbage.savings)
+    assert sharded.get_bank_savings() == pytest.approx(single.bank.savings)
+
+    env = sharded.sync()
+    assert env.year == single.year
+    assert np.allclose(env.get_savings(), single.get_savings(), rtol=1e-9)
+    assert np.allclose(env.get_net_worths(), single.get_net_worths(), rtol=1e-9)
+    assert [env.equity.get(owner_id, "home-5") for owner_id in env.homeowners] == \
+        pytest.approx([single.equity.get(owner_id, "home-5") for owner_id in single.homeowners])
+    env.check_balances()
+
+
+def test_shard_processes_match_single_process():
+    single = build_traded(VectorEnvironment)
+    expected = [single.progress_one_year() for _ in range(3)]
+
+    with ShardedEnvironment(build_traded(VectorEnvironment), 2, population_generator(4.49).home_regions()) as sharded:
+        assert_logs_close(sharded.progress_years(3), expected)
+    assert sharded.workers == []
+    assert np.isclose(sharded.get_garbage_savings(), single.garbage.savings)
+    assert np.allclose(sharded.env.get_net_worths(), single.get_net_worths(), rtol=1e-9)
+    assert sharded.env.year == single.year
+
+
+def main():
+    test_partition_follows_regions()
+    test_shards_match_single_process(Environment)
+    test_shards_match_single_process(VectorEnvironment)
+    test_shard_processes_match_single_process()
+
+
+if __name__ == "__main__":
+    main()
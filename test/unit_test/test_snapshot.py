@@ -0,0 +1,62 @@
+import pytest
+
+from sim_assets.entities.Home import Home
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.Environment import Environment
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+
+
+def build(env_cls):
+    env = env_cls.from_json("env", "../configs/basic-env.json")
+    env.add_home(Home.from_json("home", "../configs/basic-home.json"))
+    env.add_homeowner(Individual.from_json("owner", "../configs/junior-swe.json"))
+    env.add_renter(Individual.from_json("renter", "../configs/new-grad.json"))
+
+    env.homeowners['owner'].config['savings'] = 800000
+    env.purchase_home(env.homeowners['owner'], env.homes['home'])
+    env.rent(env.renters['renter'], env.homes['home'])
+    env.renters['renter'].add_expense('loan', 300, 12, 4)
+    return env
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_restore_replays_identically(env_cls):
+    env = build(env_cls)
+    for _ in range(2):
+        env.progress_one_year()
+
+    snapshot = env.snapshot()
+    first = [env.progress_one_year() for _ in range(5)]
+
+    env.add_homeowner(Individual.from_json("late", "../configs/new-grad.json"))
+    env.restore(snapshot)
+
+    assert 'late' not in env.homeowners and len(env.logs) == 2
+    assert env.renters['renter'].expenses['loan']['remove_after'] == 2
+    assert env.renters['renter'].residence is env.homes['home']
+
+    second = [env.progress_one_year() for _ in range(5)]
+    assert first == second
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_fork_branches_from_shared_prefix(env_cls):
+    env = build(env_cls)
+    for _ in range(3):
+        env.progress_one_year()
+
+    polymer = env.fork("polymer")
+    no_polymer = env.fork("no-polymer")
+    no_polymer.renters['renter'].config['with_polymer'] = False
+
+    for _ in range(3):
+        polymer.progress_one_year()
+        no_polymer.progress_one_year()
+
+    assert len(env.logs) == 3 and len(polymer.logs) == 6
+    assert polymer.logs[:3] == env.logs
+    assert env.get_equity_in_home(env.renters['renter'], env.homes['home']) == \
+        no_polymer.get_equity_in_home(no_polymer.renters['renter'], no_polymer.homes['home'])
+    assert polymer.get_equity_in_home(polymer.renters['renter'], polymer.homes['home']) > \
+        no_polymer.get_equity_in_home(no_polymer.renters['renter'], no_polymer.homes['home'])
+    assert env.renters['renter'].config['with_polymer']
@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+
+from sim_assets.entities.Individual import Individual
+from sim_assets.env.Environment import Environment
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from builders import build
+
+
+def test_matches_scalar_environment():
+    scalar = build(Environment)
+    vector = build(VectorEnvironment)
+
+    for _ in range(10):
+        assert scalar.progress_one_year() == vector.progress_one_year()
+
+
+def test_rows_are_views():
+    env = build(VectorEnvironment)
+    renter = env.renters['renter']
+
+    renter.config['savings'] = 1234
+    assert env.individual_table.column('savings')[env.individual_table.index['renter']] == 1234
+
+    env.individual_table.column('income')[:] = 1000
+    assert renter.config['income'] == 1000 and renter.savings == 1234
+    assert env.homes['home'].config['savings'] == 0
+
+
+def test_bracket_overflow():
+    env = build(VectorEnvironment)
+    env.renters['renter'].config['income'] = 2000000000
+
+    with pytest.raises(Exception) as e_info:
+        env.appreciate_income()
+        print(e_info)
+
+
+def test_unsorted_brackets():
+    config = {
+        'home_appr_rate': 0.042,
+        'tax_brackets': [{'max_amount': 1000000000, 'tax': 0.3}, {'max_amount': 50000, 'tax': 0.1}],
+    }
+
+    with pytest.raises(AssertionError):
+        VectorEnvironment("env", config)
+
+
+def test_lazy_growth_matches_eager():
+    eager = build(VectorEnvironment)
+    lazy = build(VectorEnvironment, lazy_growth=True)
+
+    for year in range(10):
+        if year == 5:
+            eager.config['home_appr_rate'] = lazy.config['home_appr_rate'] = 0.01
+
+        eager_log, lazy_log = eager.progress_one_year(), lazy.progress_one_year()
+        for home_id, home_log in eager_log['homes'].items():
+            assert lazy_log['homes'][home_id] == pytest.approx(home_log, rel=1e-12)
+        for individual_id, individual_log in eager_log['individuals'].items():
+            assert lazy_log['individuals'][individual_id] == pytest.approx(individual_log, rel=1e-9)
+
+    assert lazy.home_table.clock == 10 and lazy.home_table.epochs['prop_val'][0] == 5
+
+
+def test_lazy_growth_views():
+    env = build(VectorEnvironment, lazy_growth=True)
+    home = env.homes['home']
+    for _ in range(3):
+        env.appreciate_homes()
+
+    assert home.config['prop_val'] == pytest.approx(800000 * 1.042 ** 3)
+
+    home.config['prop_val'] = 500000
+    env.appreciate_homes()
+    assert home.config['prop_val'] == pytest.approx(500000 * 1.042)
+    assert env.get_prop_vals()[0] == pytest.approx(500000 * 1.042)
+
+    prop_vals = env.get_prop_vals()
+    assert env.get_prop_vals() is prop_vals and not prop_vals.flags.writeable
+
+    env.home_table.assign('prop_val', np.array([1]), np.array([400000.0]))
+    env.home_table.assign('appr_rate', np.array([0]), np.array([0.1]))
+    env.appreciate_homes()
+    assert env.homes['home-2'].config['prop_val'] == pytest.approx(400000 * 1.042)
+    assert home.config['prop_val'] == pytest.approx(500000 * 1.042 * 1.1)
+
+
+@pytest.mark.parametrize("cents", [False, True])
+def test_batched_polymer_contributions(cents):
+    def build_polymer(env_cls, **kwargs):
+        env = build(env_cls, **kwargs)
+        env.add_homeowner(Individual.from_json("co-owner", "../configs/junior-swe.json"))
+        env.homeowners['co-owner'].config['savings'] = 400000
+        env.purchase_home_equity(env.homeowners['owner'], env.homeowners['co-owner'], env.homes['home'], 0.25)
+        env.purchase_home_equity(env.homeowners['owner'], env.homeowners['co-owner'], env.homes['home-2'], 0.4)
+        for renter in env.renters.values():
+            renter.config['with_polymer'] = True
+        env.resync_balances()
+        return env
+
+    scalar = build_polymer(Environment)
+    vector = build_polymer(VectorEnvironment, cents=cents)
+
+    for _ in range(5):
+        scalar_log, vector_log = scalar.progress_one_year(), vector.progress_one_year()
+        for individual_id, logs in scalar_log['individuals'].items():
+            if cents:
+                assert vector_log['individuals'][individual_id] == pytest.approx(logs, abs=0.05)
+            else:
+                assert vector_log['individuals'][individual_id] == logs
+        vector.check_balances()
+
+    for home_id in scalar.homes:
+        for owner_id in scalar.homeowners:
+            assert vector.equity.get(owner_id, home_id) == pytest.approx(scalar.equity.get(owner_id, home_id))
+    assert 0 < vector.equity.get('renter', 'home') < 1
+
+
+@pytest.mark.parametrize("env_cls", [Environment, VectorEnvironment])
+def test_contributions_stop_at_full_equity(env_cls):
+    env = build(env_cls)
+    env.add_homeowner(Individual.from_json("co-owner", "../configs/junior-swe.json"))
+    env.homeowners['co-owner'].config['savings'] = 400000
+    env.purchase_home_equity(env.homeowners['owner'], env.homeowners['co-owner'], env.homes['home'], 0.25)
+    renter = env.renters['renter']
+    renter.config.update({'with_polymer': True, 'equity_contr': 1, 'savings': 10000000})
+    owner_savings = env.homeowners['owner'].config['savings']
+    env.resync_balances()
+
+    env.contribute_equities()
+
+    price = env.homes['home'].config['prop_val'] * 1.1
+    assert env.equity.get('renter', 'home') == pytest.approx(1)
+    assert env.equity.get('owner', 'home') >= 0 and env.equity.get('co-owner', 'home') >= 0
+    assert renter.config['savings'] == pytest.approx(10000000 - price)
+    assert env.homeowners['owner'].config['savings'] == pytest.approx(owner_savings + 0.75 * price)
+    env.check_balances()
+
+
+def main():
+    test_matches_scalar_environment()
+    test_rows_are_views()
+    test_bracket_overflow()
+    test_unsorted_brackets()
+    test_lazy_growth_matches_eager()
+    test_lazy_growth_views()
+    test_batched_polymer_contributions(False)
+    test_batched_polymer_contributions(True)
+    test_contributions_stop_at_full_equity(Environment)
+    test_contributions_stop_at_full_equity(VectorEnvironment)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,61 @@
+import asyncio
+import time
+import pytest
+
+from sim_assets.env.Environment import Environment
+from sim_assets.env.VectorEnvironment import VectorEnvironment
+from builders import build
+
+
+@pytest.mark.parametrize("prefetch", [0, 1, 3])
+def test_run_yields_every_year(prefetch):
+    expected = [log for log in build(Environment).progress_years(5)]
+    env = build(VectorEnvironment)
+
+    assert list(env.run(5, prefetch)) == expected
+    assert env.year == 5 and env.logs == expected
+
+
+def test_slow_consumers_bound_the_producer():
+    env = build(Environment)
+    for consumed, _ in enumerate(env.run(8, prefetch=2), 1):
+        time.sleep(0.02)
+        assert env.year <= consumed + 3
+
+    stream = build(Environment)
+    for _ in stream.run(50, prefetch=1):
+        break
+    assert stream.year <= 3
+
+
+def test_run_async():
+    async def consume(env):
+        logs = []
+        async for log in env.run_async(4, prefetch=2):
+            await asyncio.sleep(0)
+            logs.append(log)
+        return logs
+
+    expected = build(Environment).progress_years(4)
+    assert asyncio.run(consume(build(Environment))) == expected
+
+
+def test_errors_reach_the_consumer():
+    env = build(Environment)
+    env.renters['renter'].config['savings'] = -1000000
+
+    with pytest.raises(AssertionError):
+        list(env.run(3, prefetch=1))
+
+
+def main():
+    test_run_yields_every_year(0)
+    test_run_yields_every_year(1)
+    test_run_yields_every_year(3)
+    test_slow_consumers_bound_the_producer()
+    test_run_async()
+    test_errors_reach_the_consumer()
+
+
+if __name__ == "__main__":
+    main()